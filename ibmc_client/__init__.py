@@ -14,33 +14,84 @@
 
 # Version 0.0.2
 
+import importlib
 import logging
+import sys
 
-from ibmc_client.api.chassis import IbmcChassisClient
-from ibmc_client.api.task.task import IbmcTaskClient
 from ibmc_client import constants
-from ibmc_client.resources import CollectionResource, BaseResource
-from .api.system import IbmcSystemClient
-from .connector import Connector
 
 __version__ = "0.2.5.1"
 
 LOG = logging.getLogger(__name__)
 
-
-def connect(address, username, password, verify_ca=True):
-    return IBMCClient(address, username, password, verify_ca)
+# Public names are imported on first access, `import ibmc_client` does not
+# pay for requests, API clients, resource models and the RAID planner.
+_LAZY_ATTRIBUTES = {
+    'Connector': 'ibmc_client.connector',
+    'IbmcSystemClient': 'ibmc_client.api.system',
+    'IbmcChassisClient': 'ibmc_client.api.chassis',
+    'IbmcTaskClient': 'ibmc_client.api.task.task',
+    'BaseResource': 'ibmc_client.resources',
+    'CollectionResource': 'ibmc_client.resources',
+    'RaidPlanner': 'ibmc_client.raid_planner',
+    'RaidPlanCache': 'ibmc_client.raid_cache',
+}
+"""a dict of lazy public name and the module defines it"""
+
+_LAZY_SUBMODULES = ('api', 'cassette', 'cli', 'connector', 'exceptions',
+                    'fleet', 'http_budget', 'limiter', 'raid_cache',
+                    'raid_planner', 'raid_trace', 'raid_utils', 'resources',
+                    'simulator', 'utils', 'waiter')
+"""submodules which could be accessed as attribute before imported"""
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name])
+        value = getattr(module, name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module('%s.%s' % (__name__, name))
+    else:
+        raise AttributeError('module %r has no attribute %r'
+                             % (__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES)
+                  | set(_LAZY_SUBMODULES))
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # module `__getattr__` is not supported (PEP 562), import eagerly
+    for _name in _LAZY_ATTRIBUTES:
+        __getattr__(_name)
+    del _name
+
+
+def connect(address, username, password, verify_ca=True, adapter=None,
+            limiter=None, max_inflight=None, adaptive=False):
+    return IBMCClient(address, username, password, verify_ca, adapter,
+                      limiter, max_inflight, adaptive)
 
 
 class IBMCClient(object):
     """iBMC API Client"""
 
-    def __init__(self, address, username, password, verify_ca):
+    def __init__(self, address, username, password, verify_ca, adapter=None,
+                 limiter=None, max_inflight=None, adaptive=False):
         self.address = address
         self.username = username
         self.password = password
         self.verify_ca = verify_ca
-        self.connector = Connector(address, username, password, verify_ca)
+        from ibmc_client.api.chassis import IbmcChassisClient
+        from ibmc_client.api.system import IbmcSystemClient
+        from ibmc_client.api.task.task import IbmcTaskClient
+        from ibmc_client.connector import Connector
+
+        self.connector = Connector(address, username, password, verify_ca,
+                                   adapter, limiter, max_inflight, adaptive)
 
         # initial iBMC resource client
         self._system = IbmcSystemClient(self.connector, ibmc_client=self)
@@ -72,6 +123,7 @@ class IBMCClient(object):
         :param collection_odata_id: indicates the id of odata collection
         :return: A :class:`ibmc_client.resources.CollectionResource` object
         """
+        from ibmc_client.resources import CollectionResource
         return self.load_odata(collection_odata_id, CollectionResource)
 
     def load_odata_collection(self, collection_odata_id, odata_type):
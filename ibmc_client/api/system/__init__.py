@@ -13,18 +13,40 @@
 #    under the License.
 
 # Version 0.0.2
+import importlib
 import logging
+import sys
 
 from ibmc_client import constants
 from ibmc_client.api import BaseApiClient
-from ibmc_client.api.system.bios import IBMCBiosClient
-from ibmc_client.api.system.storage import IBMCStorageClient
-from ibmc_client.api.system.volume import IbmcVolumeClient
 from ibmc_client.constants import GET, PATCH, POST
 from ibmc_client.resources.system import System
 
 LOG = logging.getLogger(__name__)
 
+# Sub clients are imported on first access, the storage client imports the
+# RAID planner.
+_LAZY_ATTRIBUTES = {
+    'IBMCBiosClient': 'ibmc_client.api.system.bios',
+    'IBMCStorageClient': 'ibmc_client.api.system.storage',
+    'IbmcVolumeClient': 'ibmc_client.api.system.volume',
+}
+"""a dict of lazy public name and the module defines it"""
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError('module %r has no attribute %r'
+                             % (__name__, name))
+    module = importlib.import_module(_LAZY_ATTRIBUTES[name])
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
 
 class IbmcSystemClient(BaseApiClient):
     """iBMC API Client"""
@@ -37,11 +59,11 @@ class IbmcSystemClient(BaseApiClient):
             :class:`~ibmc_client.IBMCClient` object
         """
         super(IbmcSystemClient, self).__init__(connector, ibmc_client)
-        self._bios_client = IBMCBiosClient(self.connector, self.ibmc_client)
-        self._storage_client = IBMCStorageClient(self.connector,
-                                                 self.ibmc_client)
-        self._volume_client = IbmcVolumeClient(self.connector,
-                                               self.ibmc_client)
+        # sub clients are created on first access, the storage client
+        # imports the RAID planner
+        self._bios_client = None
+        self._storage_client = None
+        self._volume_client = None
 
     def get(self):
         uri = self.connector.system_base_url
@@ -53,6 +75,10 @@ class IbmcSystemClient(BaseApiClient):
         """Only V5 series servers support this function.
         :return:
         """
+        if self._bios_client is None:
+            from ibmc_client.api.system.bios import IBMCBiosClient
+            self._bios_client = IBMCBiosClient(self.connector,
+                                               self.ibmc_client)
         return self._bios_client
 
     @property
@@ -60,6 +86,10 @@ class IbmcSystemClient(BaseApiClient):
         """Get iBMC out-band storage client
         :return:
         """
+        if self._storage_client is None:
+            from ibmc_client.api.system.storage import IBMCStorageClient
+            self._storage_client = IBMCStorageClient(self.connector,
+                                                     self.ibmc_client)
         return self._storage_client
 
     @property
@@ -67,6 +97,10 @@ class IbmcSystemClient(BaseApiClient):
         """Get iBMC volume client
         :return:
         """
+        if self._volume_client is None:
+            from ibmc_client.api.system.volume import IbmcVolumeClient
+            self._volume_client = IbmcVolumeClient(self.connector,
+                                                   self.ibmc_client)
         return self._volume_client
 
     def reset(self, reset_type):
@@ -102,3 +136,10 @@ class IbmcSystemClient(BaseApiClient):
         self.connector.request(PATCH, self.connector.system_base_url,
                                json=payload)
         LOG.debug('Set iBMC boot source override succeed')
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # module `__getattr__` is not supported (PEP 562), import eagerly
+    for _name in _LAZY_ATTRIBUTES:
+        __getattr__(_name)
+    del _name
@@ -12,17 +12,29 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 # Version 0.0.3
+import functools
 import logging
 import time
+import typing
 from collections import defaultdict
 from functools import cmp_to_key
 from itertools import groupby
 
 import six
 
-from ibmc_client import raid_utils, exceptions, constants
+from ibmc_client import raid_utils, exceptions, constants, utils
+from ibmc_client import raid_trace
 from ibmc_client.api import BaseApiClient
+from ibmc_client.resources.system import System
 from ibmc_client.resources.system.storage import Storage
+from ibmc_client.resources.system.storage import StorageSnapshot
+from ibmc_client.waiter import Waiter
+
+if typing.TYPE_CHECKING:
+    # used by type comments only
+    from ibmc_client.resources.chassis.drive import Drive  # noqa: F401
+    from ibmc_client.resources.system.storage import Volume  # noqa: F401
+    from ibmc_client.waiter import Deadline  # noqa: F401
 
 LOG = logging.getLogger(__name__)
 
@@ -30,6 +42,9 @@ LOG = logging.getLogger(__name__)
 class LogicalDisk(object):
     MAX_CAPACITY = -1
 
+    CAPACITY_BYTES_TOLERANCE = 1024 * 1024 * 1024
+    """max capacity bytes difference when matches an exists volume"""
+
     controller = None
     """controller model"""
     volume_name = None
@@ -92,6 +107,11 @@ class LogicalDisk(object):
 
         self.use_shareable_disk_group = False
 
+    @property
+    def config(self):
+        """the logical disk JSON dictionary this logical disk built from"""
+        return self._logical_disk
+
     @property
     def is_jbod_mode(self):
         return self.raid_setting.name == raid_utils.JBOD
@@ -157,12 +177,7 @@ class LogicalDisk(object):
             object
         :return:
         """
-        # disks that are excludable and matches required
-        #   "media type" and "protocol"
-        excludable_disks = [
-            d for d in physical_disks
-            if d.drive.matches(d.drive.id, media_type=self._media_type,
-                               protocol=self._protocol) and d.is_excludable]
+        excludable_disks = self.get_excludable_disks(physical_disks)
 
         # non-share and use specified disks (2 cases, both size int and max)
         if not self.share_physical_disks and self.use_specified_disks:
@@ -180,10 +195,7 @@ class LogicalDisk(object):
                 solution = self.raid_setting.get_best_matched_disks(
                     self.capacity_bytes, specified_disks, len(specified_disks))
                 if solution:
-                    self.span_number = solution.span
-                    for disk in solution.disks:
-                        disk.mark_as_exclusive()
-                        self.drives.append(disk.drive_id)
+                    self.use_exclusive_solution(solution)
                 else:
                     raise exceptions.SpecifiedDisksHasNotEnoughSpace(
                         size=self._size_gb, raid=self.raid_setting.key)
@@ -198,10 +210,7 @@ class LogicalDisk(object):
                     self.capacity_bytes, excludable_disks,
                     self.number_of_physical_disks)
                 if solution:
-                    self.span_number = solution.span
-                    for disk in solution.disks:
-                        disk.mark_as_exclusive()
-                        self.drives.append(disk.drive_id)
+                    self.use_exclusive_solution(solution)
                 else:
                     raise exceptions.LackOfDiskSpace()
             except exceptions.IBMCClientError as e:
@@ -264,6 +273,36 @@ class LogicalDisk(object):
                 raise exceptions.InvalidLogicalDiskConfig(
                     config=self._logical_disk, reason=str(e))
 
+    def get_excludable_disks(
+            self,
+            physical_disks  # type: list[raid_utils.PhysicalDisk]
+    ):
+        # type: (...) -> list[raid_utils.PhysicalDisk]
+        """get disks that are excludable and matches required "media type"
+        and "protocol"
+
+        :param physical_disks: a list of exists physical disk object
+        :return: a list of excludable physical disk object
+        """
+        return [d for d in physical_disks
+                if d.drive.matches(d.drive.id, media_type=self._media_type,
+                                   protocol=self._protocol)
+                and d.is_excludable]
+
+    def use_exclusive_solution(self, solution):
+        # type: (raid_utils.RaidSolution) -> None
+        """use a physical disks exclusive solution
+        - update drives & span number
+        - mark used drives as exclusive
+
+        :param solution:
+        :return:
+        """
+        self.span_number = solution.span
+        for disk in solution.disks:
+            disk.mark_as_exclusive()
+            self.drives.append(disk.drive_id)
+
     def use_shareable_solution(
             self,
             solution,  # type: raid_utils.RaidSolution
@@ -377,6 +416,48 @@ class LogicalDisk(object):
         elif self.raid_setting.name == raid_utils.RAID10:
             self.span_number = len(self.drives) >> 1
 
+    def matches_volume(self, volume, drives):
+        # type: (Volume, list[Drive]) -> bool
+        """check whether an exists volume satisfies this logical disk.
+
+        Volume name, raid level, capacity and physical disks are compared,
+        option not specified by logical disk matches any value.
+
+        :param volume: indicates the exists volume
+        :param drives: indicates all drives of the controller
+        :return: true if matches else false
+        """
+        if self.volume_name and self.volume_name != volume.volume_oem_name:
+            return False
+
+        if self.raid_setting.name != volume.raid_level:
+            return False
+
+        if not self.auto_scale:
+            if volume.capacity_bytes is None:
+                return False
+            diff = abs(volume.capacity_bytes - self.capacity_bytes)
+            if diff > self.CAPACITY_BYTES_TOLERANCE:
+                return False
+
+        volume_drives = [drive for drive in drives if drive.odata_id
+                         in volume.drive_odata_id_collection]
+        if not all(drive.matches(drive.id, media_type=self._media_type,
+                                 protocol=self._protocol)
+                   for drive in volume_drives):
+            return False
+
+        if self.use_specified_disks:
+            if len(self._physical_disks) != len(volume_drives):
+                return False
+            return all(any(drive.matches(hint) for drive in volume_drives)
+                       for hint in self._physical_disks)
+
+        if self.number_of_physical_disks:
+            return self.number_of_physical_disks == len(volume_drives)
+
+        return True
+
     def to_create_volume_payload(self):
         capacity_bytes = (None if self.capacity_bytes == self.MAX_CAPACITY else
                           self.capacity_bytes)
@@ -447,7 +528,8 @@ def sort_and_group_pending_logical_disk_list(logical_disks):
 
 
 def build_disk_groups(ctrl):
-    disk_groups = []
+    # type: (Storage) -> raid_utils.PhysicalDiskGroupList
+    disk_groups = raid_utils.PhysicalDiskGroupList()
     for volume in ctrl.volumes():
         disk_group = next((dg for dg in disk_groups
                            if dg.owns_volume(volume)), None)
@@ -460,9 +542,308 @@ def build_disk_groups(ctrl):
     return disk_groups
 
 
+def order_pending_volumes(pending_volumes):
+    # type: (list[LogicalDisk]) -> list[LogicalDisk]
+    """order pending volumes of a controller in the order that disks should
+    be assigned to them.
+
+    :param pending_volumes: indicates pending volumes of a controller
+    :return: ordered pending volumes
+    """
+    ordered_pending_volumes = []
+    """
+    step1:: handle volumes (2 cases)
+        [x] share physical disks
+        [o] specified physical disks
+        [o] size "max|int"
+
+    Notes::
+        - make sure all specified disks has not been used
+        - make sure all specified disks will not be used later
+    """
+    ordered_pending_volumes.extend([v for v in pending_volumes
+                                    if not v.share_physical_disks
+                                    and v.use_specified_disks])
+
+    """
+    step2:: handle volumes (1 cases)
+        [x] share physical disks
+        [x] specified physical disks
+        [o] size "int"
+    Notes::
+        - use disks which waste as less as better
+        - make sure all specified disks has not been used
+        - make sure all specified disks will not be used later
+    """
+    ordered_pending_volumes.extend([v for v in pending_volumes
+                                    if not v.share_physical_disks
+                                    and not v.use_specified_disks
+                                    and not v.auto_scale])
+
+    """
+    step3:: handle volumes (1 cases)
+        [o] share physical disks
+        [o] specified physical disks
+        [o] size "int"
+    """
+    ordered_pending_volumes.extend([v for v in pending_volumes
+                                    if v.share_physical_disks
+                                    and v.use_specified_disks
+                                    and not v.auto_scale])
+
+    """
+    step4:: handle volumes (1 cases)
+        [o] share physical disks
+        [o] specified physical disks
+        [o] size "max"
+    """
+    ordered_pending_volumes.extend([v for v in pending_volumes
+                                    if v.share_physical_disks
+                                    and v.use_specified_disks
+                                    and v.auto_scale])
+
+    """
+    step5:: handle volumes (1 cases)
+        [o] share physical disks
+        [x] specified physical disks
+        [o] size "int"
+    """
+    ordered_pending_volumes.extend([v for v in pending_volumes
+                                    if v.share_physical_disks
+                                    and not v.use_specified_disks
+                                    and not v.auto_scale])
+
+    """
+    step6:: handle volumes (1 cases)
+        [o] share physical disks
+        [x] specified physical disks
+        [o] size "max"
+    Notes::
+        (?) Is this case really exists?
+    """
+    ordered_pending_volumes.extend([v for v in pending_volumes
+                                    if v.share_physical_disks
+                                    and not v.use_specified_disks
+                                    and v.auto_scale])
+
+    """
+    step7:: handle volumes (1 cases)
+        [x] share physical disks
+        [x] specified physical disks
+        [o] size "max"
+    """
+    ordered_pending_volumes.extend([
+        v for v in pending_volumes if (not v.share_physical_disks
+                                       and not v.use_specified_disks
+                                       and v.auto_scale)])
+
+    return ordered_pending_volumes
+
+
+def prepare_pending_volumes(logical_disks, controllers):
+    # type: (list[dict], list[Storage]) -> dict
+    """build pending volumes of logical disks and group them by controller
+
+    :param logical_disks: a list of JSON dictionaries which represents the
+        logical disks, check `IBMCStorageClient.apply_raid_configuration`
+    :param controllers: indicates all controllers of the server
+    :return: a dict of controller id and pending volumes of the controller
+    """
+    groups = defaultdict(list)  # type: dict(str, list[LogicalDisk])
+    for logical_disk in logical_disks:
+        pending_volume = LogicalDisk(logical_disk)
+        pending_volume.init_ctrl(controllers)
+        groups[pending_volume.controller.id].append(pending_volume)
+    IBMCStorageClient.validate_pending_volumes(groups)
+    return groups
+
+
+def assign_disks(ctrl, pending_volumes, planner=None, cache=None):
+    # type: (Storage, list[LogicalDisk], object, object) -> list[LogicalDisk]
+    """assign disks of a controller to its pending volumes
+
+    :param ctrl: indicates the storage controller
+    :param pending_volumes: indicates pending volumes of the controller
+    :param planner: indicates the
+        :class:`~ibmc_client.raid_planner.RaidPlanner` to use, disks are
+        assigned in the greedy way if not present
+    :param cache: indicates the
+        :class:`~ibmc_client.raid_cache.RaidPlanCache` to reuse assignments
+        of controllers with same hardware profile
+    :return: pending volumes in the order they should be created
+    """
+    if cache is not None:
+        return cache.assign(ctrl, pending_volumes, planner,
+                            functools.partial(assign_disks, ctrl,
+                                              pending_volumes, planner))
+
+    share_disk_enabled = any(v.share_physical_disks for v in pending_volumes)
+    disk_groups = (build_disk_groups(ctrl) if share_disk_enabled
+                   else raid_utils.PhysicalDiskGroupList())
+    physical_disks = [raid_utils.PhysicalDisk(drive)
+                      for drive in ctrl.drives()]
+
+    ordered_pending_volumes = order_pending_volumes(pending_volumes)
+    if planner:
+        planner.plan(ordered_pending_volumes, physical_disks, disk_groups)
+        return ordered_pending_volumes
+
+    trace = raid_trace.current()
+    for pending_volume in ordered_pending_volumes:
+        try:
+            pending_volume.init_disks(physical_disks, disk_groups)
+        except exceptions.InvalidLogicalDiskConfig as e:
+            trace.record('assign_failed', controller=ctrl.id,
+                         logical_disk=str(pending_volume), reason=str(e))
+            raise
+        if trace.enabled:
+            trace.record('assigned', controller=ctrl.id,
+                         logical_disk=str(pending_volume),
+                         drives=list(pending_volume.drives),
+                         span=pending_volume.span_number,
+                         shared=pending_volume.use_shareable_disk_group)
+    return ordered_pending_volumes
+
+
+class RaidPlan(object):
+    """RAID configuration planned for a server without applying it"""
+
+    def __init__(self, controllers):
+        # type: (list[Storage]) -> None
+        self.controllers = controllers
+        self.jbod_controllers = []
+        """controllers which should be set to JBOD mode"""
+        self.pending_volumes = []
+        """pending volumes with disks assigned, in creation order"""
+
+    @property
+    def volumes(self):
+        # type: () -> list[dict]
+        """volumes to create, every volume is a dict like::
+
+            {
+                "controller": "RAIDStorage0",
+                "volume_name": "os",
+                "raid_level": "RAID1",
+                "span": 1,
+                "capacity_bytes": 107374182400,
+                "drives": ["Disk0", "Disk1"],
+                "payload": {...}
+            }
+
+        `payload` is the keyword arguments of
+        :meth:`~ibmc_client.api.system.volume.IBMCVolumeClient.create`,
+        `drives` holds resource id of drives while payload holds drive id.
+        """
+        volumes = []
+        for pending_volume in self.pending_volumes:
+            payload = pending_volume.to_create_volume_payload()
+            drive_ids = dict((drive.drive_id, drive.id) for drive
+                             in pending_volume.controller.drives())
+            volumes.append({
+                'controller': pending_volume.controller.id,
+                'volume_name': payload['volume_name'],
+                'raid_level': payload['raid_level'],
+                'span': payload['span'],
+                'capacity_bytes': payload['capacity_bytes'],
+                'drives': [drive_ids.get(_, _) for _ in payload['drives']],
+                'payload': payload,
+            })
+        return volumes
+
+    def to_dict(self):
+        # type: () -> dict
+        """get a JSON serializable view of the plan"""
+        return {
+            'jbod_controllers': [ctrl.id for ctrl in self.jbod_controllers],
+            'volumes': self.volumes,
+        }
+
+
+def plan_raid_configuration(
+        logical_disks,  # type: list[dict]
+        controllers,  # type: list
+        planner=None,  # type: object
+        trace=None,  # type: raid_trace.PlanTrace
+        cache=None  # type: object
+):
+    # type: (...) -> RaidPlan
+    """plan RAID configuration without applying it
+
+    Nothing is sent to iBMC, controllers could be loaded ones, snapshots
+    taken by `Storage.snapshot` or plain descriptions (check
+    `StorageSnapshot.from_description`), so RAID configuration could be
+    planned and validated offline.
+
+    :param logical_disks: a list of JSON dictionaries which represents the
+        logical disks, check `IBMCStorageClient.apply_raid_configuration`
+    :param controllers: indicates all controllers of the server
+    :param planner: indicates the
+        :class:`~ibmc_client.raid_planner.RaidPlanner` to use, disks are
+        assigned in the greedy way if not present
+    :param trace: indicates the
+        :class:`~ibmc_client.raid_trace.RecordingPlanTrace` to record
+        candidates and decisions of planning to
+    :param cache: indicates the
+        :class:`~ibmc_client.raid_cache.RaidPlanCache` to reuse assignments
+        of controllers with same hardware profile
+    :raises: same errors as `IBMCStorageClient.apply_raid_configuration`
+        when logical disks could not be satisfied
+    :return: the planned :class:`RaidPlan`
+    """
+    controllers = [ctrl if isinstance(ctrl, Storage)
+                   else StorageSnapshot.load(ctrl)
+                   for ctrl in controllers]
+    plan = RaidPlan(controllers)
+    with raid_trace.using(trace):
+        groups = prepare_pending_volumes(logical_disks, controllers)
+        for (ctrl_id, pending_volumes) in groups.items():
+            ctrl = pending_volumes[0].controller
+            if any(v.is_jbod_mode for v in pending_volumes):
+                plan.jbod_controllers.append(ctrl)
+                continue
+            plan.pending_volumes.extend(
+                assign_disks(ctrl, pending_volumes, planner, cache))
+    return plan
+
+
+def waiting_storage_ready_for_all(storage_clients, waiter=None,
+                                  deadline=None):
+    # type: (list[IBMCStorageClient], Waiter, Deadline) -> None
+    """wait until storage of all iBMC servers ready.
+
+    All servers are polled by current thread, so there is no need to spawn
+    a thread per server.
+
+    :param storage_clients: indicates storage clients of iBMC servers
+    :param waiter: indicates the waiter to use, default
+        `storage_ready_waiter` of first storage client
+    :param deadline: indicates the deadline applied to all servers
+    :raises: exceptions.WaitTimeout when any storage is still not ready
+        before waiter times out
+    :raises: exceptions.DeadlineExceeded when any storage is still not ready
+        when deadline expires
+    """
+    if not storage_clients:
+        return
+
+    def is_storage_ready(client):
+        with client.connector.using_deadline(deadline):
+            return client.is_storage_ready()
+
+    waiter = waiter or storage_clients[0].storage_ready_waiter
+    conditions = dict((client.connector.address,
+                       functools.partial(is_storage_ready, client))
+                      for client in storage_clients)
+    waiter.wait_all(conditions, 'storage ready', deadline=deadline)
+
+
 class IBMCStorageClient(BaseApiClient):
     """iBMC storage API Client"""
 
+    USE_FIXED_RAID_TASK_EFFECT_DELAY = False
+    """sleep a fixed delay after RAID tasks instead of verifying effect"""
+
     def __init__(self, connector, ibmc_client=None):
         """Initial a iBMC System storage Resource Client
 
@@ -471,6 +852,16 @@ class IBMCStorageClient(BaseApiClient):
             :class:`~ibmc_client.IBMCClient` object
         """
         super(IBMCStorageClient, self).__init__(connector, ibmc_client)
+        self.storage_ready_waiter = Waiter(
+            constants.STORAGE_READY_TIMEOUT_SECONDS,
+            constants.STORAGE_READY_CHECK_INTERVAL_SECONDS,
+            max_interval=constants.STORAGE_READY_MAX_CHECK_INTERVAL_SECONDS,
+            backoff=2)
+        """waiter used when waiting until storage ready"""
+        self.raid_task_effect_waiter = Waiter(
+            constants.RAID_TASK_EFFECT_TIMEOUT_SECONDS,
+            constants.RAID_TASK_EFFECT_CHECK_INTERVAL_SECONDS)
+        """waiter used when waiting until RAID tasks take effect"""
 
     def list(self):
         # type: () -> list[Storage]
@@ -493,45 +884,92 @@ class IBMCStorageClient(BaseApiClient):
         url = '%s/Storages/%s' % (self.connector.system_base_url, storage_id)
         return self.load_odata(url, Storage)
 
-    def delete_all_raid_configuration(self):
+    def delete_all_raid_configuration(self, deadline=None):
         """Delete all RAID configuration.
 
+        RAID controllers are torn down concurrently, volumes of the same
+        controller are still deleted one by one. After all deletions take
+        effect, drives which have anything to restore are restored
+        concurrently.
+
+        :param deadline: indicates the deadline of the whole operation, it is
+            applied to every poll and request of the operation
+        :raises: exceptions.DeadlineExceeded when deadline expires
+        :raises: exceptions.OperationCancelled when deadline is cancelled
         :return:
         """
+        with self.connector.using_deadline(deadline):
+            self._delete_all_raid_configuration()
+
+    def _delete_all_raid_configuration(self):
         LOG.info("Start delete all RAID configuration.")
 
         # waiting until storage ready
         self.waiting_storage_ready()
 
         storage_collection = self.list()
+        if not storage_collection:
+            LOG.info("No Storage present in this server.")
+            return
+
         for storage in storage_collection:
             if not storage.support_oob:
                 raise exceptions.ControllerNotSupportOOB(
                     controller=storage.controller_name)
-            LOG.info("Start delete RAID configuration for %s.", storage.id)
-
-            # we do not need to restore storage
-            # restore RAID controller
-            # storage.restore()
-            # storage.set(copy_back=True, smarter_copy_back=True, jbod=False)
 
-            # delete volume collection of RAID controller
-            storage.delete_volume_collection()
-
-            # restore all drives
-            for drive in storage.drives():
+        # deadline is thread local, pass it to worker threads
+        deadline = self.connector.deadline
+
+        def delete_volumes(storage):
+            with self.connector.using_deadline(deadline):
+                LOG.info("Start delete RAID configuration for %s.",
+                         storage.id)
+                # we do not need to restore storage
+                # restore RAID controller
+                # storage.restore()
+                # storage.set(copy_back=True, smarter_copy_back=True,
+                #             jbod=False)
+                return storage.delete_volume_collection(wait_effect=False)
+
+        workers = constants.MAX_PARALLEL_WORKERS_PER_IBMC
+        deleted_list = utils.parallel_map(delete_volumes, storage_collection,
+                                          workers)
+
+        # wait until deletions of all controllers take effect at once
+        effects = [(storage, None, deleted) for (storage, deleted)
+                   in zip(storage_collection, deleted_list) if deleted]
+        if effects:
+            self.wait_raid_tasks_effect(effects)
+
+        # reload drives, their state and etag may have changed
+        def reload_drives(storage):
+            with self.connector.using_deadline(deadline):
+                return storage.drives(force_reload=True)
+
+        def restore(drive):
+            with self.connector.using_deadline(deadline):
                 drive.restore()
 
-            LOG.info("Delete RAID configuration for %s done.", storage.id)
-
-        if not storage_collection:
-            LOG.info("No Storage present in this server.")
+        drives_list = utils.parallel_map(reload_drives, storage_collection,
+                                         workers)
+        drives_to_restore = [drive for drives in drives_list
+                             for drive in drives if drive.need_restore]
+        LOG.info("Start restore drives:: %s.",
+                 [drive.id for drive in drives_to_restore])
+        utils.parallel_map(restore, drives_to_restore, workers)
 
+        for storage in storage_collection:
+            LOG.info("Delete RAID configuration for %s done.", storage.id)
         LOG.info("Delete all RAID configuration done.")
 
-    def apply_raid_configuration(self, logical_disks):
+    def apply_raid_configuration(self, logical_disks, reconcile=False,
+                                 deadline=None, planner=None, trace=None,
+                                 cache=None):
         """Apply RAID configuration.
 
+        Different RAID controllers are configured concurrently, volumes of
+        the same controller are created one by one.
+
         :param logical_disks: a list of JSON dictionaries which represents
             the logical disks to be created. The JSON dictionary should match
             the (ibmc_client.raid_config_schema.json) scheme. check
@@ -564,8 +1002,36 @@ class IBMCStorageClient(BaseApiClient):
                 .....
               ]
 
+        :param reconcile: when true, exists volumes are kept if they match
+            any logical disk (check `LogicalDisk.matches_volume`), volumes
+            not matched are deleted and only missing logical disks are
+            created. Otherwise, caller should make sure all existing RAID
+            configuration has been deleted.
+        :param deadline: indicates the deadline of the whole operation, it is
+            applied to every poll and request of the operation
+        :param planner: indicates the
+            :class:`~ibmc_client.raid_planner.RaidPlanner` used to assign
+            disks to all logical disks of a controller together, logical
+            disks are assigned one by one in the greedy way if not present
+        :param trace: indicates the
+            :class:`~ibmc_client.raid_trace.RecordingPlanTrace` to record
+            candidates and decisions of disk assignment to, it could be
+            exported for post-mortem when a plan fails or surprises
+        :param cache: indicates the
+            :class:`~ibmc_client.raid_cache.RaidPlanCache` to reuse disk
+            assignments of controllers with same hardware profile, it could
+            be shared by all servers
+        :raises: exceptions.DeadlineExceeded when deadline expires
+        :raises: exceptions.OperationCancelled when deadline is cancelled
         :return:
         """
+        with self.connector.using_deadline(deadline), \
+                raid_trace.using(trace):
+            self._apply_raid_configuration(logical_disks, reconcile, planner,
+                                           cache)
+
+    def _apply_raid_configuration(self, logical_disks, reconcile, planner,
+                                  cache):
         LOG.info('Start apply RAID configuration:: %(logical_disks)s',
                  {'logical_disks': logical_disks})
 
@@ -575,146 +1041,222 @@ class IBMCStorageClient(BaseApiClient):
         # load all controllers
         controllers = self.list()
 
-        # prepare pending volume list
-        pending_volume_list = []
-        for logical_disk in logical_disks:
-            logical_disk = LogicalDisk(logical_disk)
-            logical_disk.init_ctrl(controllers)
-            pending_volume_list.append(logical_disk)
+        # prepare and validate pending volume list
+        groups = prepare_pending_volumes(logical_disks, controllers)
 
-        groups = defaultdict(list)  # type: dict(str, list[LogicalDisk])
-        for pending_volume in pending_volume_list:
-            groups[pending_volume.controller.id].append(pending_volume)
-        # validate volumes
-        self.validate_pending_volumes(groups)
+        # controllers are independent hardware, configure them concurrently.
+        # volumes of the same controller are still created one by one.
+        trace = raid_trace.current()
+        deadline = self.connector.deadline
 
-        # assign drives for not specified volumes
-        for (ctrl_id, pending_volumes) in groups.items():
+        def configure(group):
+            (ctrl_id, pending_volumes) = group
             ctrl = next(ctrl for ctrl in controllers if ctrl.id == ctrl_id)
-            jbod_mode = any(v.is_jbod_mode for v in pending_volumes)
-
-            # handle JBOD mode
-            if jbod_mode:
+            # trace and deadline are thread local, pass them to worker
+            # threads
+            with raid_trace.using(trace), \
+                    self.connector.using_deadline(deadline):
+                self._configure_controller(ctrl, pending_volumes, reconcile,
+                                           planner, cache)
+
+        utils.parallel_map(configure, groups.items(),
+                           constants.MAX_PARALLEL_WORKERS_PER_IBMC)
+
+    def _configure_controller(self, ctrl, pending_volumes, reconcile, planner,
+                              cache):
+        # handle JBOD mode
+        if any(v.is_jbod_mode for v in pending_volumes):
+            if reconcile and ctrl.is_jbod_mode:
+                LOG.info('Storage %s is in JBOD mode already.', ctrl.id)
+            else:
                 ctrl.set(jbod=True)
+            return
+
+        if reconcile:
+            pending_volumes = self.reconcile_volumes(ctrl, pending_volumes)
+            if not pending_volumes:
+                return
+
+        # assign drives for not specified volumes
+        ordered_pending_volumes = assign_disks(ctrl, pending_volumes,
+                                               planner, cache)
+        for pending_volume in ordered_pending_volumes:
+            volume_id = self.ibmc_client.system.volume.create(
+                **pending_volume.to_create_volume_payload())
+            self.wait_raid_task_effect(ctrl, created=[volume_id])
+
+    def plan_raid_configuration(self, logical_disks, planner=None,
+                                trace=None, cache=None):
+        # type: (list[dict], object, raid_trace.PlanTrace, object) -> RaidPlan
+        """plan RAID configuration against current controllers without
+        applying it.
+
+        Controllers and drives are loaded from iBMC, but nothing is changed.
+        Planned volumes are same as what `apply_raid_configuration` creates
+        when all exists RAID configuration has been deleted.
+
+        :param logical_disks: a list of JSON dictionaries which represents
+            the logical disks, check `apply_raid_configuration`
+        :param planner: indicates the
+            :class:`~ibmc_client.raid_planner.RaidPlanner` to use, disks are
+            assigned in the greedy way if not present
+        :param trace: indicates the
+            :class:`~ibmc_client.raid_trace.RecordingPlanTrace` to record
+            candidates and decisions of planning to
+        :param cache: indicates the
+            :class:`~ibmc_client.raid_cache.RaidPlanCache` to reuse disk
+            assignments of controllers with same hardware profile
+        :return: the planned :class:`RaidPlan`
+        """
+        LOG.info('Start plan RAID configuration:: %(logical_disks)s',
+                 {'logical_disks': logical_disks})
+        return plan_raid_configuration(logical_disks, self.list(), planner,
+                                       trace, cache)
+
+    def reconcile_volumes(self, ctrl, pending_volumes):
+        # type: (Storage, list[LogicalDisk]) -> list[LogicalDisk]
+        """keep exists volumes which match pending volumes and delete others.
+
+        :param ctrl: indicates the storage controller
+        :param pending_volumes: indicates pending volumes of the controller
+        :return: pending volumes which has no matched volume and should be
+            created
+        """
+        volumes = list(ctrl.volumes(force_reload=True))
+        drives = ctrl.drives()
+
+        # volumes with specified disks are matched first, they are stricter
+        missing = []
+        for pending_volume in sorted(pending_volumes,
+                                     key=lambda v: not v.use_specified_disks):
+            volume = next((v for v in volumes
+                           if pending_volume.matches_volume(v, drives)), None)
+            if volume is None:
+                missing.append(pending_volume)
                 continue
 
-            share_disk_enabled = any(v.share_physical_disks
-                                     for v in pending_volumes)
-            disk_groups = build_disk_groups(ctrl) if share_disk_enabled else []
-            physical_disks = [raid_utils.PhysicalDisk(drive)
-                              for drive in ctrl.drives()]
-
-            # handle other RAID levels
-            ordered_pending_volumes = []
-            """
-            step1:: handle volumes (2 cases)
-                [x] share physical disks
-                [o] specified physical disks
-                [o] size "max|int"
-
-            Notes::
-                - make sure all specified disks has not been used
-                - make sure all specified disks will not be used later
-            """
-            ordered_pending_volumes.extend([v for v in pending_volumes
-                                            if not v.share_physical_disks
-                                            and v.use_specified_disks])
-
-            """
-            step2:: handle volumes (1 cases)
-                [x] share physical disks
-                [x] specified physical disks
-                [o] size "int"
-            Notes::
-                - use disks which waste as less as better
-                - make sure all specified disks has not been used
-                - make sure all specified disks will not be used later
-            """
-            ordered_pending_volumes.extend([v for v in pending_volumes
-                                            if not v.share_physical_disks
-                                            and not v.use_specified_disks
-                                            and not v.auto_scale])
-
-            """
-            step3:: handle volumes (1 cases)
-                [o] share physical disks
-                [o] specified physical disks
-                [o] size "int"
-            """
-            ordered_pending_volumes.extend([v for v in pending_volumes
-                                            if v.share_physical_disks
-                                            and v.use_specified_disks
-                                            and not v.auto_scale])
-
-            """
-            step4:: handle volumes (1 cases)
-                [o] share physical disks
-                [o] specified physical disks
-                [o] size "max"
-            """
-            ordered_pending_volumes.extend([v for v in pending_volumes
-                                            if v.share_physical_disks
-                                            and v.use_specified_disks
-                                            and v.auto_scale])
-
-            """
-            step5:: handle volumes (1 cases)
-                [o] share physical disks
-                [x] specified physical disks
-                [o] size "int"
-            """
-            ordered_pending_volumes.extend([v for v in pending_volumes
-                                            if v.share_physical_disks
-                                            and not v.use_specified_disks
-                                            and not v.auto_scale])
-
-            """
-            step6:: handle volumes (1 cases)
-                [o] share physical disks
-                [x] specified physical disks
-                [o] size "max"
-            Notes::
-                (?) Is this case really exists?
-            """
-            ordered_pending_volumes.extend([v for v in pending_volumes
-                                            if v.share_physical_disks
-                                            and not v.use_specified_disks
-                                            and v.auto_scale])
-
-            """
-            step7:: handle volumes (1 cases)
-                [x] share physical disks
-                [x] specified physical disks
-                [o] size "max"
-            """
-            ordered_pending_volumes.extend([
-                v for v in pending_volumes if (not v.share_physical_disks
-                                               and not v.use_specified_disks
-                                               and v.auto_scale)])
-
-            for pending_volume in ordered_pending_volumes:
-                pending_volume.init_disks(physical_disks, disk_groups)
-
-            for pending_volume in ordered_pending_volumes:
-                self.ibmc_client.system.volume.create(
-                    **pending_volume.to_create_volume_payload())
-                time.sleep(constants.RAID_TASK_EFFECT_SECONDS)
-
-    def waiting_storage_ready(self):
-        # waiting util storage ready
-        LOG.info('Waiting until storage ready.')
-        while True:
+            volumes.remove(volume)
+            LOG.info('Exists volume %(volume)s matches logical disk '
+                     '%(logical_disk)s, keep it.',
+                     {'volume': volume.odata_id,
+                      'logical_disk': pending_volume})
+            if pending_volume.bootable and not volume.bootable:
+                self.ibmc_client.system.volume.set_bootable(volume.odata_id,
+                                                            True)
+
+        if volumes:
+            deleted = []
+            for volume in volumes:
+                LOG.info('Exists volume %s matches no logical disk, delete '
+                         'it.', volume.odata_id)
+                task = self.ibmc_client.system.volume.delete_by_odata_id(
+                    volume.odata_id)
+                task.raise_if_failed()
+                deleted.append(volume.odata_id)
+            self.wait_raid_task_effect(ctrl, deleted=deleted)
+            # drives are released and volumes changed
+            ctrl.drives(force_reload=True)
+            ctrl.volumes(force_reload=True)
+
+        return [v for v in pending_volumes if v in missing]
+
+    def wait_raid_task_effect(self, storage, created=None, deleted=None):
+        # type: (Storage, list[str], list[str]) -> None
+        """wait until volume creation or deletion tasks take effect.
+
+        Creation takes effect when the created volumes are visible in the
+        volume collection of storage, deletion takes effect when the deleted
+        volumes are gone from it. In both cases the storage should be ready
+        for configuration again.
+
+        When `USE_FIXED_RAID_TASK_EFFECT_DELAY` is true, just sleep
+        `RAID_TASK_EFFECT_SECONDS` instead.
+
+        :param storage: indicates the storage which volumes belong to
+        :param created: indicates id or odata id list of created volumes
+        :param deleted: indicates id or odata id list of deleted volumes
+        :raises: exceptions.WaitTimeout when tasks do not take effect before
+            `raid_task_effect_waiter` times out
+        """
+        self.wait_raid_tasks_effect([(storage, created, deleted)])
+
+    def wait_raid_tasks_effect(self, effects):
+        # type: (list[tuple]) -> None
+        """wait until volume tasks of several storages take effect.
+
+        Same as `wait_raid_task_effect`, but storage ready is only checked
+        once per poll for all storages.
+
+        :param effects: a list of (storage, created, deleted) tuple
+        :raises: exceptions.WaitTimeout when tasks do not take effect before
+            `raid_task_effect_waiter` times out
+        """
+        if self.USE_FIXED_RAID_TASK_EFFECT_DELAY:
+            time.sleep(constants.RAID_TASK_EFFECT_SECONDS)
+            return
+
+        expectations = [
+            (storage,
+             set(_.split('/')[-1] for _ in (created or [])),
+             set(_.split('/')[-1] for _ in (deleted or [])))
+            for (storage, created, deleted) in effects]
+
+        def take_effect():
+            for (storage, created, deleted) in expectations:
+                present = set(odata_id.split('/')[-1] for odata_id
+                              in storage.load_volume_odata_id_list())
+                if not created.issubset(present) or deleted & present:
+                    return False
+            return self.is_storage_ready()
+
+        storage_ids = ', '.join(str(storage.id) for storage, _, _ in effects)
+        self.raid_task_effect_waiter.wait(
+            take_effect, 'RAID tasks of storage %s take effect' % storage_ids,
+            deadline=self.connector.deadline)
+        LOG.info('RAID tasks of storage %s have taken effect.', storage_ids)
+
+    def is_storage_ready(self):
+        """check whether storage is ready for configuration
+
+        Notes:: only `Oem.Huawei.StorageConfigReady` is fetched when the
+        iBMC supports `$select` query. When query `StorageConfigReady` is not
+        supported by the iBMC, storage is treated as ready.
+
+        :return: true if ready else false
+        """
+        if self.connector.support_select_query:
+            url = ('%s?$select=Oem/Huawei/StorageConfigReady'
+                   % self.connector.system_base_url)
+            resp = self.connector.request(constants.GET, url)
+            system = System(resp, ibmc_client=self.ibmc_client)
+        else:
             system = self.ibmc_client.system.get()
-            try:
-                if system.is_storage_ready:
-                    LOG.info('Storage is ready.')
-                    break
-                LOG.info('Storage is not ready. waiting...')
-            except exceptions.FeatureNotSupported:
-                LOG.info('Query `IsStorageReady` feature is not supported, '
-                         'will treat it as ready now.')
-                break
-            time.sleep(30)
+
+        try:
+            return system.is_storage_ready
+        except exceptions.FeatureNotSupported:
+            LOG.info('Query `IsStorageReady` feature is not supported, '
+                     'will treat it as ready now.')
+            return True
+
+    def waiting_storage_ready(self, waiter=None, deadline=None):
+        """wait until storage ready
+
+        :param waiter: indicates the waiter to use, default
+            `storage_ready_waiter`
+        :param deadline: indicates the deadline, default the deadline applied
+            to connector
+        :raises: exceptions.WaitTimeout when storage is still not ready
+            before waiter times out
+        :raises: exceptions.DeadlineExceeded when storage is still not ready
+            when deadline expires
+        """
+        LOG.info('Waiting until storage ready.')
+        waiter = waiter or self.storage_ready_waiter
+        with self.connector.using_deadline(deadline):
+            waiter.wait(self.is_storage_ready, 'storage ready',
+                        deadline=self.connector.deadline)
+        LOG.info('Storage is ready.')
 
     @staticmethod
     def validate_pending_volumes(groups):
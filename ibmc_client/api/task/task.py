@@ -14,11 +14,11 @@
 
 # Version 0.0.3
 import logging
-from time import sleep
 
 from ibmc_client.api import BaseApiClient
 from ibmc_client import constants
 from ibmc_client.resources.task import Task
+from ibmc_client.waiter import Waiter
 
 LOG = logging.getLogger(__name__)
 
@@ -27,6 +27,7 @@ class IbmcTaskClient(BaseApiClient):
     """iBMC TaskService API Client"""
 
     RECHECK_TASK_DELAY_IN_SECONDS = 3
+    """max seconds between two checks of a task"""
 
     def __init__(self, connector, ibmc_client=None):
         """Initial a iBMC TaskService Resource Client
@@ -36,33 +37,86 @@ class IbmcTaskClient(BaseApiClient):
             :class:`~ibmc_client.IBMCClient` object
         """
         super(IbmcTaskClient, self).__init__(connector, ibmc_client)
+        self.task_waiter = Waiter(
+            constants.TASK_TIMEOUT_SECONDS,
+            constants.TASK_CHECK_INTERVAL_SECONDS,
+            max_interval=self.RECHECK_TASK_DELAY_IN_SECONDS, backoff=2)
+        """waiter used when waiting or watching tasks"""
 
     def get(self, task_id):
         url = '%s/Tasks/%s' % (self.connector.task_service_base_url, task_id)
         return self.load_odata(url, Task)
 
-    def wait_task_by_id(self, task_id):
+    def wait_task_by_id(self, task_id, waiter=None, deadline=None):
         """wait a task util it becomes stable.
 
         :param task_id: indicates id of task
+        :param waiter: indicates the waiter to use, default `task_waiter`
+        :param deadline: indicates the deadline, default the deadline applied
+            to connector
         :return: stable task
         """
-        task = self.get(task_id)
-        return self.wait_task(task)
+        with self.connector.using_deadline(deadline):
+            task = self.get(task_id)
+        return self.wait_task(task, waiter=waiter, deadline=deadline)
 
-    def wait_task(self, task):
+    def wait_task(self, task, waiter=None, deadline=None):
         """wait a task util it becomes stable.
 
         :param task: task it self
+        :param waiter: indicates the waiter to use, default `task_waiter`
+        :param deadline: indicates the deadline, default the deadline applied
+            to connector
+        :raises: exceptions.WaitTimeout when task is still processing before
+            waiter times out
+        :raises: exceptions.DeadlineExceeded when task is still processing
+            when deadline expires
         :return: stable task
         """
         LOG.info("Wait task util processed, task: %s.", task)
-        while True:
+        for task in self.watch(task, changes_only=True, waiter=waiter,
+                               deadline=deadline):
             if task.state in constants.TASK_STATUS_PROCESSING:
-                LOG.info("%s is still processing, will reload %d seconds "
-                         "later.", task, self.RECHECK_TASK_DELAY_IN_SECONDS)
-                sleep(self.RECHECK_TASK_DELAY_IN_SECONDS)
+                LOG.info("%s is still processing.", task)
+        LOG.info("%s has been processed.", task)
+        return task
+
+    def watch(self, task, changes_only=False, waiter=None, deadline=None):
+        """watch a task util it becomes stable.
+
+        The task is reloaded on the schedule of waiter. The interval backs
+        off to the max interval of waiter whether the percentage moves or
+        not, it restarts from the first interval only when the task state
+        changes, so long running tasks do not load the iBMC more.
+
+        :param task: task it self
+        :param changes_only: when true, only yield task snapshots whose state
+            or percentage differs from the previous yielded one
+        :param waiter: indicates the waiter to use, default `task_waiter`
+        :param deadline: indicates the deadline, default the deadline applied
+            to connector
+        :raises: exceptions.WaitTimeout when task is still processing before
+            waiter times out
+        :raises: exceptions.DeadlineExceeded when task is still processing
+            when deadline expires
+        :return: a generator of task snapshots, the last one is stable
+        """
+        waiter = waiter or self.task_waiter
+        deadline = deadline or self.connector.deadline
+        ticks = waiter.ticks('%s processed' % task, deadline=deadline)
+        next(ticks)
+        last_progress = None
+        while True:
+            progress = (task.state, task.percentage)
+            if progress != last_progress or not changes_only:
+                yield task
+            state_changed = (last_progress is not None
+                             and task.state != last_progress[0])
+            last_progress = progress
+
+            if task.state in constants.TASK_STATUS_PROCESSED:
+                return
+
+            ticks.send(state_changed)
+            with self.connector.using_deadline(deadline):
                 task = self.get(task.id)
-            elif task.state in constants.TASK_STATUS_PROCESSED:
-                LOG.info("%s has been processed.", task)
-                return task
@@ -0,0 +1,282 @@
+# Copyright 2020 HUAWEI, Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# Version 0.0.3
+"""Record iBMC HTTP exchanges to cassettes and replay them offline
+
+A cassette holds the exchanges of real iBMC servers, it is used to profile
+parsing, planning and client overhead on real payload shapes without lab
+access, and as fixture of regression benchmarks. Session tokens and
+passwords are sanitised before exchanges are recorded::
+
+    cassette = Cassette()
+    client = ibmc_client.connect(address, username, password,
+                                 adapter=RecordingAdapter(cassette))
+    with client:
+        client.system.storage.apply_raid_configuration(logical_disks)
+    cassette.save('apply-raid-v5.json')
+
+    cassette = Cassette.load('apply-raid-v5.json')
+    client = ibmc_client.connect(address, username, password,
+                                 adapter=ReplayAdapter(cassette))
+
+Exchanges are replayed in recorded order per method and path, so the same
+calls get the same responses whatever the concurrency of the client.
+"""
+import collections
+import datetime
+import io
+import json
+import threading
+import time
+
+import requests
+import six
+from requests import adapters
+from requests import structures
+from six.moves import http_client
+from six.moves.urllib import parse
+
+from ibmc_client import constants
+from ibmc_client import exceptions
+
+
+class Cassette(object):
+    """A list of recorded HTTP exchanges of iBMC servers
+
+    An interaction is a JSON dictionary like::
+
+        {"request": {"method": "GET", "path": "/redfish/v1/Systems/1",
+                     "body": null},
+         "response": {"status": 200, "headers": {"ETag": "W/\\"1a\\""},
+                      "body": "{...}", "elapsed": 0.052}}
+
+    Path is the URL path with query, responses are served whatever the
+    address of the server is.
+    """
+
+    FORMAT_VERSION = 1
+    """version of cassette file format"""
+
+    PLACEHOLDER = '******'
+    """placeholder of sanitised secrets"""
+
+    SANITIZED_HEADERS = (constants.HEADER_AUTH_TOKEN, 'Authorization',
+                         'Cookie', 'Set-Cookie')
+    """headers which hold secrets"""
+
+    SANITIZED_FIELDS = ('Password',)
+    """fields of JSON request payload which hold secrets"""
+
+    def __init__(self, interactions=None):
+        # type: (list[dict]) -> None
+        """Initial a cassette
+
+        :param interactions: indicates recorded interactions
+        """
+        self.interactions = list(interactions or [])
+        self._secrets = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.interactions)
+
+    def record(self, request, response, elapsed):
+        # type: (requests.PreparedRequest, requests.Response, float) -> None
+        """sanitise and record an exchange
+
+        :param request: indicates the prepared request
+        :param response: indicates the response of request
+        :param elapsed: indicates seconds taken by the exchange
+        """
+        body = _text(request.body)
+        with self._lock:
+            for header in self.SANITIZED_HEADERS:
+                for headers in (request.headers, response.headers):
+                    if headers.get(header):
+                        self._secrets.add(headers[header])
+            payload = _loads(body)
+            if isinstance(payload, dict):
+                self._secrets.update(
+                    payload[field] for field in self.SANITIZED_FIELDS
+                    if isinstance(payload.get(field), six.string_types)
+                    and payload[field])
+
+            url = parse.urlsplit(request.url)
+            headers = dict(
+                (name, self.PLACEHOLDER if name in self.SANITIZED_HEADERS
+                 else self._sanitize(value))
+                for (name, value) in response.headers.items()
+                if name.lower() not in _DROPPED_HEADERS)
+            self.interactions.append({
+                'request': {
+                    'method': request.method,
+                    'path': url.path + ('?' + url.query if url.query else ''),
+                    'body': self._sanitize(body),
+                },
+                'response': {
+                    'status': response.status_code,
+                    'headers': headers,
+                    'body': self._sanitize(_text(response.content)),
+                    'elapsed': round(elapsed, 6),
+                },
+            })
+
+    def _sanitize(self, text):
+        if not text:
+            return text
+        # replace long secrets first, a secret may contain another one
+        for secret in sorted(self._secrets, key=len, reverse=True):
+            text = text.replace(secret, self.PLACEHOLDER)
+        return text
+
+    def save(self, path):
+        """persist recorded interactions to a file as JSON
+
+        :param path: indicates the file path
+        """
+        with self._lock:
+            data = {'version': self.FORMAT_VERSION,
+                    'interactions': list(self.interactions)}
+        with io.open(path, 'w', encoding='utf-8') as fp:
+            fp.write(six.text_type(json.dumps(data, indent=1,
+                                              ensure_ascii=False)))
+
+    @staticmethod
+    def load(path):
+        # type: (str) -> Cassette
+        """load a cassette persisted by `save`
+
+        :param path: indicates the file path
+        :raises: ValueError when the file format version is not supported
+        :return: the cassette
+        """
+        with io.open(path, 'r', encoding='utf-8') as fp:
+            data = json.loads(fp.read())
+        if data.get('version') != Cassette.FORMAT_VERSION:
+            raise ValueError('Cassette %s of version %s is not supported.'
+                             % (path, data.get('version')))
+        return Cassette(data['interactions'])
+
+
+class RecordingAdapter(adapters.HTTPAdapter):
+    """A requests transport adapter which records exchanges to a cassette"""
+
+    def __init__(self, cassette, **kwargs):
+        # type: (Cassette, ...) -> None
+        """Initial a recording adapter
+
+        :param cassette: indicates the cassette to record to
+        :param kwargs: indicates arguments of requests HTTP adapter
+        """
+        super(RecordingAdapter, self).__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        started_at = time.time()
+        response = super(RecordingAdapter, self).send(request, **kwargs)
+        # read the content to include transfer time in the latency
+        response.content
+        self.cassette.record(request, response, time.time() - started_at)
+        return response
+
+
+class ReplayAdapter(adapters.BaseAdapter):
+    """A requests transport adapter which replays exchanges of a cassette
+
+    Interactions are matched by method and path, interactions of the same
+    method and path are replayed in recorded order.
+    """
+
+    def __init__(self, cassette, latency_scale=0):
+        # type: (Cassette, float) -> None
+        """Initial a replay adapter
+
+        :param cassette: indicates the cassette to replay
+        :param latency_scale: indicates the multiple of recorded latency
+            to wait before responding, 1 replays original latency, 0 (the
+            default) responds at once
+        """
+        super(ReplayAdapter, self).__init__()
+        self.cassette = cassette
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self.rewind()
+
+    def rewind(self):
+        """replay the cassette from the beginning again"""
+        queues = collections.defaultdict(collections.deque)
+        for interaction in self.cassette.interactions:
+            request = interaction['request']
+            queues[(request['method'], request['path'])].append(interaction)
+        with self._lock:
+            self._queues = queues
+
+    @property
+    def remaining(self):
+        # type: () -> int
+        """count of interactions not replayed yet"""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def send(self, request, stream=False, timeout=None, verify=True,
+             cert=None, proxies=None):
+        url = parse.urlsplit(request.url)
+        path = url.path + ('?' + url.query if url.query else '')
+        with self._lock:
+            queue = self._queues.get((request.method, path))
+            interaction = queue.popleft() if queue else None
+        if interaction is None:
+            raise exceptions.CassetteInteractionNotFound(
+                method=request.method, path=path)
+
+        recorded = interaction['response']
+        if self.latency_scale:
+            time.sleep(recorded['elapsed'] * self.latency_scale)
+
+        response = requests.Response()
+        response.status_code = recorded['status']
+        response.reason = http_client.responses.get(recorded['status'])
+        response.headers = structures.CaseInsensitiveDict(
+            recorded['headers'])
+        response._content = (recorded['body'] or '').encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.elapsed = datetime.timedelta(seconds=recorded['elapsed'])
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+_DROPPED_HEADERS = ('connection', 'keep-alive', 'content-length',
+                    'content-encoding', 'transfer-encoding')
+"""response headers which describe the transport, not the resource"""
+
+
+def _text(body):
+    if body is None:
+        return None
+    if isinstance(body, six.binary_type):
+        return body.decode('utf-8', 'replace')
+    return body
+
+
+def _loads(text):
+    try:
+        return json.loads(text) if text else None
+    except ValueError:
+        return None
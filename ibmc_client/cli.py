@@ -0,0 +1,385 @@
+# Copyright 2020 HUAWEI, Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# Version 0.0.3
+"""`ibmc` command, run operations on a fleet of iBMC servers
+
+Servers are read from an inventory file, one server per line as
+``address [username [password]]``, blank lines and lines start with ``#``
+are ignored. Servers are operated concurrently, every server is connected
+once, all steps of an operation share the session. A JSON line is written
+as soon as a server finishes::
+
+    $ export IBMC_USERNAME=admin IBMC_PASSWORD=***
+    $ ibmc -i hosts.txt -c 32 storage-summary
+    {"address": "https://10.1.1.1", "ok": true, "result": [...], ...}
+    $ ibmc -i hosts.txt run steps.json
+
+A steps file holds a list of steps, a step is a JSON dictionary of command
+and its arguments, like::
+
+    [{"command": "raid-delete"},
+     {"command": "raid-apply", "logical_disks": [...]},
+     {"command": "boot", "device": "Pxe"},
+     {"command": "power", "reset_type": "ForceRestart"}]
+
+The exit code is 0 when all servers succeed, 1 when any server fails.
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+import six
+from concurrent.futures import ThreadPoolExecutor
+
+import ibmc_client
+from ibmc_client import constants
+from ibmc_client.waiter import Deadline
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 16
+"""default max count of servers to operate concurrently"""
+
+ENV_USERNAME = 'IBMC_USERNAME'
+ENV_PASSWORD = 'IBMC_PASSWORD'
+
+
+def power_state(client):
+    return {'PowerState': client.system.get().power_state}
+
+
+def power(client, reset_type):
+    client.system.reset(reset_type)
+    return {'ResetType': reset_type}
+
+
+def boot(client, device, mode=None,
+         enabled=constants.BOOT_SOURCE_ENABLED_ONCE):
+    client.system.set_boot_source(device, mode=mode, enabled=enabled)
+    return {'BootSourceOverrideTarget': device,
+            'BootSourceOverrideMode': mode,
+            'BootSourceOverrideEnabled': enabled}
+
+
+def storage_summary(client):
+    return [ctrl.summary() for ctrl in client.system.storage.list()]
+
+
+def raid_apply(client, logical_disks, reconcile=False):
+    client.system.storage.apply_raid_configuration(logical_disks,
+                                                   reconcile=reconcile)
+
+
+def raid_delete(client):
+    client.system.storage.delete_all_raid_configuration()
+
+
+def task_wait(client, task_id):
+    task = client.task.wait_task_by_id(task_id)
+    task.raise_if_failed()
+    return {'Id': task.id, 'Name': task.name, 'TaskState': task.state,
+            'TaskPercentage': task.percentage, 'Message': task.message}
+
+
+COMMANDS = {
+    'power-state': power_state,
+    'power': power,
+    'boot': boot,
+    'storage-summary': storage_summary,
+    'raid-apply': raid_apply,
+    'raid-delete': raid_delete,
+    'task-wait': task_wait,
+}
+"""a dict of command name and function, a function accepts an iBMC client
+and arguments of the command, returns a JSON serializable result"""
+
+
+def load_inventory(path, username=None, password=None):
+    # type: (str, str, str) -> list[dict]
+    """load servers from an inventory file
+
+    :param path: indicates the inventory file path, `-` for stdin
+    :param username: indicates the default username
+    :param password: indicates the default password
+    :raises: ValueError when a server has no username or password
+    :return: a list of dict holds address, username and password
+    """
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with io.open(path, 'r', encoding='utf-8') as fp:
+            lines = fp.read().splitlines()
+
+    servers = []
+    for (lineno, line) in enumerate(lines, 1):
+        fields = line.split()
+        if not fields or fields[0].startswith('#'):
+            continue
+        address = fields[0]
+        if '://' not in address:
+            address = 'https://%s' % address
+        server = {'address': address,
+                  'username': fields[1] if len(fields) > 1 else username,
+                  'password': fields[2] if len(fields) > 2 else password}
+        if not server['username'] or not server['password']:
+            raise ValueError('%s:%d: username or password of %s is missing.'
+                             % (path, lineno, address))
+        servers.append(server)
+    return servers
+
+
+def run_steps(server, steps, verify_ca=True, timeout=None,
+              max_inflight=None, adaptive=False):
+    """connect a server once and run steps in order
+
+    :param server: indicates the server, a dict holds address, username
+        and password
+    :param steps: indicates a list of (command, arguments) tuples
+    :param verify_ca: whether to verify the server certificate
+    :param timeout: indicates seconds before the deadline of the server
+        expires, never expires if not present
+    :param max_inflight: indicates max count of requests in flight to the
+        server, shared by all clients of the address
+    :param adaptive: whether to adapt the limit of requests in flight to the
+        server by AIMD
+    :return: a JSON serializable record of the server
+    """
+    record = {'address': server['address']}
+    started_at = time.time()
+    results = []
+    deadline = Deadline(timeout) if timeout else None
+    try:
+        client = ibmc_client.connect(server['address'], server['username'],
+                                     server['password'], verify_ca,
+                                     max_inflight=max_inflight,
+                                     adaptive=adaptive)
+        with client.connector.using_deadline(deadline), client:
+            for (command, arguments) in steps:
+                record['command'] = command
+                results.append(COMMANDS[command](client, **arguments))
+        del record['command']
+        record['ok'] = True
+        record['result'] = results[0] if len(steps) == 1 else results
+    except Exception as e:
+        LOG.debug('Failed to run %(command)s on %(address)s.',
+                  {'command': record.get('command'),
+                   'address': server['address']}, exc_info=True)
+        record['ok'] = False
+        record['error'] = six.text_type(e)
+        record['error_type'] = type(e).__name__
+        if len(steps) > 1:
+            record['step'] = len(results)
+    record['seconds'] = round(time.time() - started_at, 3)
+    return record
+
+
+def run(servers, steps, out, concurrency=DEFAULT_CONCURRENCY,
+        verify_ca=True, timeout=None, max_inflight=None, adaptive=False):
+    """run steps on servers concurrently, write a JSON line per server
+
+    :param servers: indicates servers loaded by `load_inventory`
+    :param steps: indicates a list of (command, arguments) tuples
+    :param out: indicates the text stream to write JSON lines to
+    :param concurrency: indicates max count of servers to operate
+        concurrently
+    :param verify_ca: whether to verify the server certificate
+    :param timeout: indicates seconds before the deadline of every server
+        expires
+    :param max_inflight: indicates max count of requests in flight per
+        server
+    :param adaptive: whether to adapt the limit of requests in flight per
+        server by AIMD
+    :return: count of failed servers
+    """
+    if not servers:
+        return 0
+
+    lock = threading.Lock()
+    failures = []
+
+    def operate(server):
+        record = run_steps(server, steps, verify_ca, timeout, max_inflight,
+                           adaptive)
+        line = json.dumps(record, sort_keys=True, default=str)
+        with lock:
+            if not record['ok']:
+                failures.append(server['address'])
+            out.write(six.text_type(line) + u'\n')
+            out.flush()
+
+    with ThreadPoolExecutor(max_workers=min(concurrency,
+                                            len(servers))) as executor:
+        for future in [executor.submit(operate, server)
+                       for server in servers]:
+            future.result()
+    return len(failures)
+
+
+def load_steps(path):
+    # type: (str) -> list[tuple]
+    """load steps from a JSON file
+
+    :param path: indicates the steps file path
+    :raises: ValueError when a step is invalid
+    :return: a list of (command, arguments) tuples
+    """
+    with io.open(path, 'r', encoding='utf-8') as fp:
+        data = json.loads(fp.read())
+    steps = []
+    for (idx, step) in enumerate(data):
+        arguments = dict(step)
+        command = arguments.pop('command', None)
+        if command not in COMMANDS:
+            raise ValueError('Step %d of %s has unknown command %r.'
+                             % (idx, path, command))
+        steps.append((command, arguments))
+    return steps
+
+
+def _load_logical_disks(path):
+    with io.open(path, 'r', encoding='utf-8') as fp:
+        data = json.loads(fp.read())
+    # accept the target RAID config of ironic as well
+    return data['logical_disks'] if isinstance(data, dict) else data
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='ibmc', description='Run operations on a fleet of iBMC servers, '
+                                 'write a JSON line per server.')
+    parser.add_argument('-i', '--inventory', required=True,
+                        help='inventory file, a server per line as `address '
+                             '[username [password]]`, `-` for stdin')
+    parser.add_argument('-u', '--username',
+                        default=os.environ.get(ENV_USERNAME),
+                        help='default username, default $%s' % ENV_USERNAME)
+    parser.add_argument('-p', '--password',
+                        default=os.environ.get(ENV_PASSWORD),
+                        help='default password, default $%s' % ENV_PASSWORD)
+    parser.add_argument('-c', '--concurrency', type=_positive_int,
+                        default=DEFAULT_CONCURRENCY,
+                        help='max servers operated concurrently, '
+                             'default %(default)s')
+    parser.add_argument('--timeout', type=float,
+                        help='seconds allowed per server')
+    parser.add_argument('--max-inflight', type=_positive_int,
+                        help='max requests in flight per server, the max '
+                             'limit with --adaptive')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='adapt requests in flight per server to its '
+                             'latency and errors')
+    parser.add_argument('--insecure', action='store_true',
+                        help='do not verify server certificates')
+    parser.add_argument('-o', '--output',
+                        help='write JSON lines to this file, default stdout')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='log client requests to stderr')
+
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+    commands.add_parser('power-state', help='get power state')
+    sub = commands.add_parser('power', help='reset server')
+    sub.add_argument('reset_type', choices=[
+        constants.RESET_ON, constants.RESET_FORCE_OFF,
+        constants.RESET_GRACEFUL_SHUTDOWN, constants.RESET_FORCE_RESTART,
+        constants.RESET_NMI, constants.RESET_FORCE_POWER_CYCLE])
+    sub = commands.add_parser('boot', help='set boot source override')
+    sub.add_argument('device', choices=[
+        constants.BOOT_SOURCE_TARGET_NONE, constants.BOOT_SOURCE_TARGET_PXE,
+        constants.BOOT_SOURCE_TARGET_FLOPPY, constants.BOOT_SOURCE_TARGET_CD,
+        constants.BOOT_SOURCE_TARGET_HDD,
+        constants.BOOT_SOURCE_TARGET_BIOS_SETUP])
+    sub.add_argument('--mode', choices=[constants.BOOT_SOURCE_MODE_BIOS,
+                                        constants.BOOT_SOURCE_MODE_UEFI])
+    sub.add_argument('--enabled', default=constants.BOOT_SOURCE_ENABLED_ONCE,
+                     choices=[constants.BOOT_SOURCE_ENABLED_ONCE,
+                              constants.BOOT_SOURCE_ENABLED_CONTINUOUS,
+                              constants.BOOT_SOURCE_ENABLED_DISABLED])
+    commands.add_parser('storage-summary', help='summary storage controllers')
+    sub = commands.add_parser('raid-apply', help='apply RAID configuration')
+    sub.add_argument('logical_disks', metavar='file',
+                     help='JSON file of logical disks or ironic target RAID '
+                          'config')
+    sub.add_argument('--reconcile', action='store_true',
+                     help='keep exists volumes which match logical disks')
+    commands.add_parser('raid-delete', help='delete all RAID configuration')
+    sub = commands.add_parser('task-wait', help='wait a task to finish')
+    sub.add_argument('task_id')
+    sub = commands.add_parser('run', help='run steps of a JSON file in order '
+                                          'with one session')
+    sub.add_argument('steps', metavar='file')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.CRITICAL,
+        stream=sys.stderr)
+
+    try:
+        servers = load_inventory(args.inventory, args.username,
+                                 args.password)
+        if args.command == 'run':
+            steps = load_steps(args.steps)
+        else:
+            arguments = dict((k, v) for (k, v) in vars(args).items()
+                             if k not in _GLOBAL_OPTIONS)
+            if args.command == 'raid-apply':
+                arguments['logical_disks'] = _load_logical_disks(
+                    args.logical_disks)
+            steps = [(args.command, arguments)]
+    except (IOError, ValueError, KeyError) as e:
+        parser.error(six.text_type(e))
+
+    out = (io.open(args.output, 'w', encoding='utf-8') if args.output
+           else _stdout())
+    try:
+        failures = run(servers, steps, out, args.concurrency,
+                       not args.insecure, args.timeout, args.max_inflight,
+                       args.adaptive)
+    finally:
+        if args.output:
+            out.close()
+    return 1 if failures else 0
+
+
+_GLOBAL_OPTIONS = ('inventory', 'username', 'password', 'concurrency',
+                   'timeout', 'max_inflight', 'adaptive', 'insecure',
+                   'output', 'verbose', 'command')
+
+
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError('%s is not a positive integer'
+                                         % value)
+    return number
+
+
+def _stdout():
+    # write text on both Python 2 and 3
+    return sys.stdout if six.PY3 else io.open(sys.stdout.fileno(), 'w',
+                                              encoding='utf-8', closefd=False)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,7 +11,10 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import contextlib
 import logging
+import threading
+import time
 from time import sleep
 
 import requests
@@ -19,28 +22,69 @@ import six
 
 from ibmc_client import constants
 from ibmc_client import exceptions
+from ibmc_client import limiter as limiters
 
 LOG = logging.getLogger(__name__)
 
 
 class Connector(object):
-    """IBMC API connector base on requests"""
+    """IBMC API connector base on requests
+
+    A connector is safe to be shared by threads. When the session expires,
+    exactly one thread creates a new session while other threads wait and
+    retry with the new one.
+    """
 
     # Default timeout in seconds for requests connect and read
     # http://docs.python-requests.org/en/master/user/advanced/#timeouts
     _DEFAULT_TIMEOUT = 60
 
-    def __init__(self, address, username, password, verify_ca):
+    def __init__(self, address, username, password, verify_ca,
+                 adapter=None, limiter=None, max_inflight=None,
+                 adaptive=False):
+        """Initial a connector and load the redfish service root
+
+        :param address: indicates the iBMC address, like https://example.com
+        :param username: indicates the username
+        :param password: indicates the password
+        :param verify_ca: whether to verify the server certificate
+        :param adapter: indicates the requests transport adapter mounted for
+            the address, like the record and replay adapters of
+            :mod:`ibmc_client.cassette`, default the requests HTTP adapter
+        :param limiter: indicates the limiter of concurrent requests, check
+            :mod:`ibmc_client.limiter`, unlimited if not present
+        :param max_inflight: indicates max count of requests in flight to
+            the address when limiter is not present, the limiter is shared
+            by all connectors of the address
+        :param adaptive: whether to adapt the limit of requests in flight to
+            the address by AIMD when limiter is not present, up to
+            `max_inflight` if present
+        """
         self.base_url = '%s/redfish/v1' % address
         self.address = address
         self._username = username
         self._password = password
         self._verify_ca = verify_ca
         self.session = None
+        # deadline is per thread, operations sharing the connector in
+        # different threads do not see deadlines of each other
+        self._local = threading.local()
+        if limiter is None and (max_inflight or adaptive):
+            limiter = limiters.for_address(address, max_inflight, adaptive)
+        self.limiter = limiter
+        """limiter of concurrent requests sent to the iBMC"""
+
+        # guards session creation, re-entrant because requests made while
+        # connecting may renew the session
+        self._session_lock = threading.RLock()
+        self._renewal_attempts = 0
+        self._renewal_error = None
 
         # Initial request session
         self._conn = requests.Session()
         self._conn.verify = verify_ca
+        if adapter is not None:
+            self._conn.mount(address, adapter)
 
         from ibmc_client import __version__ as version
         self._conn.headers.update({
@@ -76,6 +120,15 @@ class Connector(object):
     def session_service_base_url(self):
         return self._meta['SessionService']['@odata.id']
 
+    @property
+    def support_select_query(self):
+        """whether redfish `$select` query parameter is supported
+
+        :return: true if supported else false
+        """
+        features = self._meta.get('ProtocolFeaturesSupported', {})
+        return features.get('SelectQuery', False)
+
     @property
     def version(self):
         return self._meta['RedfishVersion']  # pragma: no cover
@@ -98,10 +151,44 @@ class Connector(object):
         else:
             return '%s%s' % (self.base_url, path)
 
+    @property
+    def deadline(self):
+        """deadline applied to requests of current thread which do not
+        specify a deadline"""
+        return getattr(self._local, 'deadline', None)
+
+    @deadline.setter
+    def deadline(self, deadline):
+        self._local.deadline = deadline
+
+    @contextlib.contextmanager
+    def using_deadline(self, deadline):
+        """apply a deadline to all requests made in the context
+
+        Nested API calls (load odata, wait task, ...) of a high-level
+        operation use the deadline without passing it down explicitly. The
+        deadline is applied to current thread only, worker threads of the
+        operation should apply it again.
+
+        :param deadline: indicates the deadline to apply, the current
+            deadline is kept if it is None
+        """
+        if deadline is None:
+            yield
+            return
+
+        previous = self.deadline
+        self.deadline = deadline
+        try:
+            yield
+        finally:
+            self.deadline = previous
+
     def connect(self):
-        if self.session is None:
-            self._fetch_session()
-            self._get_resource_id()
+        with self._session_lock:
+            if self.session is None:
+                self._fetch_session()
+                self._get_resource_id()
 
     def disconnect(self):
         try:
@@ -119,7 +206,9 @@ class Connector(object):
             'Password': self._password
         }
         create_session_url = '%s/Sessions' % self.session_service_base_url
-        res = self.request(constants.POST, create_session_url, json=payload)
+        # never renew session when creating session fails with 401
+        res = self.request(constants.POST, create_session_url, json=payload,
+                           retry=True)
 
         # cache session
         token = res.headers.get(constants.HEADER_AUTH_TOKEN)
@@ -127,10 +216,37 @@ class Connector(object):
         self.session = dict(address=self.address, token=token,
                             location=location)
 
-        # update request credential header
-        self._conn.headers.update({
-            constants.HEADER_AUTH_TOKEN: token,
-        })
+        # update request credential header, headers are replaced instead of
+        # updated in place as other threads may be preparing requests
+        headers = self._conn.headers.copy()
+        headers[constants.HEADER_AUTH_TOKEN] = token
+        self._conn.headers = headers
+
+    def _renew_session(self, stale_token):
+        """renew the session unless another thread has renewed it
+
+        :param stale_token: indicates the token rejected with 401
+        """
+        attempts = self._renewal_attempts
+        with self._session_lock:
+            token = self.session['token'] if self.session else None
+            if token != stale_token:
+                # renewed by another thread while waiting, retry with it
+                return
+
+            if (self._renewal_attempts != attempts
+                    and self._renewal_error is not None):
+                # the renewal waited for failed, do not login again which
+                # may lock the account
+                raise self._renewal_error
+
+            self._renewal_attempts += 1
+            self._renewal_error = None
+            try:
+                self._fetch_session()
+            except exceptions.IBMCClientError as e:
+                self._renewal_error = e
+                raise
 
     def _get_resource_id(self):
         """get resource id of server.
@@ -148,27 +264,50 @@ class Connector(object):
         self._resource_id = manager_odata_id.split('/')[-1]
 
     def request(self, method, url, json=None, etag=None, headers=None,
-                retry=False):
+                retry=False, deadline=None):
+        """send a request to iBMC
+
+        :param method: indicates HTTP method
+        :param url: indicates url or odata id of the resource
+        :param json: indicates json payload
+        :param etag: indicates etag used as `If-Match` header
+        :param headers: indicates extra HTTP headers
+        :param retry: whether this request is a retry
+        :param deadline: indicates the deadline of the request, default the
+            deadline applied by `using_deadline`. The read timeout is trimmed
+            to the remaining budget of the deadline.
+        :raises: exceptions.DeadlineExceeded when deadline expires
+        :raises: exceptions.OperationCancelled when deadline is cancelled
+        :return: response
+        """
+        deadline = deadline or self.deadline
         try:
             url = self.get_url(url)
             return self._request(method, url, json=json, etag=etag,
-                                 headers=headers)
+                                 headers=headers, deadline=deadline)
         except requests.exceptions.RequestException as e:
             response = e.response
             if response is not None:
                 if not retry and response.status_code:
                     if response.status_code == 401:
                         # If session expired, renew session then retry
-                        self._fetch_session()
+                        stale_token = response.request.headers.get(
+                            constants.HEADER_AUTH_TOKEN)
+                        self._renew_session(stale_token)
                         return self.request(method, url, json=json, etag=etag,
-                                            headers=headers, retry=True)
+                                            headers=headers, retry=True,
+                                            deadline=deadline)
 
                     if response.status_code == 412:
                         # If 412 pre-condition checking failed,
                         # just retry after 10 seconds.
-                        sleep(10)
+                        delay = 10
+                        if deadline is not None:
+                            delay = min(delay, deadline.remaining())
+                        sleep(delay)
                         return self.request(method, url, json=json, etag=etag,
-                                            headers=headers, retry=True)
+                                            headers=headers, retry=True,
+                                            deadline=deadline)
 
                 LOG.warning('iBMC response -> %(method)s %(url)s, '
                             'code: %(code)s, response: %(resp_txt)s',
@@ -177,15 +316,24 @@ class Connector(object):
                              'resp_txt': response.content})
                 raise exceptions.raise_for_response(method, url, response)
             else:
+                if deadline is not None:
+                    # request timed out because of the trimmed read timeout
+                    deadline.check('%s %s' % (method, url))
                 raise exceptions.IBMCConnectionError(url=url, error=e)
 
-    def _request(self, method, url, json=None, etag=None, headers=None):
+    def _request(self, method, url, json=None, etag=None, headers=None,
+                 deadline=None):
+        timeout = self._DEFAULT_TIMEOUT
+        if deadline is not None:
+            deadline.check('%s %s' % (method, url))
+            timeout = min(timeout, deadline.remaining())
+
         # If request method is PATCH or PUT,
         # "If-Match" header is required by iBMC redfish API.
         if method.upper() in [constants.PATCH, constants.PUT]:
             headers = headers or {}
             if not etag:
-                res = self.request(constants.GET, url)
+                res = self.request(constants.GET, url, deadline=deadline)
                 headers.update({
                     constants.HEADER_IF_MATCH:
                         res.headers.get(constants.HEADER_ETAG)})
@@ -206,10 +354,34 @@ class Connector(object):
 
         req = requests.Request(method, url, json=json, headers=headers)
         prepped = self._conn.prepare_request(req)
-        res = self._conn.send(prepped, timeout=self._DEFAULT_TIMEOUT)
+        res = self._send(prepped, timeout, deadline)
         res.raise_for_status()
         LOG.debug('iBMC response -> %(method)s %(url)s, code: %(code)s, '
                   'content:: %(content)s',
                   {'method': method, 'url': url, 'code': res.status_code,
                    'content': res.text})
         return res
+
+    def _send(self, prepped, timeout, deadline):
+        limiter = self.limiter
+        if limiter is None:
+            return self._conn.send(prepped, timeout=timeout)
+
+        what = '%s %s' % (prepped.method, prepped.url)
+        acquired_at = limiter.acquire(deadline, what)
+        if deadline is not None:
+            # the slot may be acquired after a while
+            try:
+                deadline.check(what)
+            except exceptions.IBMCClientError:
+                limiter.release(acquired_at)
+                raise
+            timeout = min(timeout, deadline.remaining())
+
+        failed = True
+        try:
+            res = self._conn.send(prepped, timeout=timeout)
+            failed = res.status_code >= 500
+            return res
+        finally:
+            limiter.release(acquired_at, time.time() - acquired_at, failed)
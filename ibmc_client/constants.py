@@ -18,6 +18,36 @@
 # RAID rsync task wait effect time seconds
 RAID_TASK_EFFECT_SECONDS = 20
 
+# RAID rsync task effect verification timeout seconds
+RAID_TASK_EFFECT_TIMEOUT_SECONDS = 120
+
+# RAID rsync task effect verification check interval seconds
+RAID_TASK_EFFECT_CHECK_INTERVAL_SECONDS = 2
+
+# Max concurrent operations against one iBMC, such as tearing down RAID
+# controllers or restoring drives
+MAX_PARALLEL_WORKERS_PER_IBMC = 4
+
+# Max iBMC servers to operate concurrently in fleet operations
+MAX_PARALLEL_IBMC_SERVERS = 16
+
+# Task first check interval seconds, backs off to
+# `IbmcTaskClient.RECHECK_TASK_DELAY_IN_SECONDS` and restarts from it only
+# when the task state changes
+TASK_CHECK_INTERVAL_SECONDS = 1
+
+# Task waiting timeout seconds, None for no limit
+TASK_TIMEOUT_SECONDS = None
+
+# Storage ready waiting timeout seconds
+STORAGE_READY_TIMEOUT_SECONDS = 600
+
+# Storage ready first check interval seconds, doubled after every check
+STORAGE_READY_CHECK_INTERVAL_SECONDS = 1
+
+# Storage ready max check interval seconds
+STORAGE_READY_MAX_CHECK_INTERVAL_SECONDS = 15
+
 # HTTP request method shortcut
 
 HEAD = 'HEAD'
@@ -32,6 +32,17 @@ class IBMCClientError(Exception):
 
         super(IBMCClientError, self).__init__(self.message)
 
+    def __reduce__(self):
+        # errors raised in worker processes are pickled, they could not be
+        # rebuilt by calling `__init__` with the formatted message
+        return _restore_error, (type(self), self.args), self.__dict__
+
+
+def _restore_error(cls, args):
+    error = cls.__new__(cls)
+    error.args = args
+    return error
+
 
 class IBMCClientOperationError(IBMCClientError):
 
@@ -222,6 +233,38 @@ class FeatureNotSupported(IBMCClientError):
                'please check the version of this iBMC server.')
 
 
+class WaitTimeout(IBMCClientError):
+    message = 'Timed out after %(timeout)d seconds waiting for %(what)s.'
+
+
+class DeadlineExceeded(IBMCClientError):
+    message = 'Deadline exceeded before %(what)s.'
+
+
+class OperationCancelled(IBMCClientError):
+    message = 'Operation cancelled before %(what)s.'
+
+
+class InventoryMismatch(IBMCClientError):
+    message = ('Drive inventory of %(address)s does not match the reference '
+               'server: %(reason)s.')
+
+
+class FleetOperationFailed(IBMCClientError):
+    message = ('%(operation)s failed on %(count)d of %(total)d servers: '
+               '%(servers)s.')
+
+    def __init__(self, operation, failures, results):
+        self.failures = failures
+        """a dict of address and error of failed servers"""
+        self.results = results
+        """a dict of address and result of succeeded servers"""
+        super(FleetOperationFailed, self).__init__(
+            operation=operation, count=len(failures),
+            total=len(failures) + len(results),
+            servers=', '.join(sorted(failures)))
+
+
 def raise_for_response(method, url, response):
     """Raise a correct error class, if needed."""
     if response.status_code < http_client.BAD_REQUEST:
@@ -237,3 +280,19 @@ def raise_for_response(method, url, response):
         raise ServerSideError(method, url, response)
     else:
         raise IBMCHttpRequestError(method, url, response)
+
+
+class RoundTripBudgetExceeded(IBMCClientError):
+    message = ('%(operation)s made %(count)d HTTP exchanges, exceeds its '
+               'budget %(budget)d: %(exchanges)s')
+
+    def __init__(self, operation, budget, exchanges):
+        self.exchanges = exchanges
+        """a list of exchanges, like `GET /redfish/v1/Systems/1`"""
+        super(RoundTripBudgetExceeded, self).__init__(
+            operation=operation, budget=budget, count=len(exchanges),
+            exchanges=', '.join(exchanges))
+
+
+class CassetteInteractionNotFound(IBMCClientError):
+    message = 'No recorded interaction left to replay for %(method)s %(path)s.'
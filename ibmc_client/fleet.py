@@ -0,0 +1,383 @@
+# Copyright 2020 HUAWEI, Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# Version 0.0.3
+import contextlib
+import json
+import logging
+import multiprocessing
+import sys
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from ibmc_client import constants
+from ibmc_client import exceptions
+from ibmc_client import limiter as limiters
+from ibmc_client import raid_cache
+from ibmc_client import utils
+from ibmc_client.api.system import storage as storage_api
+from ibmc_client.resources.system.storage import StorageSnapshot
+
+LOG = logging.getLogger(__name__)
+
+
+def limit_requests(clients, max_inflight=None, adaptive=False):
+    """limit requests in flight to every iBMC of clients
+
+    Clients of the same address share a limiter, check
+    :func:`~ibmc_client.limiter.for_address`. Clients which have a limiter
+    already are kept as is. Nothing is limited when neither `max_inflight`
+    nor `adaptive` is present.
+
+    :param clients: indicates the :class:`~ibmc_client.IBMCClient` list
+    :param max_inflight: indicates max count of requests in flight per iBMC
+    :param adaptive: whether to adapt the limit per iBMC by AIMD
+    """
+    if not max_inflight and not adaptive:
+        return
+    for client in clients:
+        if client.connector.limiter is None:
+            client.connector.limiter = limiters.for_address(
+                client.address, max_inflight, adaptive)
+
+
+def run_on_fleet(operation, func, clients, max_workers=None,
+                 max_inflight=None, adaptive=False):
+    # type: (str, callable, list, int, int, bool) -> dict
+    """call func with every iBMC client concurrently
+
+    Unlike `utils.parallel_map`, a failed server does not stop others, all
+    servers are processed before errors are raised.
+
+    :param operation: indicates the operation name used in error message
+    :param func: a callable which accepts an iBMC client as argument
+    :param clients: indicates the :class:`~ibmc_client.IBMCClient` list
+    :param max_workers: indicates max count of servers to operate
+        concurrently, default `constants.MAX_PARALLEL_IBMC_SERVERS`
+    :param max_inflight: indicates max count of requests in flight per
+        iBMC, check `limit_requests`
+    :param adaptive: whether to adapt the limit of requests in flight per
+        iBMC by AIMD
+    :raises: exceptions.FleetOperationFailed when any server fails
+    :return: a dict of address and result of func
+    """
+    clients = list(clients)
+    if not clients:
+        return {}
+    limit_requests(clients, max_inflight, adaptive)
+
+    max_workers = max_workers or constants.MAX_PARALLEL_IBMC_SERVERS
+    with ThreadPoolExecutor(max_workers=min(max_workers,
+                                            len(clients))) as executor:
+        futures = [(client.address, executor.submit(func, client))
+                   for client in clients]
+
+    results, failures = {}, {}
+    for (address, future) in futures:
+        error = future.exception()
+        if error is None:
+            results[address] = future.result()
+        else:
+            LOG.error('%(operation)s failed on %(address)s: %(error)s',
+                      {'operation': operation, 'address': address,
+                       'error': error})
+            failures[address] = error
+
+    if failures:
+        raise exceptions.FleetOperationFailed(operation, failures, results)
+    return results
+
+
+def provision_raid_configuration(reference, targets, logical_disks,
+                                 planner=None, max_workers=None,
+                                 deadline=None, max_inflight=None,
+                                 adaptive=False):
+    """Plan RAID configuration once and apply it to a fleet of servers
+
+    Disks are assigned on the reference server only. Every target should
+    have equivalent controllers and drives (same hardware profile, check
+    :func:`~ibmc_client.raid_cache.hardware_profile`) as the reference
+    server, drives in the plan are mapped to drives of target by their
+    canonical position. Targets are configured concurrently, controllers of
+    a target are configured concurrently too, volumes of a controller are
+    created one by one, the same as `apply_raid_configuration`.
+
+    Like `apply_raid_configuration`, callers should make sure exists RAID
+    configuration of targets has been deleted.
+
+    :param reference: indicates the :class:`~ibmc_client.IBMCClient` of the
+        reference server
+    :param targets: indicates the :class:`~ibmc_client.IBMCClient` list of
+        servers to configure, reference server could be one of them
+    :param logical_disks: a list of JSON dictionaries which represents the
+        logical disks, check `IBMCStorageClient.apply_raid_configuration`
+    :param planner: indicates the
+        :class:`~ibmc_client.raid_planner.RaidPlanner` to use, disks are
+        assigned in the greedy way if not present
+    :param max_workers: indicates max count of servers to configure
+        concurrently, default `constants.MAX_PARALLEL_IBMC_SERVERS`
+    :param deadline: indicates the deadline applied to every server
+    :param max_inflight: indicates max count of requests in flight per
+        iBMC, check `limit_requests`
+    :param adaptive: whether to adapt the limit of requests in flight per
+        iBMC by AIMD
+    :raises: exceptions.FleetOperationFailed when any target fails, the
+        error of target is exceptions.InventoryMismatch when its drives are
+        not equivalent to the reference server
+    :return: a dict of target address and created volume id list
+    """
+    LOG.info('Start plan RAID configuration on reference server '
+             '%(address)s:: %(logical_disks)s',
+             {'address': reference.address, 'logical_disks': logical_disks})
+    limit_requests([reference], max_inflight, adaptive)
+    storage_client = reference.system.storage
+    with reference.connector.using_deadline(deadline):
+        storage_client.waiting_storage_ready()
+        plan = storage_api.plan_raid_configuration(
+            logical_disks, storage_client.list(), planner)
+
+    used = set(ctrl.id for ctrl in plan.jbod_controllers)
+    used.update(volume['controller'] for volume in plan.volumes)
+    # freeze reference controllers, the reference server may be one of the
+    # targets, its volumes change once it is configured
+    references = dict((ctrl.id, StorageSnapshot.from_snapshot(ctrl.snapshot()))
+                      for ctrl in plan.controllers if ctrl.id in used)
+
+    def apply(target):
+        with target.connector.using_deadline(deadline):
+            return apply_plan(target, plan, references)
+
+    return run_on_fleet('Provision RAID configuration', apply, targets,
+                        max_workers, max_inflight, adaptive)
+
+
+def apply_plan(target, plan, references):
+    """apply a plan of reference server to a target server
+
+    :param target: indicates the :class:`~ibmc_client.IBMCClient` of target
+    :param plan: indicates the
+        :class:`~ibmc_client.api.system.storage.RaidPlan` of reference
+    :param references: indicates a dict of controller id and reference
+        controller which are used by the plan
+    :raises: exceptions.InventoryMismatch when drives of target are not
+        equivalent to the reference server
+    :return: created volume id list
+    """
+    storage_client = target.system.storage
+    storage_client.waiting_storage_ready()
+    controllers = dict((ctrl.id, ctrl) for ctrl in storage_client.list())
+
+    drive_maps = {}
+    for (ctrl_id, reference) in references.items():
+        ctrl = controllers.get(ctrl_id)
+        if ctrl is None:
+            raise exceptions.InventoryMismatch(
+                address=target.address,
+                reason='controller %s is not present' % ctrl_id)
+        reference_drives = raid_cache.canonical_drives(reference)
+        drives = raid_cache.canonical_drives(ctrl)
+        if (raid_cache.hardware_profile(reference, reference_drives)
+                != raid_cache.hardware_profile(ctrl, drives)):
+            raise exceptions.InventoryMismatch(
+                address=target.address,
+                reason='drives or volumes of controller %s differ' % ctrl_id)
+        drive_maps[ctrl_id] = dict(
+            (reference_drive.drive_id, drive.drive_id)
+            for (reference_drive, drive) in zip(reference_drives, drives))
+
+    for reference in plan.jbod_controllers:
+        controllers[reference.id].set(jbod=True)
+
+    created = create_planned_volumes(target, plan.volumes, controllers,
+                                     drive_maps)
+    LOG.info('RAID configuration has been applied to %(address)s, created '
+             'volumes:: %(volumes)s.',
+             {'address': target.address, 'volumes': created})
+    return created
+
+
+def create_planned_volumes(target, volumes, controllers, drive_maps=None):
+    """create planned volumes on a target server
+
+    Controllers are configured concurrently, volumes of the same controller
+    are created one by one.
+
+    :param target: indicates the :class:`~ibmc_client.IBMCClient` of target
+    :param volumes: indicates volumes of a
+        :class:`~ibmc_client.api.system.storage.RaidPlan`
+    :param controllers: indicates a dict of controller id and controller of
+        target
+    :param drive_maps: indicates a dict of controller id and a dict maps
+        drive id of plan to drive id of target, drive ids are used as is if
+        not present
+    :return: created volume id list
+    """
+    storage_client = target.system.storage
+    ctrl_ids = []
+    for volume in volumes:
+        if volume['controller'] not in ctrl_ids:
+            ctrl_ids.append(volume['controller'])
+    # deadline is thread local, pass it to worker threads
+    deadline = target.connector.deadline
+
+    def create_volumes(ctrl_id):
+        with target.connector.using_deadline(deadline):
+            return _create_volumes(ctrl_id)
+
+    def _create_volumes(ctrl_id):
+        created = []
+        for volume in volumes:
+            if volume['controller'] != ctrl_id:
+                continue
+            payload = dict(volume['payload'])
+            if drive_maps is not None:
+                payload['drives'] = [drive_maps[ctrl_id][drive_id]
+                                     for drive_id in payload['drives']]
+            volume_id = target.system.volume.create(**payload)
+            storage_client.wait_raid_task_effect(controllers[ctrl_id],
+                                                 created=[volume_id])
+            created.append(volume_id)
+        return created
+
+    return [volume_id for volume_ids in utils.parallel_map(
+        create_volumes, ctrl_ids, constants.MAX_PARALLEL_WORKERS_PER_IBMC)
+        for volume_id in volume_ids]
+
+
+def apply_raid_configuration(clients, logical_disks, planner=None,
+                             max_workers=None, processes=None,
+                             deadline=None, max_inflight=None,
+                             adaptive=False):
+    """Plan and apply RAID configuration on every server of a fleet
+
+    Unlike `provision_raid_configuration`, servers may have different
+    drives, RAID configuration is planned for every server. HTTP requests
+    are sent by a thread per server, while parsing drives and volumes and
+    planning, which are pure python work bound by the GIL, are done by a
+    pool of processes. Drive and volume documents are sent to processes as
+    text, plans are sent back as pickled
+    :class:`~ibmc_client.api.system.storage.RaidPlan`.
+
+    Like `apply_raid_configuration` of storage client, callers should make
+    sure exists RAID configuration of servers has been deleted.
+
+    :param clients: indicates the :class:`~ibmc_client.IBMCClient` list of
+        servers to configure
+    :param logical_disks: a list of JSON dictionaries which represents the
+        logical disks, check `IBMCStorageClient.apply_raid_configuration`
+    :param planner: indicates the
+        :class:`~ibmc_client.raid_planner.RaidPlanner` to use, disks are
+        assigned in the greedy way if not present
+    :param max_workers: indicates max count of servers to configure
+        concurrently, default `constants.MAX_PARALLEL_IBMC_SERVERS`
+    :param processes: indicates count of planning processes, default count
+        of CPUs, servers are planned by their own threads when it is 0
+    :param deadline: indicates the deadline applied to every server
+    :param max_inflight: indicates max count of requests in flight per
+        iBMC, check `limit_requests`
+    :param adaptive: whether to adapt the limit of requests in flight per
+        iBMC by AIMD
+    :raises: exceptions.FleetOperationFailed when any server fails
+    :return: a dict of server address and created volume id list
+    """
+    clients = list(clients)
+    limit_requests(clients, max_inflight, adaptive)
+    if processes == 0:
+        return _apply_raid_configuration(clients, logical_disks, planner,
+                                         max_workers, deadline, None)
+    with _process_pool(processes) as pool:
+        return _apply_raid_configuration(clients, logical_disks, planner,
+                                         max_workers, deadline, pool)
+
+
+def _apply_raid_configuration(clients, logical_disks, planner, max_workers,
+                              deadline, pool):
+    def apply(client):
+        with client.connector.using_deadline(deadline):
+            storage_client = client.system.storage
+            storage_client.waiting_storage_ready()
+            controllers = storage_client.list()
+            documents = [load_storage_documents(client, ctrl)
+                         for ctrl in controllers]
+            if pool is None:
+                plan = plan_from_documents(logical_disks, documents, planner)
+            else:
+                plan = pool.submit(plan_from_documents, logical_disks,
+                                   documents, planner).result()
+
+            controllers = dict((ctrl.id, ctrl) for ctrl in controllers)
+            for ctrl in plan.jbod_controllers:
+                controllers[ctrl.id].set(jbod=True)
+            created = create_planned_volumes(client, plan.volumes,
+                                             controllers)
+        LOG.info('RAID configuration has been applied to %(address)s, '
+                 'created volumes:: %(volumes)s.',
+                 {'address': client.address, 'volumes': created})
+        return created
+
+    return run_on_fleet('Apply RAID configuration', apply, clients,
+                        max_workers)
+
+
+def load_storage_documents(client, ctrl):
+    """load redfish documents of a controller, its drives and volumes
+
+    Drive and volume documents are kept as text without being parsed.
+
+    :param client: indicates the :class:`~ibmc_client.IBMCClient`
+    :param ctrl: indicates the storage controller
+    :return: a dict holds the storage JSON, drive and volume document text
+    """
+    connector = client.connector
+    storage = ctrl.to_json()
+    volume_collection = client.load_collection_resource(storage['Volumes'])
+    return {
+        'storage': storage,
+        'drives': [connector.request(constants.GET, drive).text
+                   for drive in storage.get('Drives', [])],
+        'volumes': [connector.request(constants.GET, volume).text
+                    for volume in volume_collection.resources],
+    }
+
+
+def plan_from_documents(logical_disks, documents, planner=None):
+    """plan RAID configuration from documents of controllers
+
+    It is called in worker processes, arguments and result are pickled.
+
+    :param logical_disks: a list of JSON dictionaries which represents the
+        logical disks
+    :param documents: indicates documents of all controllers of a server
+        loaded by `load_storage_documents`
+    :param planner: indicates the
+        :class:`~ibmc_client.raid_planner.RaidPlanner` to use
+    :return: the planned :class:`~ibmc_client.api.system.storage.RaidPlan`
+    """
+    snapshots = [{'storage': document['storage'],
+                  'drives': [json.loads(_) for _ in document['drives']],
+                  'volumes': [json.loads(_) for _ in document['volumes']]}
+                 for document in documents]
+    return storage_api.plan_raid_configuration(logical_disks, snapshots,
+                                               planner)
+
+
+@contextlib.contextmanager
+def _process_pool(processes):
+    # workers are spawned instead of forked, they may be started while
+    # threads of other servers are sending requests
+    kwargs = {}
+    if sys.version_info >= (3, 7):
+        kwargs['mp_context'] = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=processes, **kwargs) as pool:
+        yield pool
@@ -0,0 +1,122 @@
+# Copyright 2020 HUAWEI, Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# Version 0.0.3
+"""Count HTTP round trips of high-level operations against a budget
+
+Hidden requests (a pre-PATCH GET for the ETag, a full resource load to find
+an action URI, ...) make operations slower on every iBMC. A budget file
+maps public operations to the max HTTP exchanges they may make, tests run
+every operation under `RoundTripBudget.check` to catch regressions::
+
+    budget = RoundTripBudget.load('round-trip-budgets.json')
+    with budget.check(client, 'Storage.summary'):
+        ctrl.summary()
+"""
+import contextlib
+import io
+import json
+import threading
+
+from six.moves.urllib import parse
+
+from ibmc_client import exceptions
+
+
+class RequestCounter(object):
+    """Count HTTP exchanges of iBMC clients
+
+    Every response received by a client is counted, retried requests (after
+    401 or 412) and error responses included.
+    """
+
+    def __init__(self):
+        self.exchanges = []
+        """a list of exchanges, like `GET /redfish/v1/Systems/1`"""
+        self._lock = threading.Lock()
+
+    @property
+    def count(self):
+        # type: () -> int
+        """count of exchanges"""
+        return len(self.exchanges)
+
+    def _on_response(self, response, *args, **kwargs):
+        url = parse.urlsplit(response.request.url)
+        path = url.path + ('?' + url.query if url.query else '')
+        with self._lock:
+            self.exchanges.append('%s %s' % (response.request.method, path))
+
+    @contextlib.contextmanager
+    def counting(self, client):
+        """count exchanges of a client in the context
+
+        :param client: indicates the :class:`~ibmc_client.IBMCClient`
+        """
+        hooks = client.connector._conn.hooks['response']
+        hooks.append(self._on_response)
+        try:
+            yield self
+        finally:
+            hooks.remove(self._on_response)
+
+
+class RoundTripBudget(object):
+    """Max HTTP exchanges allowed per high-level operation"""
+
+    def __init__(self, budgets):
+        # type: (dict) -> None
+        """Initial a round trip budget
+
+        :param budgets: indicates a dict of operation name and max HTTP
+            exchanges it may make
+        """
+        self.budgets = dict(budgets)
+
+    @staticmethod
+    def load(path):
+        # type: (str) -> RoundTripBudget
+        """load budgets from a JSON file
+
+        The file holds a JSON object of operation name and max exchanges,
+        keys start with `_` are comments and ignored.
+
+        :param path: indicates the budget file path
+        :return: the round trip budget
+        """
+        with io.open(path, 'r', encoding='utf-8') as fp:
+            budgets = json.loads(fp.read())
+        return RoundTripBudget(dict((k, v) for (k, v) in budgets.items()
+                                    if not k.startswith('_')))
+
+    @contextlib.contextmanager
+    def check(self, client, operation):
+        """count exchanges of client in the context against the budget of
+        operation
+
+        :param client: indicates the :class:`~ibmc_client.IBMCClient`
+        :param operation: indicates the operation name in budget file
+        :raises: KeyError when operation has no budget
+        :raises: exceptions.RoundTripBudgetExceeded when the operation makes
+            more exchanges than its budget
+        :return: a context yields the :class:`RequestCounter`
+        """
+        budget = self.budgets[operation]
+        counter = RequestCounter()
+        with counter.counting(client):
+            yield counter
+        if counter.count > budget:
+            raise exceptions.RoundTripBudgetExceeded(
+                operation=operation, budget=budget,
+                exchanges=counter.exchanges)
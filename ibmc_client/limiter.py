@@ -0,0 +1,251 @@
+# Copyright 2020 HUAWEI, Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# Version 0.0.3
+"""Limit concurrent HTTP requests sent to an iBMC
+
+The management CPU of an iBMC is weak, past a few concurrent requests its
+latency explodes and it starts to respond 5xx. A limiter is passed to
+:class:`~ibmc_client.connector.Connector`, every request waits for a free
+slot before it is sent. Clients of the same iBMC share one limiter, which
+is created for the address by the first client asking for it::
+
+    client = ibmc_client.connect(address, username, password,
+                                 max_inflight=4)
+    client = ibmc_client.connect(address, username, password,
+                                 adaptive=True)
+"""
+import logging
+import threading
+import time
+import weakref
+
+LOG = logging.getLogger(__name__)
+
+
+class ConcurrencyLimiter(object):
+    """A limiter which allows a fixed count of requests in flight"""
+
+    CANCEL_CHECK_INTERVAL_SECONDS = 1
+    """max seconds to wait for a slot before checking cancellation of the
+    deadline"""
+
+    def __init__(self, limit):
+        # type: (int) -> None
+        """Initial a concurrency limiter
+
+        :param limit: indicates max count of requests in flight
+        """
+        if limit < 1:
+            raise ValueError('Concurrency limit should be at least 1, '
+                             'got %s.' % limit)
+        self._limit = int(limit)
+        self.inflight = 0
+        """count of requests in flight"""
+        self.peak_inflight = 0
+        """max count of requests in flight ever"""
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self):
+        # type: () -> int
+        """current max count of requests in flight"""
+        return self._limit
+
+    def acquire(self, deadline=None, what=None):
+        """wait for a free slot
+
+        :param deadline: indicates the deadline of the request
+        :param what: indicates the request, used in error message
+        :raises: exceptions.DeadlineExceeded when deadline expires
+        :raises: exceptions.OperationCancelled when deadline is cancelled
+        :return: the time the slot is acquired, passed to `release`
+        """
+        with self._cond:
+            while self.inflight >= self.limit:
+                timeout = None
+                if deadline is not None:
+                    deadline.check(what)
+                    timeout = min(deadline.remaining(),
+                                  self.CANCEL_CHECK_INTERVAL_SECONDS)
+                self._cond.wait(timeout)
+            self.inflight += 1
+            self.peak_inflight = max(self.peak_inflight, self.inflight)
+            self._on_acquire()
+        return time.time()
+
+    def release(self, acquired_at, latency=None, failed=False):
+        """release a slot when the response is received
+
+        :param acquired_at: indicates the time returned by `acquire`
+        :param latency: indicates seconds taken by the exchange, None when
+            the request is not sent
+        :param failed: whether the iBMC failed to serve the request, like
+            5xx responses and timeouts
+        """
+        with self._cond:
+            self.inflight -= 1
+            self._on_release(acquired_at, latency, failed)
+            self._cond.notify_all()
+
+    def _on_acquire(self):
+        pass
+
+    def _on_release(self, acquired_at, latency, failed):
+        pass
+
+
+class AdaptiveConcurrencyLimiter(ConcurrencyLimiter):
+    """A limiter which adapts the limit by AIMD to the knee of an iBMC
+
+    The limit grows additively, by one per round of `limit` responses,
+    while latency stays flat. It is cut multiplicatively when the iBMC
+    fails to serve a request, or the short term average latency exceeds
+    the baseline latency by `LATENCY_TOLERANCE`. The baseline follows lower
+    latency at once and higher latency slowly, so it settles at the latency
+    of an idle iBMC for the mix of APIs in use.
+    """
+
+    INITIAL_LIMIT = 2
+    """default limit to start with"""
+
+    MAX_LIMIT = 16
+    """default max limit to grow to"""
+
+    BACKOFF_RATIO = 0.75
+    """multiple of the limit after a backoff"""
+
+    LATENCY_TOLERANCE = 1.5
+    """max ratio of short term average latency over the baseline"""
+
+    SHORT_WINDOW = 5
+    """count of responses the short term average latency spans"""
+
+    BASELINE_WINDOW = 100
+    """count of responses the baseline spans when latency rises"""
+
+    def __init__(self, initial_limit=None, min_limit=1, max_limit=None):
+        # type: (int, int, int) -> None
+        """Initial an adaptive concurrency limiter
+
+        :param initial_limit: indicates the limit to start with, default
+            `INITIAL_LIMIT` or max limit if it is less
+        :param min_limit: indicates the min limit to back off to
+        :param max_limit: indicates the max limit to grow to, default
+            `MAX_LIMIT`
+        """
+        max_limit = max_limit or self.MAX_LIMIT
+        if initial_limit is None:
+            initial_limit = min(self.INITIAL_LIMIT, max_limit)
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError('Concurrency limits should satisfy 1 <= '
+                             'min_limit <= initial_limit <= max_limit.')
+        super(AdaptiveConcurrencyLimiter, self).__init__(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoffs = 0
+        """count of backoffs"""
+        self._short_latency = None
+        self._baseline = None
+        self._samples = 0
+        self._backoff_at = 0
+        # whether the limit has been reached since it last changed, and
+        # count of flat responses since then
+        self._saturated = False
+        self._flat_responses = 0
+
+    def _on_acquire(self):
+        if self.inflight >= self._limit:
+            self._saturated = True
+
+    def _on_release(self, acquired_at, latency, failed):
+        if latency is None:
+            return
+
+        spiked = False
+        if not failed:
+            self._samples += 1
+            self._short_latency = _average(self._short_latency, latency,
+                                           self.SHORT_WINDOW)
+            rising = (self._baseline is not None
+                      and latency > self._baseline)
+            self._baseline = _average(
+                self._baseline, latency,
+                self.BASELINE_WINDOW if rising else self.SHORT_WINDOW)
+            threshold = self._baseline * self.LATENCY_TOLERANCE
+            spiked = (self._samples > self.SHORT_WINDOW
+                      and self._short_latency > threshold)
+
+        if failed or spiked:
+            # responses of requests sent before the last backoff reflect
+            # the old limit, back off once for them
+            if acquired_at >= self._backoff_at:
+                limit = max(self.min_limit,
+                            int(self._limit * self.BACKOFF_RATIO))
+                LOG.debug('Concurrency limit backs off from %(from)s to '
+                          '%(to)s, failed: %(failed)s, latency: %(latency)s',
+                          {'from': self.limit, 'to': limit,
+                           'failed': failed, 'latency': latency})
+                self._limit = limit
+                self._backoff_at = time.time()
+                self.backoffs += 1
+                self._saturated = False
+                self._flat_responses = 0
+        elif self._saturated:
+            # grow only when the limit has been reached, or it grows forever
+            # while callers send requests slowly
+            self._flat_responses += 1
+            if self._flat_responses >= self._limit:
+                self._limit = min(self.max_limit, self._limit + 1)
+                self._saturated = False
+                self._flat_responses = 0
+
+
+_shared = weakref.WeakValueDictionary()
+_shared_lock = threading.Lock()
+
+
+def for_address(address, max_inflight=None, adaptive=False):
+    # type: (str, int, bool) -> ConcurrencyLimiter
+    """get the limiter shared by all connectors of an iBMC address
+
+    The limiter is created by the first caller of the address, following
+    callers share it whatever limit they ask for, until no connector of the
+    address is alive.
+
+    :param address: indicates the iBMC address
+    :param max_inflight: indicates max count of requests in flight, it is
+        the max limit of adaptive limiter
+    :param adaptive: whether to adapt the limit by AIMD
+    :return: the limiter of the address
+    """
+    if not max_inflight and not adaptive:
+        raise ValueError('Either max_inflight or adaptive is required.')
+
+    with _shared_lock:
+        limiter = _shared.get(address)
+        if limiter is None:
+            if adaptive:
+                limiter = AdaptiveConcurrencyLimiter(max_limit=max_inflight)
+            else:
+                limiter = ConcurrencyLimiter(max_inflight)
+            _shared[address] = limiter
+        return limiter
+
+
+def _average(average, value, window):
+    if average is None:
+        return value
+    alpha = 2.0 / (window + 1)
+    return average + alpha * (value - average)
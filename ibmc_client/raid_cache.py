@@ -0,0 +1,247 @@
+# Copyright 2020 HUAWEI, Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# Version 0.0.3
+import collections
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+
+from ibmc_client import raid_trace
+
+LOG = logging.getLogger(__name__)
+
+
+def canonical_drives(ctrl):
+    """get drives of a controller in canonical order
+
+    Drives are ordered by media type, protocol, capacity and firmware state,
+    drives with same properties keep their original order.
+
+    :param ctrl: indicates the storage controller
+    :return: a list of drive
+    """
+    return sorted(ctrl.drives(), key=lambda d: (
+        str(d.media_type), str(d.protocol), d.capacity_bytes or 0,
+        str(d.firmware_state)))
+
+
+def hardware_profile(ctrl, drives=None):
+    # type: (object, list) -> dict
+    """get the hardware profile of a controller
+
+    The profile holds controller identity, media type, protocol, capacity
+    and firmware state of drives in canonical order, and exists volumes
+    which refer drives by their canonical position. Controllers with same
+    profile are equivalent for RAID configuration.
+
+    :param ctrl: indicates the storage controller
+    :param drives: indicates drives of controller in canonical order
+    :return: a JSON serializable profile
+    """
+    drives = canonical_drives(ctrl) if drives is None else drives
+    positions = dict((drive.odata_id, idx)
+                     for (idx, drive) in enumerate(drives))
+    return {
+        'controller': [ctrl.id, ctrl.controller_name,
+                       sorted(ctrl.supported_raid_levels or [])],
+        'drives': [[d.media_type, d.protocol, d.capacity_bytes,
+                    d.firmware_state] for d in drives],
+        'volumes': sorted(
+            [v.raid_level, v.span_number, v.capacity_bytes,
+             sorted(positions.get(odata_id, -1) for odata_id
+                    in v.drive_odata_id_collection)]
+            for v in ctrl.volumes()),
+    }
+
+
+class RaidPlanCache(object):
+    """A bounded LRU cache of disk assignments keyed by hardware profile
+
+    Servers of a fleet usually share a handful of drive configurations, the
+    disk assignment of a controller only depends on the hardware profile of
+    the controller and the logical disks requested, so it is computed once
+    per profile and reused by all servers.
+
+    The hardware profile (check `hardware_profile`) of a controller is the
+    multiset of media type, protocol, capacity and firmware state of its
+    drives, plus exists volumes on those drives. Cached assignments refer
+    drives by their canonical position, so a cached assignment maps to
+    concrete drive ids of every server with the same profile.
+
+    Logical disks with specified physical disks refer to concrete drives,
+    they are never cached.
+    """
+
+    DEFAULT_MAX_SIZE = 128
+    """default max count of cached assignments"""
+
+    FORMAT_VERSION = 1
+    """version of persisted cache file format"""
+
+    def __init__(self, max_size=None):
+        # type: (int) -> None
+        """Initial a RAID plan cache
+
+        :param max_size: indicates max count of cached assignments, least
+            recently used ones are evicted
+        """
+        self.max_size = max_size or self.DEFAULT_MAX_SIZE
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        # type: (str) -> dict
+        """get a cached assignment and mark it as most recently used
+
+        :param key: indicates the cache key
+        :return: the cached assignment or None
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries[key] = entry
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        # type: (str, dict) -> None
+        """cache an assignment, evict least recently used ones if full
+
+        :param key: indicates the cache key
+        :param entry: indicates the assignment
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def assign(self, ctrl, pending_volumes, planner, compute):
+        """assign disks of a controller to pending volumes with cache
+
+        :param ctrl: indicates the storage controller
+        :param pending_volumes: indicates pending volumes of the controller
+        :param planner: indicates the planner used by `compute`
+        :param compute: indicates the function assigns disks when missed,
+            it returns pending volumes in the order they should be created
+        :return: pending volumes in the order they should be created
+        """
+        if any(v.use_specified_disks for v in pending_volumes):
+            return compute()
+
+        drives = canonical_drives(ctrl)
+        key = self.make_key(ctrl, drives, pending_volumes, planner)
+        trace = raid_trace.current()
+        entry = self.get(key)
+        if entry is not None:
+            trace.record('cache_hit', controller=ctrl.id, key=key)
+            return self._restore(entry, drives, pending_volumes)
+
+        trace.record('cache_miss', controller=ctrl.id, key=key)
+        ordered_pending_volumes = compute()
+        self.put(key, self._capture(drives, pending_volumes,
+                                    ordered_pending_volumes))
+        return ordered_pending_volumes
+
+    @staticmethod
+    def make_key(ctrl, drives, pending_volumes, planner):
+        # type: (object, list, list, object) -> str
+        """make cache key of the hardware profile and logical disks
+
+        :param ctrl: indicates the storage controller
+        :param drives: indicates drives of controller in canonical order
+        :param pending_volumes: indicates pending volumes of the controller
+        :param planner: indicates the planner used
+        :return: the cache key
+        """
+        profile = hardware_profile(ctrl, drives)
+        profile['logical_disks'] = [v.config for v in pending_volumes]
+        profile['planner'] = (None if planner is None else
+                              [type(planner).__name__,
+                               planner.max_candidates])
+        encoded = json.dumps(profile, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _capture(drives, pending_volumes, ordered_pending_volumes):
+        positions = dict((drive.drive_id, idx)
+                         for (idx, drive) in enumerate(drives))
+        return {'volumes': [
+            [pending_volumes.index(v),
+             [positions[drive_id] for drive_id in v.drives],
+             v.span_number, v.use_shareable_disk_group]
+            for v in ordered_pending_volumes]}
+
+    @staticmethod
+    def _restore(entry, drives, pending_volumes):
+        ordered_pending_volumes = []
+        for (idx, positions, span_number, shared) in entry['volumes']:
+            pending_volume = pending_volumes[idx]
+            pending_volume.drives = [drives[position].drive_id
+                                     for position in positions]
+            pending_volume.span_number = span_number
+            pending_volume.use_shareable_disk_group = shared
+            ordered_pending_volumes.append(pending_volume)
+        return ordered_pending_volumes
+
+    def save(self, path):
+        """persist cached assignments to a file as JSON
+
+        :param path: indicates the file path
+        """
+        with self._lock:
+            data = {'version': self.FORMAT_VERSION,
+                    'entries': [[key, entry] for (key, entry)
+                                in self._entries.items()]}
+        tmp_path = '%s.tmp' % path
+        with io.open(tmp_path, 'w', encoding='utf-8') as fp:
+            fp.write(json.dumps(data, ensure_ascii=False))
+        if hasattr(os, 'replace'):
+            os.replace(tmp_path, path)
+        else:  # pragma: no cover
+            os.rename(tmp_path, path)
+
+    def load(self, path):
+        """load cached assignments persisted by `save`
+
+        Cache files of other format versions are ignored.
+
+        :param path: indicates the file path
+        :return: count of loaded assignments
+        """
+        with io.open(path, 'r', encoding='utf-8') as fp:
+            data = json.loads(fp.read())
+        if data.get('version') != self.FORMAT_VERSION:
+            LOG.info('Ignore RAID plan cache %(path)s of version '
+                     '%(version)s.',
+                     {'path': path, 'version': data.get('version')})
+            return 0
+        for (key, entry) in data['entries']:
+            self.put(key, entry)
+        return len(data['entries'])
@@ -0,0 +1,230 @@
+# Copyright 2020 HUAWEI, Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# Version 0.0.3
+import logging
+import time
+
+from ibmc_client import exceptions
+from ibmc_client import raid_trace
+from ibmc_client import raid_utils  # noqa: F401
+
+LOG = logging.getLogger(__name__)
+
+
+class _BudgetExhausted(Exception):
+    """raised when the time budget of a search runs out"""
+
+
+class RaidPlanner(object):
+    """Plan disks of all logical disks of a controller together
+
+    The greedy way assigns disks to logical disks one by one, every logical
+    disk takes the disks which waste least for itself, which may waste more
+    capacity in total or even fail where a joint assignment would succeed.
+
+    The planner searches assignments of all logical disks together with
+    branch-and-bound. Logical disks which choose exclusive disks for a fixed
+    size (not shared, no specified disks, size is not 'max') are branched on
+    their best candidate solutions, others are assigned in the greedy way.
+    A branch is pruned when the total waste bytes of its solutions is not
+    less than the best plan found. The greedy assignment is the first best
+    plan, so the planner only differs from it when a plan wastes less or
+    the greedy way fails. When the time budget runs out, the greedy result
+    is used.
+    """
+
+    DEFAULT_TIME_BUDGET_SECONDS = 5
+    """default max seconds to search"""
+
+    DEFAULT_MAX_CANDIDATES = 8
+    """default max candidate solutions to branch on per logical disk"""
+
+    def __init__(self, time_budget=None, max_candidates=None):
+        # type: (float, int) -> None
+        """Initial a RAID planner
+
+        :param time_budget: indicates max seconds to search
+        :param max_candidates: indicates max candidate solutions to branch on
+            per logical disk
+        """
+        self.time_budget = (self.DEFAULT_TIME_BUDGET_SECONDS
+                            if time_budget is None else time_budget)
+        self.max_candidates = max_candidates or self.DEFAULT_MAX_CANDIDATES
+
+    def plan(self, logical_disks, physical_disks, physical_disk_groups):
+        # type: (list, list[raid_utils.PhysicalDisk], list) -> None
+        """assign disks to logical disks.
+
+        Same as calling `init_disks` of logical disks in order, but disks
+        are assigned jointly.
+
+        :param logical_disks: indicates ordered logical disks
+            (:class:`~ibmc_client.api.system.storage.LogicalDisk`) of a
+            controller
+        :param physical_disks: indicates all physical disks of the controller
+        :param physical_disk_groups: indicates exists physical disk groups of
+            the controller
+        :raises: exceptions.InvalidLogicalDiskConfig when no assignment could
+            satisfy all logical disks
+        """
+        search = _Search(self, logical_disks, physical_disks,
+                         physical_disk_groups)
+        initial = search.save()
+
+        greedy_error = None
+        try:
+            for logical_disk in logical_disks:
+                logical_disk.init_disks(physical_disks, physical_disk_groups)
+            search.best_cost = search.cost()
+            search.best = search.save()
+        except exceptions.InvalidLogicalDiskConfig as e:
+            greedy_error = e
+        greedy, greedy_cost = search.best, search.best_cost
+        search.restore(initial)
+
+        trace = raid_trace.current()
+        started_at = time.time()
+        search.expires_at = started_at + self.time_budget
+        try:
+            search.run(0, 0)
+            trace.record('plan_search', nodes=search.nodes,
+                         greedy=None if greedy is None else greedy_cost,
+                         best=(None if search.best is None
+                               else search.best_cost),
+                         exhausted=False)
+            LOG.info('RAID plan search finished in %(seconds).3f seconds, '
+                     '%(nodes)d nodes visited, total waste bytes %(greedy)s '
+                     '(greedy) -> %(best)s.',
+                     {'seconds': time.time() - started_at,
+                      'nodes': search.nodes,
+                      'greedy': 'n/a' if greedy is None else greedy_cost,
+                      'best': search.best_cost})
+        except _BudgetExhausted:
+            trace.record('plan_search', nodes=search.nodes,
+                         greedy=None if greedy is None else greedy_cost,
+                         best=None, exhausted=True)
+            LOG.info('RAID plan search runs out of time budget %(budget)s '
+                     'seconds after %(nodes)d nodes visited, fallback to '
+                     'greedy result.',
+                     {'budget': self.time_budget, 'nodes': search.nodes})
+            search.restore(initial)
+            if greedy is not None:
+                search.best = greedy
+
+        if search.best is None:
+            trace.record('assign_failed', reason=str(greedy_error))
+            raise greedy_error
+        search.restore(search.best)
+
+
+class _Search(object):
+    """state of a branch-and-bound search"""
+
+    def __init__(self, planner, logical_disks, physical_disks,
+                 physical_disk_groups):
+        self.planner = planner
+        self.logical_disks = logical_disks
+        self.physical_disks = physical_disks
+        self.physical_disk_groups = physical_disk_groups
+        self.disks_by_drive_id = dict((disk.drive_id, disk)
+                                      for disk in physical_disks)
+        self.best = None
+        self.best_cost = float('inf')
+        self.expires_at = None
+        self.nodes = 0
+
+    def save(self):
+        """save assignment state of disks, disk groups and logical disks"""
+        return ([disk.exclusive for disk in self.physical_disks],
+                [(group, group.save_state())
+                 for group in self.physical_disk_groups],
+                [(list(v.drives), v.span_number, v.use_shareable_disk_group)
+                 for v in self.logical_disks])
+
+    def restore(self, state):
+        (exclusive_list, groups, volumes) = state
+        for (disk, exclusive) in zip(self.physical_disks, exclusive_list):
+            disk.exclusive = exclusive
+        self.physical_disk_groups[:] = [group for (group, _) in groups]
+        for (group, group_state) in groups:
+            group.restore_state(group_state)
+        for (volume, (drives, span, shareable)) in zip(self.logical_disks,
+                                                       volumes):
+            volume.drives = list(drives)
+            volume.span_number = span
+            volume.use_shareable_disk_group = shareable
+
+    def waste_of(self, logical_disk):
+        """waste bytes of disks assigned to a logical disk"""
+        if logical_disk.use_shareable_disk_group or not logical_disk.drives:
+            return 0
+        capacities = [self.disks_by_drive_id[drive_id].capacity_bytes
+                      for drive_id in logical_disk.drives]
+        return sum(capacities) - min(capacities) * len(capacities)
+
+    def cost(self):
+        return sum(self.waste_of(v) for v in self.logical_disks)
+
+    @staticmethod
+    def is_branchable(logical_disk):
+        return (not logical_disk.share_physical_disks
+                and not logical_disk.use_specified_disks
+                and not logical_disk.auto_scale)
+
+    def candidates(self, logical_disk):
+        excludable_disks = logical_disk.get_excludable_disks(
+            self.physical_disks)
+        try:
+            return logical_disk.raid_setting.get_matched_disks_candidates(
+                logical_disk.capacity_bytes, excludable_disks,
+                logical_disk.number_of_physical_disks,
+                self.planner.max_candidates)
+        except exceptions.IBMCClientError:
+            return []
+
+    def run(self, index, cost):
+        self.nodes += 1
+        if time.time() > self.expires_at:
+            raise _BudgetExhausted()
+
+        if index == len(self.logical_disks):
+            if cost < self.best_cost:
+                self.best_cost = cost
+                self.best = self.save()
+            return
+
+        logical_disk = self.logical_disks[index]
+        before = self.save()
+        if not self.is_branchable(logical_disk):
+            try:
+                logical_disk.init_disks(self.physical_disks,
+                                        self.physical_disk_groups)
+            except exceptions.InvalidLogicalDiskConfig:
+                self.restore(before)
+                return
+            cost += self.waste_of(logical_disk)
+            if cost < self.best_cost:
+                self.run(index + 1, cost)
+            self.restore(before)
+            return
+
+        # candidates are ordered by waste, prune the rest once exceeds
+        for solution in self.candidates(logical_disk):
+            branch_cost = cost + solution.disks_waste_bytes
+            if branch_cost >= self.best_cost:
+                break
+            logical_disk.use_exclusive_solution(solution)
+            self.run(index + 1, branch_cost)
+            self.restore(before)
@@ -0,0 +1,134 @@
+# Copyright 2020 HUAWEI, Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# Version 0.0.3
+import contextlib
+import json
+import threading
+
+_local = threading.local()
+
+
+class PlanTrace(object):
+    """A trace of RAID planning decisions which records nothing
+
+    Searches record candidates and decisions to the trace active in current
+    thread (check `using`). This trace is active by default, it drops
+    everything, and searches skip building events when trace is not
+    `enabled`, so tracing costs nothing unless a
+    :class:`RecordingPlanTrace` is used.
+    """
+
+    enabled = False
+    """whether events are recorded"""
+
+    def record(self, event, **attrs):
+        """record an event
+
+        :param event: indicates event name
+        :param attrs: indicates JSON serializable attributes of the event
+        """
+
+
+class RecordingPlanTrace(PlanTrace):
+    """A trace of RAID planning decisions which records all events
+
+    Recorded events could be exported as JSON, for post-mortem of a failed
+    or unexpected plan. A typical event looks like::
+
+        {"event": "better_solution", "raid": "RAID5", "span": 1,
+         "drives": [0, 1, 2], "waste": 0, "total": 1800000000000}
+    """
+
+    enabled = True
+
+    def __init__(self, max_events=None):
+        # type: (int) -> None
+        """Initial a recording trace
+
+        :param max_events: indicates max events to keep, later events are
+            counted as dropped. unlimited if not present
+        """
+        self.max_events = max_events
+        self.events = []
+        """recorded events, a list of dict"""
+        self.dropped = 0
+        """count of events dropped because of `max_events`"""
+
+    def record(self, event, **attrs):
+        if self.max_events is not None and len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        attrs['event'] = event
+        self.events.append(attrs)
+
+    def find(self, event):
+        # type: (str) -> list[dict]
+        """get all events with the name
+
+        :param event: indicates event name
+        :return: a list of event
+        """
+        return [_ for _ in self.events if _['event'] == event]
+
+    def to_dict(self):
+        # type: () -> dict
+        """get a JSON serializable view of the trace"""
+        return {'events': list(self.events), 'dropped': self.dropped}
+
+    def dump(self, fp):
+        """write the trace to a file-like object as JSON
+
+        :param fp: indicates the file-like object
+        """
+        json.dump(self.to_dict(), fp, indent=2, sort_keys=True)
+
+    def dumps(self):
+        # type: () -> str
+        """get the trace as JSON string"""
+        return json.dumps(self.to_dict(), indent=2, sort_keys=True)
+
+
+NOOP_TRACE = PlanTrace()
+"""the trace used when no trace is active"""
+
+
+def current():
+    # type: () -> PlanTrace
+    """get the trace active in current thread
+
+    :return: the active trace, `NOOP_TRACE` if none
+    """
+    return getattr(_local, 'trace', NOOP_TRACE)
+
+
+@contextlib.contextmanager
+def using(trace):
+    """make a trace active in current thread in the context
+
+    Nothing changes if trace is None, so callers could pass their optional
+    trace argument through.
+
+    :param trace: indicates the trace to use
+    """
+    if trace is None:
+        yield current()
+        return
+
+    previous = current()
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
@@ -14,16 +14,37 @@
 
 # Version 0.0.3
 
+import bisect
 import collections
+import heapq
 import logging
 import math
 
 from ibmc_client import exceptions
+from ibmc_client import raid_trace
 from ibmc_client.resources.chassis import drive as DRIVE
 from ibmc_client.resources.system import storage
 
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
 LOG = logging.getLogger(__name__)
 
+# RAID solution scoring backends
+SCORING_BACKEND_AUTO = 'auto'
+"""use NumPy when it is installed and there are enough windows to score"""
+
+SCORING_BACKEND_PYTHON = 'python'
+"""score windows one by one in pure python"""
+
+SCORING_BACKEND_NUMPY = 'numpy'
+"""score all windows at once as NumPy arrays, NumPy is required"""
+
+_NUMPY_MAX_BYTES = 2 ** 62
+"""max capacity bytes sum which could be scored as int64 arrays safely"""
+
 # RAID Levels
 JBOD = 'JBOD'
 """No RAID, JBOD mode"""
@@ -130,7 +151,11 @@ class PhysicalDiskGroup(object):
     overhead = None
     capacity_bytes = None
     used_capacity_bytes_list = None
+    """capacity bytes of exists volumes, use `add_used_capacity_bytes` to
+    add, running total is maintained there"""
     pending_capacity_bytes_list = None
+    """capacity bytes of pending volumes, use `add_pending_capacity_bytes`
+    to add, running total is maintained there"""
 
     def __init__(self, drives, raid_setting, span_number):
         # type: (list[DRIVE.Drive], Raid, int) -> None
@@ -142,6 +167,10 @@ class PhysicalDiskGroup(object):
                                * (len(self.drives) - self.overhead))
         self.pending_capacity_bytes_list = []
         self.used_capacity_bytes_list = []
+        self._used_capacity_bytes = 0
+        self._pending_capacity_bytes = 0
+        # (PhysicalDiskGroupList, seq) of every list which indexes this group
+        self._indexed_by = []
 
     @staticmethod
     def from_volume(volume, all_drives):
@@ -159,16 +188,20 @@ class PhysicalDiskGroup(object):
 
     @property
     def used_capacity_bytes(self):
-        return sum(self.used_capacity_bytes_list)
+        return self._used_capacity_bytes
 
     @property
     def pending_capacity_bytes(self):
-        return sum(self.pending_capacity_bytes_list)
+        return self._pending_capacity_bytes
 
     @property
     def left_capacity_bytes(self):
-        return (self.capacity_bytes - self.used_capacity_bytes
-                - self.pending_capacity_bytes)
+        return (self.capacity_bytes - self._used_capacity_bytes
+                - self._pending_capacity_bytes)
+
+    def _on_left_capacity_changed(self, previous_left):
+        for (index, seq) in self._indexed_by:
+            index._reindex_group(self, seq, previous_left)
 
     def has_capacity_for(self, target_capacity):
         """check whether this disk group has enough left capacity for target
@@ -183,11 +216,12 @@ class PhysicalDiskGroup(object):
 
     def add_pending_capacity_bytes(self, target_capacity):
         if self.has_capacity_for(target_capacity):
+            previous_left = self.left_capacity_bytes
             if target_capacity == -1:
-                self.pending_capacity_bytes_list.append(
-                    self.left_capacity_bytes)
-            else:
-                self.pending_capacity_bytes_list.append(target_capacity)
+                target_capacity = previous_left
+            self.pending_capacity_bytes_list.append(target_capacity)
+            self._pending_capacity_bytes += target_capacity
+            self._on_left_capacity_changed(previous_left)
 
     def owns_volume(self, volume):
         # type: (storage.Volume) -> bool
@@ -224,7 +258,32 @@ class PhysicalDiskGroup(object):
             raise exceptions.NotSuitablePhysicalDiskGroup(message=message)
 
     def add_used_capacity_bytes(self, used_capacity_bytes):
+        previous_left = self.left_capacity_bytes
         self.used_capacity_bytes_list.append(used_capacity_bytes)
+        self._used_capacity_bytes += used_capacity_bytes
+        self._on_left_capacity_changed(previous_left)
+
+    def save_state(self):
+        """save capacity state, which could be restored later
+
+        :return: an opaque state object
+        """
+        return (list(self.used_capacity_bytes_list),
+                list(self.pending_capacity_bytes_list),
+                self._used_capacity_bytes, self._pending_capacity_bytes)
+
+    def restore_state(self, state):
+        """restore capacity state saved by `save_state`
+
+        :param state: the state object returned by `save_state`
+        """
+        previous_left = self.left_capacity_bytes
+        self.used_capacity_bytes_list = list(state[0])
+        self.pending_capacity_bytes_list = list(state[1])
+        self._used_capacity_bytes = state[2]
+        self._pending_capacity_bytes = state[3]
+        if self.left_capacity_bytes != previous_left:
+            self._on_left_capacity_changed(previous_left)
 
     @property
     def drive_id_list(self):
@@ -278,15 +337,11 @@ class PhysicalDiskGroup(object):
 
         return False  # pragma: no cover
 
-    def log(self, find):
-        fmt_kwargs = {'disk_group': str(self),
-                      'left': self.left_capacity_bytes}
-        if find:
-            LOG.info('Find a better choice:: disk-group->%(disk_group)s, '
-                     'left-capacity-bytes: %(left)d', fmt_kwargs)
-        else:
-            LOG.info('Not a better choice:: disk-group->%(disk_group)s, '
-                     'left-capacity-bytes: %(left)d', fmt_kwargs)
+    def summary(self):
+        # type: () -> dict
+        """get a JSON serializable summary used by plan trace"""
+        return {'disk_group': str(self), 'raid': self.raid_setting.name,
+                'span': self.span_number, 'left': self.left_capacity_bytes}
 
     def __repr__(self):  # pragma: no cover
         return str(self)
@@ -296,6 +351,118 @@ class PhysicalDiskGroup(object):
                                              ','.join(self.drive_id_list))
 
 
+class PhysicalDiskGroupList(list):
+    """A list of physical disk groups indexed by (raid level, left capacity)
+
+    Groups are kept ordered by left capacity per raid level, the index is
+    updated whenever left capacity of a group changes, so the best matched
+    group could be found with binary search instead of scanning all groups.
+    Groups with same left capacity are ordered by their position in list.
+    """
+
+    def __init__(self, groups=()):
+        super(PhysicalDiskGroupList, self).__init__(groups)
+        self._groups = {}
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        # groups indexed before may have been removed from this list
+        for group in self._groups.values():
+            group._indexed_by = [(index, seq)
+                                 for (index, seq) in group._indexed_by
+                                 if index is not self]
+        self._seq = 0
+        self._keys = collections.defaultdict(list)
+        """raid level -> sorted (left capacity bytes, seq) list"""
+        self._groups = {}
+        """seq -> group"""
+        for group in self:
+            self._index_group(group)
+
+    def _index_group(self, group):
+        # type: (PhysicalDiskGroup) -> None
+        self._seq += 1
+        group._indexed_by.append((self, self._seq))
+        self._groups[self._seq] = group
+        bisect.insort(self._keys[group.raid_setting.name],
+                      (group.left_capacity_bytes, self._seq))
+
+    def _reindex_group(self, group, seq, previous_left):
+        # type: (PhysicalDiskGroup, int, int) -> None
+        if self._groups.get(seq) is not group:
+            return  # group has been removed from this list
+        keys = self._keys[group.raid_setting.name]
+        del keys[bisect.bisect_left(keys, (previous_left, seq))]
+        bisect.insort(keys, (group.left_capacity_bytes, seq))
+
+    def append(self, group):
+        super(PhysicalDiskGroupList, self).append(group)
+        self._index_group(group)
+
+    def extend(self, groups):
+        for group in groups:
+            self.append(group)
+
+    def __setitem__(self, key, value):
+        super(PhysicalDiskGroupList, self).__setitem__(key, value)
+        self._rebuild_index()
+
+    def __setslice__(self, i, j, groups):  # pragma: no cover
+        # python 2 only
+        super(PhysicalDiskGroupList, self).__setslice__(i, j, groups)
+        self._rebuild_index()
+
+    def __delitem__(self, key):
+        super(PhysicalDiskGroupList, self).__delitem__(key)
+        self._rebuild_index()
+
+    def __delslice__(self, i, j):  # pragma: no cover
+        # python 2 only
+        super(PhysicalDiskGroupList, self).__delslice__(i, j)
+        self._rebuild_index()
+
+    def insert(self, index, group):
+        super(PhysicalDiskGroupList, self).insert(index, group)
+        self._rebuild_index()
+
+    def remove(self, group):
+        super(PhysicalDiskGroupList, self).remove(group)
+        self._rebuild_index()
+
+    def pop(self, index=-1):
+        group = super(PhysicalDiskGroupList, self).pop(index)
+        self._rebuild_index()
+        return group
+
+    def get_best_matched(self, raid, target_capacity):
+        # type: (Raid, int) -> PhysicalDiskGroup
+        """get best matched group, same as
+        `Raid.get_best_matched_disk_group` does.
+
+        :param raid: indicates the target raid setting
+        :param target_capacity: -1 for 'max'; int for bytes;
+        :return: the best matched group or None
+        """
+        keys = self._keys.get(raid.name)
+        if not keys:
+            return None
+
+        if target_capacity == -1:
+            # as much left capacity as better
+            most_left = keys[-1][0]
+            if most_left <= 0:
+                return None
+            idx = bisect.bisect_left(keys, (most_left,))
+        elif target_capacity > 0:
+            # waste as less as better
+            idx = bisect.bisect_left(keys, (target_capacity,))
+            if idx == len(keys):
+                return None
+        else:
+            return None
+        return self._groups[keys[idx][1]]
+
+
 class RaidSolution(object):
     """RAID solution summary
 
@@ -380,25 +547,30 @@ class RaidSolution(object):
 
         return self.waste_less_than(other)
 
-    def log(self, find):
-        fmt_kwargs = {'span': self.span, 'waste': self.disks_waste_bytes,
-                      'used': self.disks_total_bytes, 'disks': self.disks,
-                      'effect': self.raid_total_bytes}
-        if find:
-            LOG.info('Find a better choice:: span->%(span)d, '
-                     'total-waste-bytes->%(waste)d, '
-                     'used-disks-total-bytes->%(used)d, '
-                     'raid-volume-bytes->%(effect)d, '
-                     'disks->%(disks)s', fmt_kwargs)
-        else:
-            LOG.info('Not a better choice:: span->%(span)d, '
-                     'total-waste-bytes->%(waste)d, '
-                     'used-disks-total-bytes->%(used)d, '
-                     'raid-volume-bytes->%(effect)d, '
-                     'disks->%(disks)s', fmt_kwargs)
+    def summary(self):
+        # type: () -> dict
+        """get a JSON serializable summary used by plan trace"""
+        return {'span': self.span,
+                'drives': [disk.drive_id for disk in self.disks],
+                'waste': self.disks_waste_bytes,
+                'total': self.disks_total_bytes,
+                'raid_bytes': self.raid_total_bytes}
+
+    def __str__(self):
+        return ('RaidSolution(span->%d, total-waste-bytes->%d, '
+                'raid-volume-bytes->%d, disks->%s)'
+                % (self.span, self.disks_waste_bytes, self.raid_total_bytes,
+                   self.disks))
 
 
 class Raid(object):
+    SCORING_BACKEND = SCORING_BACKEND_AUTO
+    """backend used to score candidate windows of disks"""
+
+    NUMPY_MIN_WINDOWS = 64
+    """min window count to score with NumPy in auto backend, NumPy call
+    overhead outweighs for less windows"""
+
     key = None
     name = None
     min_disks = None
@@ -462,29 +634,130 @@ class Raid(object):
             list
         :return:
         """
+        trace = raid_trace.current()
+        if (isinstance(physical_disk_groups, PhysicalDiskGroupList)
+                and not trace.enabled):
+            # trace records every candidate, so it always scans
+            best_choice = physical_disk_groups.get_best_matched(
+                self, target_capacity)
+        else:
+            best_choice = self._scan_disk_groups(
+                target_capacity, physical_disk_groups, trace)
 
-        LOG.info('Try to get best matched disk-group for '
-                 'volume(%(raid_level)s) with target capacity %(capacity)d '
-                 'using waste least strategy',
-                 {'raid_level': self.name, 'capacity': target_capacity})
+        LOG.info('Best matched disk-group for volume(%(raid_level)s) with '
+                 'target capacity %(capacity)d among %(count)d disk-groups:: '
+                 '%(disk_group)s.',
+                 {'raid_level': self.name, 'capacity': target_capacity,
+                  'count': len(physical_disk_groups),
+                  'disk_group': best_choice})
+        if trace.enabled:
+            trace.record('disk_group_chosen', raid=self.name,
+                         target=target_capacity,
+                         disk_group=(best_choice.summary()
+                                     if best_choice else None))
+        return best_choice
 
+    def _scan_disk_groups(self, target_capacity, physical_disk_groups,
+                          trace):
+        # type: (int, list[PhysicalDiskGroup], object) -> PhysicalDiskGroup
+        """get best matched physical disk group by checking every group"""
         best_choice = None
         for disk_group in physical_disk_groups:
             try:
                 disk_group.validate_if_suitable_for(target_capacity, self)
             except exceptions.NotSuitablePhysicalDiskGroup as e:
-                LOG.info("%(disk_group)s is not a choice:: %(reason)s",
-                         {'disk_group': str(disk_group), 'reason': str(e)})
-                pass
+                if trace.enabled:
+                    trace.record('reject_disk_group', target=target_capacity,
+                                 reason=str(e), **disk_group.summary())
             else:
                 better = disk_group.is_better_than(target_capacity,
                                                    best_choice)
-                disk_group.log(better)
+                if trace.enabled:
+                    trace.record('disk_group_candidate',
+                                 target=target_capacity, better=better,
+                                 **disk_group.summary())
                 if better:
                     best_choice = disk_group
-
         return best_choice
 
+    @staticmethod
+    def _get_best_window(target_capacity, capacities, first, disk_count,
+                         overhead):
+        # type: (int, list[int], int, int, int) -> tuple
+        """get the best window of `disk_count` consecutive disks.
+
+        Windows are slid over capacity sorted disks from index `first` on,
+        the window total is maintained incrementally, so every window costs
+        O(1). Windows are ranked same as `RaidSolution.is_better_than`, the
+        first one wins when several windows are equal.
+
+        :param target_capacity: -1 for 'max'; int for bytes;
+        :param capacities: indicates capacity bytes of sorted disks
+        :param first: indicates the index of first disk could be used
+        :param disk_count: indicates the window size
+        :param overhead: indicates RAID overhead disk count
+        :return: a tuple of (window start index, ranking key), ranking key is
+            None when no window could be a solution, a less key is better.
+        """
+        if target_capacity <= 0 and target_capacity != -1:
+            return first, None
+
+        backend = Raid.SCORING_BACKEND
+        if backend == SCORING_BACKEND_NUMPY and numpy is None:
+            raise ImportError('NumPy is required by RAID solution scoring '
+                              'backend `%s`.' % backend)
+        if (backend == SCORING_BACKEND_NUMPY
+                or (backend == SCORING_BACKEND_AUTO and numpy is not None
+                    and len(capacities) - first - disk_count + 1
+                    >= Raid.NUMPY_MIN_WINDOWS)):
+            if capacities[-1] * len(capacities) < _NUMPY_MAX_BYTES:
+                return Raid._get_best_window_vectorized(
+                    target_capacity, capacities, first, disk_count, overhead)
+
+        best_start, best_key = first, None
+        total = sum(capacities[first:first + disk_count])
+        for start in range(first, len(capacities) - disk_count + 1):
+            if start > first:
+                total += (capacities[start + disk_count - 1]
+                          - capacities[start - 1])
+            min_bytes = capacities[start]
+            waste = total - min_bytes * disk_count
+            if target_capacity > 0:
+                key = (waste, total, disk_count)
+            else:
+                key = (-min_bytes * (disk_count - overhead), waste, total,
+                       disk_count)
+            if best_key is None or key < best_key:
+                best_start, best_key = start, key
+        return best_start, best_key
+
+    @staticmethod
+    def _get_best_window_vectorized(target_capacity, capacities, first,
+                                    disk_count, overhead):
+        # type: (int, list[int], int, int, int) -> tuple
+        """same as `_get_best_window`, but all windows are scored at once as
+        NumPy arrays.
+        """
+        sizes = numpy.array(capacities[first:], dtype=numpy.int64)
+        sums = numpy.concatenate(([0], numpy.cumsum(sizes)))
+        totals = sums[disk_count:] - sums[:-disk_count]
+        min_bytes = sizes[:len(totals)]
+        wastes = totals - min_bytes * disk_count
+        if target_capacity > 0:
+            ranking = (wastes, totals)
+        else:
+            ranking = (-min_bytes * (disk_count - overhead), wastes, totals)
+
+        # narrow down candidates key by key, the first candidate wins ties
+        candidates = numpy.arange(len(totals))
+        for scores in ranking:
+            scores = scores[candidates]
+            candidates = candidates[scores == scores.min()]
+        best = int(candidates[0])
+
+        key = tuple(int(scores[best]) for scores in ranking) + (disk_count,)
+        return first + best, key
+
     def get_best_matched_disks(self, target_capacity, available_disks,
                                disk_count_to_use):
         # type: (int, list[PhysicalDisk], int) -> RaidSolution
@@ -500,43 +773,148 @@ class Raid(object):
         if self.name == JBOD:  # pragma: no cover
             return None
 
-        LOG.info('Calculate waste least disks for volume(%(raid_level)s) with'
-                 ' target capacity %(capacity)d, available disks: %(disks)s.',
+        trace = raid_trace.current()
+        if trace.enabled:
+            trace.record('search_disks', raid=self.name,
+                         target=target_capacity, disks=len(available_disks),
+                         disk_count_to_use=disk_count_to_use)
+
+        best_solution = None
+        best_key = None
+        windows = 0
+        for (span, sorted_disks, capacities, first_matched,
+             required_disk_count, overhead) in self._iter_windows(
+                target_capacity, available_disks, disk_count_to_use):
+            start, key = self._get_best_window(
+                target_capacity, capacities, first_matched,
+                required_disk_count, overhead)
+            windows += (len(capacities) - first_matched
+                        - required_disk_count + 1)
+            if trace.enabled:
+                trace.record('window_set', raid=self.name, span=span,
+                             disk_count=required_disk_count,
+                             first=first_matched, disks=len(capacities),
+                             key=list(key) if key else None)
+            if key is not None and (best_key is None or key < best_key):
+                best_key = key
+                end = start + required_disk_count
+                best_solution = RaidSolution(
+                    span, sorted_disks[start:end], overhead)
+                if trace.enabled:
+                    trace.record('better_solution', raid=self.name,
+                                 **best_solution.summary())
+
+        LOG.info('Best matched disks for volume(%(raid_level)s) with target '
+                 'capacity %(capacity)d among %(count)d disks, %(windows)d '
+                 'windows scored:: %(solution)s.',
                  {'raid_level': self.name, 'capacity': target_capacity,
-                  'disks': available_disks})
+                  'count': len(available_disks), 'windows': windows,
+                  'solution': best_solution})
+        return best_solution
 
+    def get_matched_disks_candidates(self, target_capacity, available_disks,
+                                     disk_count_to_use, limit):
+        # type: (int, list[PhysicalDisk], int, int) -> list[RaidSolution]
+        """get the best several candidate disks for target capacity size with
+        current raid, ranked same as `get_best_matched_disks`.
+
+        Candidates which have same span, disk count, waste and total bytes
+        are interchangeable, only the first one of them is kept.
+
+        :param target_capacity: target capacity
+        :param available_disks: a list available physical disk
+        :param disk_count_to_use: disk count to use if not None
+            else auto choose
+        :param limit: indicates max candidate count
+        :return: a list of solution, the best one goes first
+        """
+        if self.name == JBOD or target_capacity <= 0:  # pragma: no cover
+            return []
+
+        ranked = {}
+        seq = 0
+        for (span, sorted_disks, capacities, first_matched,
+             required_disk_count, overhead) in self._iter_windows(
+                target_capacity, available_disks, disk_count_to_use):
+            total = sum(capacities[first_matched:
+                                   first_matched + required_disk_count])
+            last_start = len(capacities) - required_disk_count
+            for start in range(first_matched, last_start + 1):
+                if start > first_matched:
+                    total += (capacities[start + required_disk_count - 1]
+                              - capacities[start - 1])
+                waste = total - capacities[start] * required_disk_count
+                key = (waste, total, required_disk_count)
+                identity = (span,) + key
+                if identity not in ranked:
+                    seq += 1
+                    ranked[identity] = (key, seq, span, sorted_disks, start,
+                                        required_disk_count, overhead)
+
+        best = heapq.nsmallest(limit, ranked.values(),
+                               key=lambda _: (_[0], _[1]))
+        trace = raid_trace.current()
+        if trace.enabled:
+            trace.record('candidates', raid=self.name,
+                         target=target_capacity, disks=len(available_disks),
+                         distinct=len(ranked), kept=len(best))
+        return [RaidSolution(span, sorted_disks[start:start + count],
+                             overhead)
+                for (_, _, span, sorted_disks, start, count, overhead)
+                in best]
+
+    def _iter_windows(self, target_capacity, available_disks,
+                      disk_count_to_use):
+        # type: (int, list[PhysicalDisk], int) -> collections.Iterator
+        """generate window sets which could be candidate solutions.
+
+        :param target_capacity: target capacity
+        :param available_disks: a list available physical disk
+        :param disk_count_to_use: disk count to use if not None
+            else auto choose
+        :raises: exceptions.InvalidPhysicalDiskNumber when disk count to use
+            does not match this raid level with any span
+        :return: a generator of (span, sorted disks, sorted capacities,
+            index of first disk has required capacity, window size, overhead)
+            tuple
+        """
         raid = RAID_SETTINGS.get(self.raid_level) if self.is_spanned else self
         available_span_list = [1] if not self.is_spanned else list(range(2, 9))
 
         grouped_by_media_type = collections.defaultdict(list)
         for disk in available_disks:
             grouped_by_media_type[disk.media_type].append(disk)
-        LOG.info('Group available disks by media type: %(disks)s',
-                 {'disks': str(grouped_by_media_type)})
 
+        trace = raid_trace.current()
         is_specified_disk_count_legal = disk_count_to_use is None
-        best_solution = None
         for (media_type, disks_by_media_type) in grouped_by_media_type.items():
-            LOG.info('Try to calculate for media type `%(media_type)s` now.',
-                     {'media_type': media_type})
+            if trace.enabled:
+                trace.record('media_type', raid=self.name,
+                             media_type=media_type,
+                             disks=len(disks_by_media_type))
+            # capacity sorted index, built once per media type. sort is
+            # stable, so disks with same capacity keep their original order.
+            sorted_disks = sorted(disks_by_media_type,
+                                  key=lambda d: d.capacity_bytes)
+            capacities = [disk.capacity_bytes for disk in sorted_disks]
             for span in available_span_list:
                 if disk_count_to_use:
                     if disk_count_to_use % span != 0:
-                        LOG.info(
-                            'Specified disk count number `%(disk_count)d` does'
-                            ' not match span number %(span)d, continue.',
-                            {'span': span, 'disk_count': disk_count_to_use})
+                        if trace.enabled:
+                            trace.record(
+                                'skip_span', raid=self.name, span=span,
+                                reason='specified disk count %d does not '
+                                       'match span' % disk_count_to_use)
                         continue
 
                     disk_count_to_use_per_span = disk_count_to_use / span
                     if (disk_count_to_use_per_span < raid.min_disks or
                             disk_count_to_use_per_span > raid.max_disks):
-                        LOG.info(
-                            'Specified disk count number `%(disk_count)d` '
-                            'does not match raid-level %(raid)s with '
-                            'span %(span)d, continue.',
-                            {'span': span, 'disk_count': disk_count_to_use,
-                             'raid': self.key})
+                        if trace.enabled:
+                            trace.record(
+                                'skip_span', raid=self.name, span=span,
+                                reason='specified disk count %d does not '
+                                       'match raid level' % disk_count_to_use)
                         continue
 
                     is_specified_disk_count_legal = True
@@ -547,54 +925,37 @@ class Raid(object):
                              raid.max_disks * span)
                 overhead = raid.overhead * span
 
-                if min_disks > len(disks_by_media_type):
-                    LOG.info('Disk count(%(disk_count)d) is less than '
-                             'min-disks(%(min_disks)d), break current branch.',
-                             {'disk_count': len(disks_by_media_type),
-                              'min_disks': min_disks})
+                if min_disks > len(capacities):
+                    if trace.enabled:
+                        trace.record(
+                            'skip_span', raid=self.name, span=span,
+                            reason='disk count %d is less than min disks %d'
+                                   % (len(capacities), min_disks))
                     break
 
-                max_disk_count = min(max_disks, len(disks_by_media_type))
+                max_disk_count = min(max_disks, len(capacities))
                 for required_disk_count in range(
                         min_disks, max_disk_count + 1, span):
-
-                    LOG.info('Calculate for span:: %(span)d, disk-count:: %('
-                             'disk_count)d.',
-                             {'span': span, 'disk_count': required_disk_count})
-
                     if required_disk_count % span != 0:  # pragma: no cover
-                        LOG.info(
-                            'Disk count %(disk_count)d does not match span '
-                            'number %(span)d, continue.',
-                            {'span': span, 'disk_count': required_disk_count})
                         continue
 
                     required_capacity = math.ceil(
                         target_capacity / (required_disk_count - overhead))
-                    matched_disks = [_ for _ in disks_by_media_type
-                                     if _.capacity_bytes >= required_capacity]
-                    if len(matched_disks) < required_disk_count:
-                        LOG.info('Not enough disks has required capacity '
-                                 '%(required_capacity)d, required %('
-                                 'disk_count)d actual %(actual)d.',
-                                 {'required_capacity': required_capacity,
-                                  'disk_count': required_disk_count,
-                                  'actual': len(matched_disks)})
+                    # disks from `first_matched` on have required capacity
+                    first_matched = bisect.bisect_left(capacities,
+                                                       required_capacity)
+                    matched_count = len(capacities) - first_matched
+                    if matched_count < required_disk_count:
+                        if trace.enabled:
+                            trace.record(
+                                'skip_disk_count', raid=self.name, span=span,
+                                disk_count=required_disk_count,
+                                required_capacity=required_capacity,
+                                matched=matched_count)
                         continue
 
-                    # sort matched disks
-                    sorted_matched_disks = sorted(
-                        matched_disks, key=lambda d: d.capacity_bytes)
-                    cases = len(matched_disks) - required_disk_count + 1
-                    for start in range(0, cases):
-                        end = start + required_disk_count
-                        possible_disks = sorted_matched_disks[start:end]
-                        solution = RaidSolution(span, possible_disks, overhead)
-                        better = solution.is_better_than(target_capacity,
-                                                         best_solution)
-                        solution.log(better)
-                        if better:
-                            best_solution = solution
+                    yield (span, sorted_disks, capacities, first_matched,
+                           required_disk_count, overhead)
 
                     """
                     In waste less scene::
@@ -602,15 +963,18 @@ class Raid(object):
                       it means all disks will always in possible disks later.
                       then the greater disk-count-per-span is, waste the more.
                     """
-                    if (len(matched_disks) == len(disks_by_media_type)
-                            and target_capacity > 0):
+                    if first_matched == 0 and target_capacity > 0:
                         break
 
         if not is_specified_disk_count_legal:
             raise exceptions.InvalidPhysicalDiskNumber(
                 number_of_physical_disks=disk_count_to_use, raid=self.key)
 
-        return best_solution
+
+def _mirrored_span(disk_count):
+    # type: (int) -> int
+    """span count of RAID10, a module function to keep settings picklable"""
+    return disk_count >> 1
 
 
 RAID_SETTINGS = {
@@ -664,7 +1028,7 @@ RAID_SETTINGS = {
         'name': RAID10,
         'raid_type': RAID_TYPE_SPANNED,
         'raid_level': '1',
-        'span': lambda disk_count: disk_count >> 1,
+        'span': _mirrored_span,
         'level': 10
     }),
     '5+0': Raid(**{
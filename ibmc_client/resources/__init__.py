@@ -14,7 +14,7 @@
 
 # Version 0.0.2
 
-from pprint import pformat
+import copy
 
 # Resource Property keys
 import ibmc_client as ibmc
@@ -27,6 +27,18 @@ PROP_COLLECTION_MEMBER_COUNT = 'Members@odata.count'
 """collection resource member count"""
 
 
+class JsonResponse(object):
+    """A response like object holds resource JSON, it is used to build
+    resources without iBMC"""
+
+    def __init__(self, json, etag=None):
+        self._json = json
+        self.headers = {constants.HEADER_ETAG: etag} if etag else {}
+
+    def json(self):
+        return self._json
+
+
 class BaseResource(object):
     """iBMC Resource Base Model"""
 
@@ -47,6 +59,33 @@ class BaseResource(object):
         self._connector = self._ibmc_client.connector if ibmc_client else None
         self.refresh(resp)
 
+    @classmethod
+    def from_json(cls, json, ibmc_client=None):
+        """build a resource from its redfish JSON
+
+        :param json: indicates the redfish JSON of resource
+        :param ibmc_client: a reference to global
+            :class:`~ibmc_client.IBMCClient` object, resources built without
+            it could not send any request
+        :return: the resource
+        """
+        return cls(JsonResponse(json), ibmc_client=ibmc_client)
+
+    def to_json(self):
+        """get a copy of redfish JSON of this resource
+
+        :return: redfish JSON
+        """
+        return copy.deepcopy(self._json)
+
+    def __getstate__(self):
+        # resources are pickled to move between processes, the iBMC client
+        # and response are not picklable, unpickled resources could not
+        # send any request, the same as resources built by `from_json`
+        state = dict(self.__dict__)
+        state.update(_ibmc_client=None, _connector=None, _resp=None)
+        return state
+
     def extra_init_action(self):
         """Per Resource customer init action
 
@@ -85,6 +124,7 @@ class BaseResource(object):
         """
         Returns the string representation of the model
         """
+        from pprint import pformat
         return pformat(self._json)  # pragma: no cover
 
     def __repr__(self):
@@ -168,16 +168,16 @@ class Drive(BaseResource):
                                            json=payload, etag=self.etag)
             self.refresh(resp)
 
-    def restore(self):
-        """restore drive, include operations:
+    @property
+    def restore_settings(self):
+        """get settings required to restore drive, include:
 
         - [o] set hot-spare type to None if current state is HotSpareDrive
         - [x] (deprecated) set disk state to UnconfiguredGood if current
         state is JBOD
 
-        :return:
+        :return: settings to apply, empty dict if nothing to restore
         """
-        LOG.info('Start to restore drive %s.', self.id)
         settings = {}
         if self.firmware_state == constants.DRIVE_FM_STATE_HOTSPARE:
             settings['hotspare_type'] = constants.HOT_SPARE_NONE
@@ -186,7 +186,23 @@ class Drive(BaseResource):
         # if self.firmware_state == constants.DRIVE_FM_STATE_JBOD:
         #     settings['firmware_state'] =
         #     constants.DRIVE_FM_STATE_UNCONFIG_GOOD
+        return settings
 
+    @property
+    def need_restore(self):
+        """whether drive has anything to restore
+
+        :return: true if yes else false
+        """
+        return bool(self.restore_settings)
+
+    def restore(self):
+        """restore drive, check `restore_settings` for details.
+
+        :return:
+        """
+        LOG.info('Start to restore drive %s.', self.id)
+        settings = self.restore_settings
         if settings:
             self.set(**settings)
             logging.info('drive %s has been restored, restore settings:: %s.',
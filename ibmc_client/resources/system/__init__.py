@@ -46,7 +46,7 @@ class System(BaseResource):
     def is_storage_ready(self):
         key = 'StorageConfigReady'
         # only supported in latest ibmc
-        if key in self._oem:
+        if self._oem and key in self._oem:
             return self._oem['StorageConfigReady'] == 1
         else:
             feature = 'get StorageConfigReady attribute from System Resource'
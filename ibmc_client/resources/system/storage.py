@@ -14,7 +14,6 @@
 
 # Version 0.0.3
 import logging
-from time import sleep
 
 from ibmc_client import utils, exceptions, constants
 from ibmc_client.resources import BaseResource, Status, PROP_RESOURCE_ID
@@ -22,6 +21,10 @@ from ibmc_client.resources.chassis.drive import Drive
 
 LOG = logging.getLogger(__name__)
 
+ALL_RAID_LEVELS = ('RAID0', 'RAID1', 'RAID5', 'RAID6', 'RAID10', 'RAID50',
+                   'RAID60')
+"""all RAID levels iBMC supports"""
+
 
 class Storage(BaseResource):
     """iBMC System storage controller Resource Model"""
@@ -165,6 +168,20 @@ class Storage(BaseResource):
             ]
         }
 
+    def snapshot(self):
+        """take a snapshot of this controller, its drives and volumes
+
+        The snapshot is JSON serializable, check `StorageSnapshot` for how to
+        use it without iBMC.
+
+        :return: a dict holds redfish JSON of storage, drives and volumes
+        """
+        return {
+            'storage': self.to_json(),
+            'drives': [drive.to_json() for drive in self.drives()],
+            'volumes': [volume.to_json() for volume in self.volumes()],
+        }
+
     def matches(self, hint):
         """Check whether current storage matches the hint
 
@@ -217,29 +234,45 @@ class Storage(BaseResource):
         restore_url = self.get_action_uri(self.ACTION_RESTORE)
         self._connector.request(constants.POST, restore_url, json={})
 
-    def delete_volume_collection(self):
-        """delete volume collection of a storage
+    def load_volume_odata_id_list(self):
+        # type: () -> list[str]
+        """load odata id list of current volumes of this controller
+
+        Notes:: the volume collection is always reloaded from iBMC, volume
+        details are not loaded.
 
-        :return:
+        :return: volume odata id list
         """
-        LOG.info("Start delete volumes for storage:: %s.", self.id)
         volume_collection_url = self._json.get('Volumes', {}).get(
             PROP_RESOURCE_ID)
         volume_collection = self._ibmc_client.load_collection_resource(
             volume_collection_url)
-        for volume_odata_id in volume_collection.resources:
+        return volume_collection.resources
+
+    def delete_volume_collection(self, wait_effect=True):
+        """delete volume collection of a storage
+
+        :param wait_effect: whether to wait until the deletion takes effect,
+            if not, caller should wait for it.
+        :return: odata id list of deleted volumes
+        """
+        LOG.info("Start delete volumes for storage:: %s.", self.id)
+        volume_odata_id_list = self.load_volume_odata_id_list()
+        for volume_odata_id in volume_odata_id_list:
             LOG.info("Start delete volume:: %s.", volume_odata_id)
             task = self._ibmc_client.system.volume.delete_by_odata_id(
                 volume_odata_id)
             task.raise_if_failed()
             LOG.info("Delete volume:: %s done.", volume_odata_id)
-        if volume_collection.count == 0:  # pragma: no cover
+        if len(volume_odata_id_list) == 0:  # pragma: no cover
             LOG.info("No volume present in this storage:: %s", self.id)
         else:
-            # sleep some seconds to make sure the deletion has completely
-            # take effect.
-            sleep(constants.RAID_TASK_EFFECT_SECONDS)
+            # make sure the deletion has completely take effect.
+            if wait_effect:
+                self._ibmc_client.system.storage.wait_raid_task_effect(
+                    self, deleted=volume_odata_id_list)
             LOG.info("Delete volumes for storage:: %s done.", self.id)
+        return volume_odata_id_list
 
 
 class Volume(BaseResource):
@@ -333,3 +366,155 @@ class Volume(BaseResource):
         """
         odata_collection = self._json.get('Links', {}).get('Drives', [])
         return [odata.get(PROP_RESOURCE_ID) for odata in odata_collection]
+
+
+class StorageSnapshot(Storage):
+    """A storage controller built from a snapshot without iBMC
+
+    Drives and volumes are held in memory, it could be used to plan RAID
+    configuration offline, but could not apply anything.
+    """
+
+    DRIVE_ODATA_ID_PREFIX = '/redfish/v1/Chassis/1/Drives/'
+    """odata id prefix of drives built from description"""
+
+    STORAGE_ODATA_ID_PREFIX = '/redfish/v1/Systems/1/Storages/'
+    """odata id prefix of storage built from description"""
+
+    def drives(self, force_reload=False):
+        # type: (bool) -> list[Drive]
+        return self._drives
+
+    def volumes(self, force_reload=False):
+        # type: (bool) -> list[Volume]
+        return self._volumes
+
+    @staticmethod
+    def load(snapshot_or_description):
+        # type: (dict) -> StorageSnapshot
+        """build a storage from a snapshot or a plain description
+
+        :param snapshot_or_description: a snapshot taken by
+            `Storage.snapshot` or a plain description, check
+            `from_description` for the format
+        :return: a storage snapshot
+        """
+        if 'storage' in snapshot_or_description:
+            return StorageSnapshot.from_snapshot(snapshot_or_description)
+        return StorageSnapshot.from_description(snapshot_or_description)
+
+    @staticmethod
+    def from_snapshot(snapshot):
+        # type: (dict) -> StorageSnapshot
+        """build a storage from a snapshot taken by `Storage.snapshot`
+
+        :param snapshot: indicates the snapshot
+        :return: a storage snapshot
+        """
+        storage = StorageSnapshot.from_json(snapshot['storage'])
+        storage._drives = [Drive.from_json(_)
+                           for _ in snapshot.get('drives', [])]
+        storage._volumes = [Volume.from_json(_)
+                            for _ in snapshot.get('volumes', [])]
+        return storage
+
+    @staticmethod
+    def from_description(description):
+        # type: (dict) -> StorageSnapshot
+        """build a storage from a plain description, a typical description
+        may looks like::
+
+            {
+                "id": "RAIDStorage0",
+                "controller_name": "RAID Card1 Controller",
+                "supported_raid_levels": ["RAID0", "RAID1", "RAID5"],
+                "drives": [
+                    {"id": "Disk0", "drive_id": 0, "media_type": "HDD",
+                     "protocol": "SAS", "capacity_bytes": 599550590976},
+                    ...
+                ],
+                "volumes": [
+                    {"id": "LogicalDrive0", "raid_level": "RAID1",
+                     "span": 1, "capacity_bytes": 107374182400,
+                     "drives": ["Disk0", "Disk1"]},
+                    ...
+                ]
+            }
+
+        `supported_raid_levels` defaults to all RAID levels, `oob_support`
+        defaults to true and `jbod` defaults to false. Drive firmware state
+        is Online when it is used by any volume, else defaults to
+        UnconfiguredGood. Drive id, media type and protocol are optional.
+
+        :param description: indicates the plain description
+        :return: a storage snapshot
+        """
+        storage_id = description['id']
+        volumes = description.get('volumes', [])
+        used_drive_ids = set(drive_id for volume in volumes
+                             for drive_id in volume.get('drives', []))
+
+        drives = []
+        for (idx, drive) in enumerate(description.get('drives', [])):
+            firmware_state = (
+                constants.DRIVE_FM_STATE_ONLINE
+                if drive['id'] in used_drive_ids
+                else drive.get('firmware_state',
+                               constants.DRIVE_FM_STATE_UNCONFIG_GOOD))
+            drives.append({
+                PROP_RESOURCE_ID: (StorageSnapshot.DRIVE_ODATA_ID_PREFIX
+                                   + drive['id']),
+                'Id': drive['id'],
+                'Name': drive.get('name', drive['id']),
+                'SerialNumber': drive.get('serial_number'),
+                'CapacityBytes': drive['capacity_bytes'],
+                'MediaType': drive.get('media_type', 'HDD').upper(),
+                'Protocol': drive.get('protocol', 'SAS'),
+                'HotspareType': drive.get('hotspare_type',
+                                          constants.HOT_SPARE_NONE),
+                'Oem': {'Huawei': {
+                    'DriveID': drive.get('drive_id', idx),
+                    'FirmwareStatus': firmware_state,
+                }},
+            })
+
+        volume_collection = (StorageSnapshot.STORAGE_ODATA_ID_PREFIX
+                             + storage_id + '/Volumes')
+        volumes = [{
+            PROP_RESOURCE_ID: '%s/%s' % (volume_collection, volume['id']),
+            'Id': volume['id'],
+            'Name': volume['id'],
+            'CapacityBytes': volume['capacity_bytes'],
+            'Oem': {'Huawei': {
+                'VolumeName': volume.get('volume_name'),
+                'VolumeRaidLevel': volume['raid_level'],
+                'SpanNumber': volume.get('span', 1),
+                'BootEnable': volume.get('bootable', False),
+            }},
+            'Links': {'Drives': [
+                {PROP_RESOURCE_ID: (StorageSnapshot.DRIVE_ODATA_ID_PREFIX
+                                    + drive_id)}
+                for drive_id in volume.get('drives', [])]},
+        } for volume in volumes]
+
+        storage = {
+            PROP_RESOURCE_ID: (StorageSnapshot.STORAGE_ODATA_ID_PREFIX
+                               + storage_id),
+            'Id': storage_id,
+            'Name': description.get('name', storage_id),
+            'StorageControllers': [{
+                'Name': description.get('controller_name', storage_id),
+                'Model': description.get('model'),
+                'Oem': {'Huawei': {
+                    'SupportedRAIDLevels': description.get(
+                        'supported_raid_levels', list(ALL_RAID_LEVELS)),
+                    'OOBSupport': description.get('oob_support', True),
+                    'JBODState': description.get('jbod', False),
+                }},
+            }],
+            'Drives': [{PROP_RESOURCE_ID: drive[PROP_RESOURCE_ID]}
+                       for drive in drives],
+            'Volumes': {PROP_RESOURCE_ID: volume_collection},
+        }
+        return StorageSnapshot.from_snapshot({
+            'storage': storage, 'drives': drives, 'volumes': volumes})
@@ -0,0 +1,1092 @@
+# Copyright 2020 HUAWEI, Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# Version 0.0.3
+"""A local stateful iBMC Redfish simulator for load and latency testing
+
+A :class:`VirtualBMC` keeps the state of one iBMC: sessions, system, storage
+controllers, drives, volumes and tasks. Volume creation and deletion run as
+tasks which take `task_seconds` to finish, storage is not ready for
+configuration while any task is running. Latency, server errors and ETag
+conflicts could be injected, all of them are tunable at runtime.
+
+A :class:`Simulator` serves many virtual BMCs over HTTP in one process, one
+port per BMC::
+
+    with Simulator() as simulator:
+        addresses = simulator.add_fleet(16, latency=0.02, task_seconds=1)
+        with ibmc_client.connect(addresses[0], 'admin', 'Admin@9000',
+                                 verify_ca=False) as client:
+            client.system.storage.apply_raid_configuration(...)
+
+Or from command line::
+
+    python -m ibmc_client.simulator --count 16 --port 18000 --latency 0.02
+"""
+import argparse
+import collections
+import copy
+import json
+import logging
+import random
+import threading
+import time
+import zlib
+
+import six
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+from six.moves.urllib import parse
+
+from ibmc_client import constants
+from ibmc_client import raid_utils
+from ibmc_client.resources import PROP_RESOURCE_ID
+from ibmc_client.resources.system.storage import StorageSnapshot
+
+LOG = logging.getLogger(__name__)
+
+ROOT = '/redfish/v1'
+SESSIONS = ROOT + '/SessionService/Sessions'
+SYSTEM = ROOT + '/Systems/1'
+STORAGES = SYSTEM + '/Storages'
+MANAGERS = ROOT + '/Managers'
+CHASSIS = ROOT + '/Chassis/1'
+TASKS = ROOT + '/TaskService/Tasks'
+
+ACTION_RESET = '#ComputerSystem.Reset'
+ACTION_RESTORE_STORAGE = '#Storage.RestoreStorageControllerDefaultSettings'
+ACTION_INIT_VOLUME = '#Volume.Initialize'
+
+POWER_STATES = {
+    'On': 'On',
+    'ForceOn': 'On',
+    'ForceOff': 'Off',
+    'GracefulShutdown': 'Off',
+    'ForceRestart': 'On',
+    'GracefulRestart': 'On',
+    'ForcePowerCycle': 'On',
+    'Nmi': None,
+}
+"""power state after reset of every reset type, None means unchanged"""
+
+
+def default_storages():
+    # type: () -> list[dict]
+    """get storages of a virtual BMC when none is given
+
+    :return: a list of storage description, check
+        :meth:`~ibmc_client.resources.system.storage.StorageSnapshot
+        .from_description` for the format
+    """
+    drives = [{'id': 'HDDPlaneDisk%d' % idx, 'drive_id': idx,
+               'media_type': 'HDD', 'protocol': 'SAS',
+               'capacity_bytes': 1199638052864} for idx in range(8)]
+    drives.extend({'id': 'HDDPlaneDisk%d' % idx, 'drive_id': idx,
+                   'media_type': 'SSD', 'protocol': 'SATA',
+                   'capacity_bytes': 959656755200} for idx in range(8, 12))
+    return [{'id': 'RAIDStorage0', 'name': 'RAIDStorage0',
+             'controller_name': 'RAID Card1 Controller',
+             'model': 'SAS3508', 'drives': drives}]
+
+
+class _HttpError(Exception):
+    """raised to respond an iBMC error"""
+
+    def __init__(self, status, message_id, message, message_args=None,
+                 resolution='None'):
+        super(_HttpError, self).__init__(message)
+        self.status = status
+        self.body = {'error': {
+            'code': 'Base.1.0.GeneralError',
+            'message': 'A general error has occurred. See ExtendedInfo for '
+                       'more information.',
+            '@Message.ExtendedInfo': [{
+                'MessageId': 'iBMC.1.0.%s' % message_id,
+                'RelatedProperties': [],
+                'Message': message,
+                'MessageArgs': message_args or [],
+                'Severity': 'Warning',
+                'Resolution': resolution,
+            }],
+        }}
+
+
+def _bad_request(message_id, message, *message_args):
+    return _HttpError(400, message_id, message, list(message_args),
+                      'Correct the request body and resubmit the request.')
+
+
+def _iso_time(seconds):
+    return time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime(seconds))
+
+
+def _select(resource, paths):
+    """keep properties of `$select` query only, paths are like
+    Oem/Huawei/StorageConfigReady"""
+    selected = {PROP_RESOURCE_ID: resource[PROP_RESOURCE_ID]}
+    for path in paths:
+        keys = path.strip().split('/')
+        source, target = resource, selected
+        for key in keys[:-1]:
+            source = source.get(key) if isinstance(source, dict) else None
+            target = target.setdefault(key, {})
+        if isinstance(source, dict) and keys[-1] in source:
+            target[keys[-1]] = source[keys[-1]]
+    return selected
+
+
+class _Task(object):
+    """a volume creation or deletion task of virtual BMC"""
+
+    def __init__(self, task_id, name, started_at, seconds, apply_func,
+                 release_func, fails):
+        self.id = task_id
+        self.name = name
+        self.started_at = started_at
+        self.seconds = seconds
+        self.apply_func = apply_func
+        self.release_func = release_func
+        self.fails = fails
+        self.state = constants.TASK_STATUS_RUNNING
+        self.ended_at = None
+        self.messages = []
+
+    @property
+    def processing(self):
+        return self.state in constants.TASK_STATUS_PROCESSING
+
+    def advance(self, now):
+        """finish the task when its duration passes
+
+        :return: true if the task finishes now
+        """
+        if not self.processing or now < self.started_at + self.seconds:
+            return False
+
+        self.ended_at = now
+        if self.release_func is not None:
+            self.release_func()
+        if self.fails:
+            self.state = constants.TASK_STATUS_EXCEPTION
+            self.messages = {
+                'MessageId': 'iBMC.1.0.TaskFailed',
+                'Message': 'The %s failed because of an injected '
+                           'error.' % self.name,
+                'MessageArgs': [], 'Severity': 'Warning',
+                'Resolution': 'Try again.'}
+        else:
+            message_id, message, args = self.apply_func()
+            self.state = constants.TASK_STATUS_COMPLETED
+            self.messages = {
+                'MessageId': 'iBMC.1.0.%s' % message_id, 'Message': message,
+                'MessageArgs': args, 'Severity': 'OK', 'Resolution': 'None'}
+        return True
+
+    def to_json(self, now):
+        percentage = None
+        if self.processing and self.seconds:
+            percentage = '%d%%' % min(
+                99, 100 * (now - self.started_at) // self.seconds)
+        task = {
+            PROP_RESOURCE_ID: '%s/%s' % (TASKS, self.id),
+            'Id': self.id,
+            'Name': self.name,
+            'TaskState': self.state,
+            'StartTime': _iso_time(self.started_at),
+            'Messages': self.messages,
+            'Oem': {'Huawei': {'TaskPercentage': percentage}},
+        }
+        if self.ended_at is not None:
+            task['EndTime'] = _iso_time(self.ended_at)
+            task['TaskStatus'] = ('OK' if self.state
+                                  == constants.TASK_STATUS_COMPLETED
+                                  else 'Warning')
+        return task
+
+
+class VirtualBMC(object):
+    """A simulated iBMC which keeps state of sessions, storages and tasks
+
+    All settings are public attributes, they could be changed at runtime to
+    inject latency or errors while a test is running.
+    """
+
+    DEFAULT_USERNAME = 'admin'
+    DEFAULT_PASSWORD = 'Admin@9000'
+
+    DEFAULT_MAX_SESSIONS = 32
+    """default max count of alive sessions"""
+
+    DEFAULT_SESSION_TIMEOUT_SECONDS = 300
+    """default seconds after which an idle session expires"""
+
+    def __init__(self, storages=None, username=None, password=None,
+                 latency=0, latency_jitter=0, error_rate=0, error_status=503,
+                 conflict_rate=0, task_seconds=0, task_failure_rate=0,
+                 ready_delay=0, session_timeout=None, max_sessions=None,
+                 select_query=True, capacity=None, seed=None, clock=None):
+        """Initial a virtual BMC
+
+        :param storages: indicates storage controllers, a list of storage
+            description or snapshot accepted by
+            :meth:`~ibmc_client.resources.system.storage.StorageSnapshot
+            .load`, default `default_storages()`
+        :param username: indicates the user name to login
+        :param password: indicates the password to login
+        :param latency: indicates seconds to delay every response
+        :param latency_jitter: indicates max random seconds added to latency
+        :param error_rate: indicates the probability that a request fails
+            with `error_status`
+        :param error_status: indicates HTTP status of injected errors
+        :param conflict_rate: indicates the probability that a PATCH request
+            fails with 412 because the resource is changed by someone else
+        :param task_seconds: indicates seconds a volume creation or deletion
+            task takes
+        :param task_failure_rate: indicates the probability that a task
+            fails
+        :param ready_delay: indicates seconds storage stays not ready after
+            a task finishes
+        :param session_timeout: indicates seconds after which an idle
+            session expires and requests with it get 401
+        :param max_sessions: indicates max count of alive sessions, login
+            gets 403 when exceeds
+        :param select_query: whether `$select` query is supported
+        :param capacity: indicates count of requests served concurrently
+            without slowing down, latency grows with the square of requests
+            in flight beyond it and requests beyond twice of it fail with
+            503, like the weak management CPU of a real iBMC. Unlimited if
+            not present
+        :param seed: indicates random seed of injected latency and errors
+        :param clock: indicates the function returns current seconds,
+            default `time.time`
+        """
+        self.username = username or self.DEFAULT_USERNAME
+        self.password = password or self.DEFAULT_PASSWORD
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.conflict_rate = conflict_rate
+        self.task_seconds = task_seconds
+        self.task_failure_rate = task_failure_rate
+        self.ready_delay = ready_delay
+        self.session_timeout = (self.DEFAULT_SESSION_TIMEOUT_SECONDS
+                                if session_timeout is None
+                                else session_timeout)
+        self.max_sessions = max_sessions or self.DEFAULT_MAX_SESSIONS
+        self.select_query = select_query
+        self.capacity = capacity
+        self.clock = clock or time.time
+
+        self.stats = collections.Counter()
+        """counters of requests, bytes_received, bytes_sent,
+        injected_errors, overloaded, conflicts and unauthorized"""
+
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._sessions = {}
+        self._inflight = 0
+        self._tasks = collections.OrderedDict()
+        self._task_seq = 0
+        self._ready_at = 0
+        self._versions = collections.Counter()
+        self._resources = {}
+        self._storages = collections.OrderedDict()
+        self._reserved_drives = set()
+        self._reserved_volumes = set()
+        self._init_resources(default_storages() if storages is None
+                             else storages)
+
+    def _init_resources(self, storages):
+        self._resources[SYSTEM] = {
+            PROP_RESOURCE_ID: SYSTEM,
+            'Id': '1',
+            'Name': 'Computer System',
+            'Model': '2288H V5',
+            'Manufacturer': 'Huawei',
+            'Status': {'State': 'Enabled', 'Health': 'OK'},
+            'PowerState': 'On',
+            'Boot': {
+                'BootSourceOverrideTarget': 'None',
+                'BootSourceOverrideEnabled': 'Disabled',
+                'BootSourceOverrideMode': 'Legacy',
+            },
+            'Bios': {PROP_RESOURCE_ID: SYSTEM + '/Bios'},
+            'Storage': {PROP_RESOURCE_ID: STORAGES},
+            'Actions': {ACTION_RESET: {
+                'target': SYSTEM + '/Actions/ComputerSystem.Reset'}},
+            'Oem': {'Huawei': {'ProductVersion': 'V5',
+                               'StorageConfigReady': 1}},
+        }
+        self._resources[SYSTEM + '/Bios'] = {
+            PROP_RESOURCE_ID: SYSTEM + '/Bios',
+            'Id': 'Bios',
+            'Attributes': {'BootTypeOrder0': 'HardDiskDrive',
+                           'BootTypeOrder1': 'DVDROMDrive',
+                           'BootTypeOrder2': 'PXE',
+                           'BootTypeOrder3': 'Others'},
+        }
+        self._resources[MANAGERS + '/1'] = {
+            PROP_RESOURCE_ID: MANAGERS + '/1', 'Id': '1', 'Name': 'Manager'}
+
+        chassis_drives = []
+        for description in storages:
+            snapshot = StorageSnapshot.load(copy.deepcopy(description))
+            storage = snapshot.to_json()
+            storage_path = storage[PROP_RESOURCE_ID]
+            storage['Status'] = {'State': 'Enabled', 'Health': 'OK'}
+            storage['Actions'] = {'Oem': {'Huawei': {
+                ACTION_RESTORE_STORAGE: {
+                    'target': '%s/Actions/Oem/Huawei/Storage.'
+                              'RestoreStorageControllerDefaultSettings'
+                              % storage_path}}}}
+            self._resources[storage_path] = storage
+            self._storages[storage_path] = []
+            for drive in snapshot.drives():
+                drive = drive.to_json()
+                drive.setdefault('Status', {'State': 'Enabled',
+                                            'Health': 'OK'})
+                drive.setdefault('Links', {}).setdefault('Volumes', [])
+                self._resources[drive[PROP_RESOURCE_ID]] = drive
+                chassis_drives.append({PROP_RESOURCE_ID:
+                                       drive[PROP_RESOURCE_ID]})
+            for volume in snapshot.volumes():
+                volume = volume.to_json()
+                self._add_volume(storage_path, volume)
+
+        self._resources[CHASSIS] = {
+            PROP_RESOURCE_ID: CHASSIS, 'Id': '1',
+            'Name': 'Computer System Chassis',
+            'Links': {'Drives': chassis_drives},
+        }
+
+    @property
+    def storage_ready(self):
+        """whether storage is ready for configuration"""
+        with self._lock:
+            self._advance_tasks()
+            return (not any(task.processing for task in self._tasks.values())
+                    and self.clock() >= self._ready_at)
+
+    def expire_sessions(self):
+        """expire all sessions, following requests with them get 401"""
+        with self._lock:
+            self._sessions.clear()
+
+    def volumes(self, storage_id):
+        # type: (str) -> list[dict]
+        """get redfish JSON of volumes of a storage
+
+        :param storage_id: indicates the storage id
+        :return: a list of volume JSON
+        """
+        with self._lock:
+            self._advance_tasks()
+            return [copy.deepcopy(self._resources[path]) for path
+                    in self._storages['%s/%s' % (STORAGES, storage_id)]]
+
+    def handle(self, method, target, headers=None, body=None):
+        # type: (str, str, dict, bytes) -> tuple
+        """handle a redfish request
+
+        :param method: indicates HTTP method
+        :param target: indicates request target, path with query
+        :param headers: indicates request headers
+        :param body: indicates request body
+        :return: a tuple of (status, headers, body)
+        """
+        headers = dict((k.lower(), v) for (k, v) in (headers or {}).items())
+        body = body or b''
+        self._count(requests=1, bytes_received=len(body))
+        with self._lock:
+            self._inflight += 1
+            inflight = self._inflight
+        try:
+            return self._handle(method, target, headers, body, inflight)
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    def _handle(self, method, target, headers, body, inflight):
+        delay = self.latency
+        if self.latency_jitter:
+            delay += self._random.uniform(0, self.latency_jitter)
+        if self.capacity and inflight > self.capacity:
+            delay *= (float(inflight) / self.capacity) ** 2
+        if delay > 0:
+            time.sleep(delay)
+
+        response_headers = {'Content-Type': 'application/json'}
+        try:
+            if self.capacity and inflight > self.capacity * 2:
+                self._count(overloaded=1)
+                raise _HttpError(503, 'ServiceUnavailable',
+                                 'The request failed because the iBMC is '
+                                 'overloaded.', resolution='Try again.')
+
+            if self.error_rate and self._random.random() < self.error_rate:
+                self._count(injected_errors=1)
+                raise _HttpError(self.error_status, 'InternalError',
+                                 'The request failed because of an injected '
+                                 'error.', resolution='Try again.')
+
+            url = parse.urlsplit(target)
+            path = url.path.rstrip('/') or '/'
+            query = parse.parse_qs(url.query)
+            with self._lock:
+                self._advance_tasks()
+                status, content = self._route(method.upper(), path, query,
+                                              headers, body,
+                                              response_headers)
+        except _HttpError as e:
+            status, content = e.status, e.body
+
+        content = (b'' if content is None
+                   else json.dumps(content).encode('utf-8'))
+        self._count(bytes_sent=len(content))
+        return status, response_headers, content
+
+    def _count(self, **counts):
+        with self._lock:
+            self.stats.update(counts)
+
+    def _route(self, method, path, query, headers, body, response_headers):
+        if path == ROOT and method == constants.GET:
+            return 200, self._service_root()
+
+        if path == SESSIONS and method == constants.POST:
+            return self._login(self._json_body(body), response_headers)
+
+        self._authenticate(headers)
+
+        if path.startswith(SESSIONS + '/') and method == constants.DELETE:
+            if self._sessions.pop(path.split('/')[-1], None) is None:
+                raise self._not_found(path)
+            return 200, None
+
+        if method == constants.GET:
+            resource = self._get(path)
+            if path in self._resources:
+                response_headers[constants.HEADER_ETAG] = self._etag(path)
+            if '$select' in query and self.select_query:
+                resource = _select(resource,
+                                   ','.join(query['$select']).split(','))
+            return 200, resource
+
+        if method == constants.PATCH:
+            return self._patch(path, headers, self._json_body(body),
+                               response_headers)
+
+        if method == constants.POST:
+            return self._post(path, self._json_body(body))
+
+        if method == constants.DELETE:
+            return self._delete(path)
+
+        raise _HttpError(405, 'ActionNotSupported',
+                         'The method %s is not supported.' % method)
+
+    @staticmethod
+    def _json_body(body):
+        if not body:
+            return {}
+        try:
+            return json.loads(body.decode('utf-8'))
+        except ValueError:
+            raise _bad_request('MalformedJSON',
+                               'The request body submitted was malformed '
+                               'JSON.')
+
+    @staticmethod
+    def _not_found(path):
+        return _HttpError(404, 'ResourceMissingAtURI',
+                          'The resource at the URI %s was not found.' % path,
+                          [path], 'Place a valid resource at the URI or '
+                                  'correct the URI and resubmit the request.')
+
+    def _service_root(self):
+        root = {
+            PROP_RESOURCE_ID: ROOT + '/',
+            'Id': 'RootService',
+            'Name': 'Root Service',
+            'RedfishVersion': '1.0.2',
+            'Systems': {PROP_RESOURCE_ID: ROOT + '/Systems'},
+            'Chassis': {PROP_RESOURCE_ID: ROOT + '/Chassis'},
+            'Managers': {PROP_RESOURCE_ID: MANAGERS},
+            'Tasks': {PROP_RESOURCE_ID: ROOT + '/TaskService'},
+            'SessionService': {PROP_RESOURCE_ID: ROOT + '/SessionService'},
+        }
+        if self.select_query:
+            root['ProtocolFeaturesSupported'] = {'SelectQuery': True}
+        return root
+
+    def _login(self, payload, response_headers):
+        if (payload.get('UserName') != self.username
+                or payload.get('Password') != self.password):
+            self.stats['unauthorized'] += 1
+            raise _HttpError(401, 'AuthorizationFailed',
+                             'Authorization failed because the user name or '
+                             'password is incorrect, or your account is '
+                             'locked.')
+
+        self._expire_idle_sessions()
+        if len(self._sessions) >= self.max_sessions:
+            raise _HttpError(403, 'SessionLimitExceeded',
+                             'The session establishment failed because the '
+                             'number of simultaneous sessions has reached '
+                             'the limit.')
+
+        session_id = '%08x' % self._random.getrandbits(32)
+        token = '%032x' % self._random.getrandbits(128)
+        self._sessions[session_id] = {'token': token,
+                                      'last_used': self.clock()}
+        location = '%s/%s' % (SESSIONS, session_id)
+        response_headers[constants.HEADER_AUTH_TOKEN] = token
+        response_headers['Location'] = location
+        return 201, {PROP_RESOURCE_ID: location, 'Id': session_id,
+                     'UserName': self.username}
+
+    def _expire_idle_sessions(self):
+        expires_before = self.clock() - self.session_timeout
+        for (session_id, session) in list(self._sessions.items()):
+            if session['last_used'] < expires_before:
+                del self._sessions[session_id]
+
+    def _authenticate(self, headers):
+        self._expire_idle_sessions()
+        token = headers.get(constants.HEADER_AUTH_TOKEN.lower())
+        for session in self._sessions.values():
+            if token and session['token'] == token:
+                session['last_used'] = self.clock()
+                return
+        self.stats['unauthorized'] += 1
+        raise _HttpError(401, 'NoValidSession',
+                         'There is no valid session established with the '
+                         'implementation.',
+                         resolution='Establish a session before attempting '
+                                    'any operations.')
+
+    def _etag(self, path):
+        return 'W/"%08x"' % (zlib.crc32(path.encode('utf-8'))
+                             + self._versions[path] & 0xffffffff)
+
+    def _changed(self, path):
+        self._versions[path] += 1
+
+    def _collection(self, path, members):
+        return {PROP_RESOURCE_ID: path,
+                'Name': '%s Collection' % path.split('/')[-1],
+                'Members@odata.count': len(members),
+                'Members': [{PROP_RESOURCE_ID: _} for _ in members]}
+
+    def _get(self, path):
+        if path == MANAGERS:
+            return self._collection(path, [MANAGERS + '/1'])
+        if path == STORAGES:
+            return self._collection(path, list(self._storages))
+        if path.startswith(TASKS + '/'):
+            task = self._tasks.get(path.split('/')[-1])
+            if task is None:
+                raise self._not_found(path)
+            return task.to_json(self.clock())
+        if path.endswith('/Volumes') and path[:-8] in self._storages:
+            return self._collection(path, self._storages[path[:-8]])
+        if path == SYSTEM:
+            self._resources[SYSTEM]['Oem']['Huawei']['StorageConfigReady'] = (
+                1 if self.storage_ready else 0)
+        if path not in self._resources:
+            raise self._not_found(path)
+        return self._resources[path]
+
+    def _patch(self, path, headers, payload, response_headers):
+        resource = self._get(path)
+        if_match = headers.get(constants.HEADER_IF_MATCH.lower())
+        if not if_match:
+            raise _HttpError(428, 'PreconditionRequired',
+                             'The If-Match header is required.')
+        if self.conflict_rate and self._random.random() < self.conflict_rate:
+            # someone else changes the resource
+            self._changed(path)
+        if if_match != self._etag(path):
+            self.stats['conflicts'] += 1
+            raise _HttpError(412, 'PreconditionFailed',
+                             'The ETag in the If-Match header does not match '
+                             'the resource.',
+                             resolution='Get the resource and try again.')
+
+        oem = payload.get('Oem', {}).get('Huawei', {})
+        if path == SYSTEM:
+            resource['Boot'].update(payload.get('Boot', {}))
+        elif path in self._storages:
+            self._patch_storage(path, payload)
+        elif path.startswith(StorageSnapshot.DRIVE_ODATA_ID_PREFIX):
+            self._patch_drive(resource, payload.get('HotspareType'),
+                              oem.get('FirmwareStatus'))
+        elif '/Volumes/' in path:
+            if 'BootEnable' in oem:
+                self._set_bootable(path, oem['BootEnable'])
+        else:
+            raise _HttpError(405, 'PropertyNotWritable',
+                             'The resource %s could not be modified.' % path)
+
+        self._changed(path)
+        response_headers[constants.HEADER_ETAG] = self._etag(path)
+        return 200, resource
+
+    def _patch_storage(self, path, payload):
+        controllers = payload.get('StorageControllers') or [{}]
+        settings = controllers[0].get('Oem', {}).get('Huawei', {})
+        controller = self._resources[path]['StorageControllers'][0]
+        controller['Oem']['Huawei'].update(settings)
+        if 'JBODState' in settings:
+            (before, after) = ((constants.DRIVE_FM_STATE_UNCONFIG_GOOD,
+                                constants.DRIVE_FM_STATE_JBOD)
+                               if settings['JBODState'] else
+                               (constants.DRIVE_FM_STATE_JBOD,
+                                constants.DRIVE_FM_STATE_UNCONFIG_GOOD))
+            for drive in self._storage_drives(path):
+                if drive['Oem']['Huawei']['FirmwareStatus'] == before:
+                    drive['Oem']['Huawei']['FirmwareStatus'] = after
+                    self._changed(drive[PROP_RESOURCE_ID])
+
+    def _patch_drive(self, drive, hotspare_type, firmware_state):
+        oem = drive['Oem']['Huawei']
+        if hotspare_type is not None:
+            drive['HotspareType'] = hotspare_type
+            if hotspare_type == constants.HOT_SPARE_NONE:
+                if oem['FirmwareStatus'] == constants.DRIVE_FM_STATE_HOTSPARE:
+                    oem['FirmwareStatus'] = (
+                        constants.DRIVE_FM_STATE_UNCONFIG_GOOD)
+            else:
+                oem['FirmwareStatus'] = constants.DRIVE_FM_STATE_HOTSPARE
+        if firmware_state is not None:
+            oem['FirmwareStatus'] = firmware_state
+
+    def _set_bootable(self, path, bootable):
+        storage_path = path.rsplit('/Volumes/', 1)[0]
+        for volume_path in self._storages[storage_path]:
+            oem = self._resources[volume_path]['Oem']['Huawei']
+            value = bootable if volume_path == path else (
+                oem['BootEnable'] and not bootable)
+            if oem['BootEnable'] != value:
+                oem['BootEnable'] = value
+                if volume_path != path:
+                    self._changed(volume_path)
+
+    def _post(self, path, payload):
+        if path == SYSTEM + '/Actions/ComputerSystem.Reset':
+            reset_type = payload.get('ResetType')
+            if reset_type not in POWER_STATES:
+                raise _bad_request('PropertyValueNotInList',
+                                   'The value %s for the property ResetType '
+                                   'is not in the list of acceptable values.'
+                                   % reset_type, reset_type, 'ResetType')
+            if POWER_STATES[reset_type]:
+                self._resources[SYSTEM]['PowerState'] = (
+                    POWER_STATES[reset_type])
+                self._changed(SYSTEM)
+            return 200, None
+
+        if path.endswith('/Volumes') and path[:-8] in self._storages:
+            return self._create_volume(path[:-8], payload)
+
+        if path.endswith('/Actions/Oem/Huawei/Storage.'
+                         'RestoreStorageControllerDefaultSettings'):
+            storage_path = path.split('/Actions/')[0]
+            if storage_path not in self._storages:
+                raise self._not_found(path)
+            self._patch_storage(storage_path, {'StorageControllers': [
+                {'Oem': {'Huawei': {'JBODState': False}}}]})
+            self._changed(storage_path)
+            return 200, None
+
+        if path.endswith('/Actions/Volume.Initialize'):
+            volume_path = path.split('/Actions/')[0]
+            self._get(volume_path)
+            return 200, None
+
+        raise self._not_found(path)
+
+    def _delete(self, path):
+        storage_path = path.rsplit('/Volumes/', 1)[0]
+        if path not in self._storages.get(storage_path, []):
+            raise self._not_found(path)
+
+        def apply():
+            if path in self._storages[storage_path]:
+                self._remove_volume(storage_path, path)
+            return ('VolumeDeletionSuccess',
+                    'The volume is successfully deleted.', [])
+
+        return 202, self._start_task('volume deletion task', apply)
+
+    def _storage_drives(self, storage_path):
+        return [self._resources[_[PROP_RESOURCE_ID]]
+                for _ in self._resources[storage_path]['Drives']]
+
+    def _create_volume(self, storage_path, payload):
+        oem = payload.get('Oem', {}).get('Huawei', {})
+        drive_ids = oem.get('Drives') or []
+        drives_by_id = dict((d['Oem']['Huawei']['DriveID'], d)
+                            for d in self._storage_drives(storage_path))
+        unknown = [_ for _ in drive_ids if _ not in drives_by_id]
+        if not drive_ids or unknown:
+            raise _bad_request('PropertyValueNotInList',
+                               'The value %s for the property Drives is not '
+                               'in the list of acceptable values.'
+                               % (unknown or drive_ids), str(unknown),
+                               'Drives')
+        drives = [drives_by_id[_] for _ in drive_ids]
+        drive_paths = set(d[PROP_RESOURCE_ID] for d in drives)
+        capacity_bytes = payload.get('CapacityBytes')
+
+        if oem.get('VolumeRaidLevel') is None:
+            # create volume on an exists array, any member drives of the
+            # array identify it
+            array = [self._resources[_] for _ in self._storages[storage_path]
+                     if drive_paths.issubset(
+                         link[PROP_RESOURCE_ID] for link in
+                         self._resources[_]['Links']['Drives'])]
+            if not array:
+                raise _bad_request('VolumeRaidLevelRequired',
+                                   'The drives do not belong to an exists '
+                                   'array, VolumeRaidLevel is required.')
+            drives = [self._resources[link[PROP_RESOURCE_ID]]
+                      for link in array[0]['Links']['Drives']]
+            drive_paths = set(d[PROP_RESOURCE_ID] for d in drives)
+            raid_level = array[0]['Oem']['Huawei']['VolumeRaidLevel']
+            span = array[0]['Oem']['Huawei']['SpanNumber']
+            left = (self._array_capacity(drives, raid_level, span)
+                    - sum(v['CapacityBytes'] for v in array))
+        else:
+            raid_level = oem['VolumeRaidLevel']
+            controller = self._resources[storage_path]['StorageControllers'][0]
+            supported = controller['Oem']['Huawei']['SupportedRAIDLevels']
+            raid = raid_utils.RAID_SETTINGS.get(raid_level)
+            if raid is None or raid_level not in supported:
+                raise _bad_request('PropertyValueNotInList',
+                                   'The value %s for the property '
+                                   'VolumeRaidLevel is not in the list of '
+                                   'acceptable values.' % raid_level,
+                                   raid_level, 'VolumeRaidLevel')
+            busy = [d['Id'] for d in drives
+                    if d[PROP_RESOURCE_ID] in self._reserved_drives
+                    or d['Oem']['Huawei']['FirmwareStatus']
+                    != constants.DRIVE_FM_STATE_UNCONFIG_GOOD]
+            if busy:
+                raise _bad_request('DriveStatusNotSupported',
+                                   'The operation failed because the status '
+                                   'of drives %s is not supported.' % busy,
+                                   str(busy))
+            span = oem.get('SpanNumber') or 1
+            if raid.is_spanned and not oem.get('SpanNumber'):
+                span = (raid.span(len(drives)) if callable(raid.span)
+                        else raid.span)
+            if (len(drives) < raid.get_min_disks()
+                    or len(drives) % span != 0):
+                raise _bad_request('InvalidDriveNumber',
+                                   'The number of drives %d is invalid for '
+                                   '%s with span %d.'
+                                   % (len(drives), raid_level, span))
+            left = self._array_capacity(drives, raid_level, span)
+
+        if capacity_bytes is None:
+            capacity_bytes = left
+        if capacity_bytes <= 0 or capacity_bytes > left:
+            raise _bad_request('VolumeCapacityOutOfRange',
+                               'The volume capacity %s exceeds the available '
+                               'capacity %s.' % (capacity_bytes, left))
+
+        volume_path = '%s/Volumes/LogicalDrive%d' % (
+            storage_path, self._next_volume_index(storage_path))
+        volume = {
+            PROP_RESOURCE_ID: volume_path,
+            'Id': volume_path.split('/')[-1],
+            'Name': volume_path.split('/')[-1],
+            'CapacityBytes': capacity_bytes,
+            'Oem': {'Huawei': {
+                'VolumeName': oem.get('VolumeName'),
+                'VolumeRaidLevel': raid_level,
+                'SpanNumber': span,
+                'BootEnable': False,
+            }},
+            'Links': {'Drives': [{PROP_RESOURCE_ID: d[PROP_RESOURCE_ID]}
+                                 for d in drives]},
+        }
+        self._reserved_drives.update(drive_paths)
+        self._reserved_volumes.add(volume_path)
+
+        def apply():
+            self._add_volume(storage_path, volume)
+            return ('VolumeCreationSuccess',
+                    'The volume is successfully created, and the URI is '
+                    '%s.' % volume_path, [volume_path])
+
+        def release():
+            self._reserved_drives.difference_update(drive_paths)
+            self._reserved_volumes.discard(volume_path)
+
+        return 202, self._start_task('volume creation task', apply, release)
+
+    def _next_volume_index(self, storage_path):
+        used = set(self._storages[storage_path]) | self._reserved_volumes
+        idx = 0
+        while '%s/Volumes/LogicalDrive%d' % (storage_path, idx) in used:
+            idx += 1
+        return idx
+
+    @staticmethod
+    def _array_capacity(drives, raid_level, span):
+        raid = raid_utils.RAID_SETTINGS[raid_level]
+        data_drives = len(drives) - raid.get_overhead_per_span() * span
+        return min(d['CapacityBytes'] for d in drives) * data_drives
+
+    def _add_volume(self, storage_path, volume):
+        volume_path = volume[PROP_RESOURCE_ID]
+        drive_paths = [_[PROP_RESOURCE_ID] for _ in volume['Links']['Drives']]
+        oem = volume['Oem']['Huawei']
+        oem['NumDrivePerSpan'] = len(drive_paths) // (oem['SpanNumber'] or 1)
+        oem.setdefault('BGIEnable', True)
+        volume.setdefault('Status', {'State': 'Enabled', 'Health': 'OK'})
+        volume['Actions'] = {ACTION_INIT_VOLUME: {
+            'target': volume_path + '/Actions/Volume.Initialize'}}
+        self._resources[volume_path] = volume
+        self._storages[storage_path].append(volume_path)
+        for drive_path in drive_paths:
+            drive = self._resources[drive_path]
+            drive['Oem']['Huawei']['FirmwareStatus'] = (
+                constants.DRIVE_FM_STATE_ONLINE)
+            links = drive['Links']['Volumes']
+            if {PROP_RESOURCE_ID: volume_path} not in links:
+                links.append({PROP_RESOURCE_ID: volume_path})
+            self._changed(drive_path)
+        self._changed(storage_path)
+
+    def _remove_volume(self, storage_path, volume_path):
+        volume = self._resources.pop(volume_path)
+        self._storages[storage_path].remove(volume_path)
+        for link in volume['Links']['Drives']:
+            drive = self._resources[link[PROP_RESOURCE_ID]]
+            drive['Links']['Volumes'] = [
+                _ for _ in drive['Links']['Volumes']
+                if _[PROP_RESOURCE_ID] != volume_path]
+            if not drive['Links']['Volumes']:
+                drive['Oem']['Huawei']['FirmwareStatus'] = (
+                    constants.DRIVE_FM_STATE_UNCONFIG_GOOD)
+            self._changed(link[PROP_RESOURCE_ID])
+        self._changed(storage_path)
+
+    def _start_task(self, name, apply_func, release_func=None):
+        self._task_seq += 1
+        fails = bool(self.task_failure_rate
+                     and self._random.random() < self.task_failure_rate)
+        task = _Task(str(self._task_seq), name, self.clock(),
+                     self.task_seconds, apply_func, release_func, fails)
+        self._tasks[task.id] = task
+        self._advance_tasks()
+        return task.to_json(self.clock())
+
+    def _advance_tasks(self):
+        now = self.clock()
+        for task in self._tasks.values():
+            if task.advance(now):
+                self._ready_at = max(self._ready_at, now + self.ready_delay)
+
+
+class _RequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """serve requests with the virtual BMC of server"""
+
+    protocol_version = 'HTTP/1.1'
+
+    # headers and body are written separately, do not let them wait for
+    # delayed ACK of each other
+    disable_nagle_algorithm = True
+
+    def _dispatch(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        (status, headers, content) = self.server.bmc.handle(
+            self.command, self.path, self.headers, body)
+        self.send_response(status)
+        for (name, value) in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        LOG.debug('%s - %s', self.address_string(), format % args)
+
+
+class _BMCServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """HTTP server of a virtual BMC"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, server_address, bmc):
+        self.bmc = bmc
+        BaseHTTPServer.HTTPServer.__init__(self, server_address,
+                                           _RequestHandler)
+
+
+class Simulator(object):
+    """Serve virtual BMCs over HTTP in current process
+
+    Every virtual BMC listens on its own port, so the address of every BMC
+    is distinct as real servers. Requests of every BMC are served in their
+    own threads.
+    """
+
+    def __init__(self, host='127.0.0.1'):
+        # type: (str) -> None
+        """Initial a simulator
+
+        :param host: indicates the host to listen on
+        """
+        self.host = host
+        self._servers = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def addresses(self):
+        # type: () -> list[str]
+        """get addresses of all virtual BMCs"""
+        return list(self._servers)
+
+    def bmc(self, address):
+        # type: (str) -> VirtualBMC
+        """get the virtual BMC served on the address
+
+        :param address: indicates the address returned by `add`
+        :return: the virtual BMC
+        """
+        return self._servers[address].bmc
+
+    def add(self, bmc=None, port=0):
+        # type: (VirtualBMC, int) -> str
+        """serve a virtual BMC
+
+        :param bmc: indicates the virtual BMC, a default one if not present
+        :param port: indicates the port to listen on, a free port if 0
+        :return: address of the virtual BMC, like http://127.0.0.1:18000
+        """
+        server = _BMCServer((self.host, port), bmc or VirtualBMC())
+        address = 'http://%s:%d' % (self.host, server.server_address[1])
+        thread = threading.Thread(target=server.serve_forever,
+                                  name='virtual-bmc-%s' % address)
+        thread.daemon = True
+        thread.start()
+        with self._lock:
+            self._servers[address] = server
+        LOG.debug('Virtual BMC is serving on %s.', address)
+        return address
+
+    def add_fleet(self, count, port=0, **settings):
+        # type: (int, int, ...) -> list[str]
+        """serve a fleet of virtual BMCs with same settings
+
+        :param count: indicates count of virtual BMCs
+        :param port: indicates the port of first BMC, following BMCs listen
+            on following ports. Free ports are used if 0
+        :param settings: indicates settings of virtual BMCs, check
+            :class:`VirtualBMC`. When `seed` is present, every BMC uses a
+            different seed derived from it
+        :return: addresses of virtual BMCs
+        """
+        addresses = []
+        for idx in range(count):
+            bmc_settings = dict(settings)
+            if bmc_settings.get('seed') is not None:
+                bmc_settings['seed'] = bmc_settings['seed'] + idx
+            addresses.append(self.add(VirtualBMC(**bmc_settings),
+                                      port + idx if port else 0))
+        return addresses
+
+    def stop(self):
+        """stop serving all virtual BMCs"""
+        with self._lock:
+            servers = list(self._servers.values())
+            self._servers.clear()
+        # every server takes up to a poll interval to shutdown, shutdown
+        # them at the same time
+        threads = [threading.Thread(target=server.shutdown)
+                   for server in servers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for server in servers:
+            server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Serve virtual iBMC Redfish servers.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0,
+                        help='port of first BMC, free ports if 0')
+    parser.add_argument('--count', type=int, default=1,
+                        help='count of virtual BMCs')
+    parser.add_argument('--storages',
+                        help='JSON file holds a list of storage descriptions '
+                             'or snapshots')
+    parser.add_argument('--latency', type=float, default=0)
+    parser.add_argument('--latency-jitter', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--conflict-rate', type=float, default=0)
+    parser.add_argument('--task-seconds', type=float, default=0)
+    parser.add_argument('--task-failure-rate', type=float, default=0)
+    parser.add_argument('--ready-delay', type=float, default=0)
+    parser.add_argument('--capacity', type=int,
+                        help='requests served concurrently without slowing '
+                             'down, unlimited if not present')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    storages = None
+    if args.storages:
+        with open(args.storages) as fp:
+            storages = json.load(fp)
+
+    logging.basicConfig(level=logging.INFO)
+    with Simulator(args.host) as simulator:
+        addresses = simulator.add_fleet(
+            args.count, port=args.port, storages=storages,
+            latency=args.latency, latency_jitter=args.latency_jitter,
+            error_rate=args.error_rate, conflict_rate=args.conflict_rate,
+            task_seconds=args.task_seconds,
+            task_failure_rate=args.task_failure_rate,
+            ready_delay=args.ready_delay, capacity=args.capacity,
+            seed=args.seed)
+        for address in addresses:
+            six.print_(address)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
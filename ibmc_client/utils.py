@@ -13,6 +13,7 @@
 #    under the License.
 
 # Version 0.0.3
+from concurrent.futures import ThreadPoolExecutor
 
 
 def remove_empty_from_dict(original):
@@ -47,3 +48,24 @@ def human_readable_byte(size_in_byte, suffix='B'):
             return "%3.1f%s%s" % (size_in_byte, unit, suffix)
         size_in_byte /= 1024.0
     return "%.1f%s%s" % (size_in_byte, 'Y', suffix)
+
+
+def parallel_map(func, items, max_workers):
+    # type: (callable, list, int) -> list
+    """call func with every item concurrently in a thread pool.
+
+    :param func: a callable which accepts one item as argument
+    :param items: indicates the items to process
+    :param max_workers: indicates max count of concurrent calls
+    :raises: the error raised by the first failed call, after all calls
+        finished
+    :return: a list of results in the same order as items
+    """
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [func(item) for item in items]
+
+    workers = min(max_workers, len(items))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(func, item) for item in items]
+    return [future.result() for future in futures]
@@ -0,0 +1,260 @@
+# Copyright 2020 HUAWEI, Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# Version 0.0.3
+import heapq
+import logging
+import threading
+import time
+
+from ibmc_client import exceptions
+
+LOG = logging.getLogger(__name__)
+
+
+class Deadline(object):
+    """A time budget and cancellation token shared by an operation
+
+    A deadline is accepted by high-level operations and passed down to every
+    poll and HTTP request of the operation, so the whole operation is
+    bounded, and could be cancelled from another thread.
+    """
+
+    def __init__(self, timeout=None):
+        # type: (float) -> None
+        """Initial a deadline
+
+        :param timeout: indicates seconds from now before the deadline
+            expires, None for never expires (only cancellation)
+        """
+        self.timeout = timeout
+        self.expires_at = (None if timeout is None
+                           else time.time() + timeout)
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """cancel the operation which is bound by this deadline"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def remaining(self):
+        """get seconds remaining before deadline expires
+
+        :return: remaining seconds, 0 if expired or cancelled
+        """
+        if self.cancelled:
+            return 0
+        if self.expires_at is None:
+            return float('inf')
+        return max(self.expires_at - time.time(), 0)
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self, what):
+        """raise if deadline is expired or cancelled
+
+        :param what: indicates what is going to do, used in error message
+        :raises: exceptions.OperationCancelled when cancelled
+        :raises: exceptions.DeadlineExceeded when expired
+        """
+        if self.cancelled:
+            raise exceptions.OperationCancelled(what=what)
+        if self.expired:
+            raise exceptions.DeadlineExceeded(what=what)
+
+
+class Waiter(object):
+    """Poll conditions until they hold or the timeout expires
+
+    Conditions are checked at once, then after `interval` seconds, and the
+    interval is multiplied by `backoff` after every check until it reaches
+    `max_interval`.
+    """
+
+    def __init__(self, timeout, interval, max_interval=None, backoff=1):
+        # type: (float, float, float, float) -> None
+        """Initial a waiter
+
+        :param timeout: indicates max seconds to wait, None for no limit
+        :param interval: indicates seconds to wait before the second check
+        :param max_interval: indicates max seconds to wait between two
+            checks, default same as interval
+        :param backoff: indicates the multiplier applied to interval after
+            every check
+        """
+        self.timeout = timeout
+        self.interval = interval
+        self.max_interval = max_interval or interval
+        self.backoff = backoff
+
+    def intervals(self):
+        """generate seconds to wait between checks
+
+        :return: an infinite generator of intervals
+        """
+        interval = self.interval
+        while True:
+            yield interval
+            interval = min(interval * self.backoff, self.max_interval)
+
+    def ticks(self, what, deadline=None):
+        """generate a tick before every check, sleeps between two ticks.
+
+        The first tick is generated at once. Send a true value to the
+        generator to restart the back-off from `interval`, for example when
+        the polled resource has changed::
+
+            ticks = waiter.ticks('task processed')
+            next(ticks)
+            while not check():
+                ticks.send(changed)
+
+        :param what: indicates what we are waiting for, used in logs and
+            timeout error message
+        :param deadline: indicates the deadline of the whole operation
+        :raises: exceptions.WaitTimeout when the next tick would be later
+            than timeout seconds
+        :raises: exceptions.DeadlineExceeded when the next tick would be
+            later than deadline
+        :raises: exceptions.OperationCancelled when deadline is cancelled
+        :return: an infinite generator of ticks
+        """
+        started_at = time.time()
+        intervals = self.intervals()
+        while True:
+            reset = yield
+            if reset:
+                intervals = self.intervals()
+
+            delay = next(intervals)
+            if self.timeout is not None:
+                remaining = self.timeout - (time.time() - started_at)
+                if remaining <= 0:
+                    raise exceptions.WaitTimeout(timeout=self.timeout,
+                                                 what=what)
+                delay = min(delay, remaining)
+            if deadline is not None:
+                delay = min(delay, deadline.remaining())
+
+            LOG.debug('Waiting for %(what)s, will check again %(delay).1f '
+                      'seconds later.', {'what': what, 'delay': delay})
+            time.sleep(delay)
+            if deadline is not None:
+                deadline.check(what)
+
+    def wait(self, condition, what, deadline=None):
+        """wait until condition returns a true value.
+
+        :param condition: a callable without argument, the polling stops
+            when it returns a true value
+        :param what: indicates what we are waiting for, used in logs and
+            timeout error message
+        :param deadline: indicates the deadline of the whole operation
+        :raises: exceptions.WaitTimeout when condition is still not satisfied
+            after timeout seconds
+        :raises: exceptions.DeadlineExceeded when condition is still not
+            satisfied when deadline expires
+        :raises: exceptions.OperationCancelled when deadline is cancelled
+        :raises: any error raised by condition
+        :return: the true value returned by condition
+        """
+        return self._wait({what: condition}, what, False, deadline)[what]
+
+    def wait_all(self, conditions, what, deadline=None):
+        """wait until all conditions return a true value.
+
+        All conditions are polled by current thread, each one on its own
+        schedule, so a single thread is enough to wait for a whole fleet of
+        servers. An `IBMCClientError` raised by one condition is logged and
+        that condition is checked again on its next schedule.
+
+        Notes:: conditions are checked one after another, a slow check (for
+        example a request to a slow iBMC which may take up to the connector
+        timeout) delays the checks of all other conditions.
+
+        :param conditions: a dict which maps a key to a callable without
+            argument, the polling of a key stops when its callable returns
+            a true value
+        :param what: indicates what we are waiting for, used in logs and
+            timeout error message
+        :param deadline: indicates the deadline of the whole operation
+        :raises: exceptions.WaitTimeout when any condition is still not
+            satisfied after timeout seconds
+        :raises: exceptions.DeadlineExceeded when any condition is still not
+            satisfied when deadline expires
+        :raises: exceptions.OperationCancelled when deadline is cancelled
+        :return: a dict which maps a key to the true value returned by its
+            callable
+        """
+        return self._wait(conditions, what, True, deadline)
+
+    def _wait(self, conditions, what, tolerate_errors, deadline):
+        started_at = time.time()
+        results = {}
+        # the sequence number makes heap entries comparable
+        schedule = [(started_at, seq, key, self.intervals())
+                    for (seq, key) in enumerate(conditions)]
+        while schedule:
+            check_at, seq, key, intervals = heapq.heappop(schedule)
+            now = time.time()
+            if check_at > now:
+                time.sleep(check_at - now)
+            if deadline is not None:
+                deadline.check(what)
+
+            try:
+                result = conditions[key]()
+            except (exceptions.DeadlineExceeded,
+                    exceptions.OperationCancelled):
+                raise
+            except exceptions.IBMCClientError as e:
+                if not tolerate_errors:
+                    raise
+                LOG.warning('Failed to check %(key)s when waiting for '
+                            '%(what)s, error: %(error)s',
+                            {'key': key, 'what': what, 'error': e})
+                result = None
+
+            if result:
+                results[key] = result
+                continue
+
+            now = time.time()
+            remaining = (float('inf') if self.timeout is None
+                         else self.timeout - (now - started_at))
+            if remaining <= 0:
+                if len(conditions) > 1:
+                    pending = [key] + [_[2] for _ in sorted(schedule)]
+                    what = '%s (%s)' % (what, ', '.join(map(str, pending)))
+                raise exceptions.WaitTimeout(timeout=self.timeout, what=what)
+
+            delay = min(next(intervals), remaining)
+            if deadline is not None:
+                delay = min(delay, deadline.remaining())
+            if len(conditions) > 1:
+                LOG.info('Waiting for %(what)s, will check %(key)s again '
+                         '%(delay).1f seconds later.',
+                         {'what': what, 'key': key, 'delay': delay})
+            else:
+                LOG.info('Waiting for %(what)s, will check again '
+                         '%(delay).1f seconds later.',
+                         {'what': what, 'delay': delay})
+            heapq.heappush(schedule, (now + delay, seq, key, intervals))
+
+        return results
@@ -55,6 +55,10 @@ setup(
     extras_require={  # Optional
         'dev': ['check-manifest', 'flake8'],
         'test': ['coverage'],
+        'numpy': ['numpy'],
+    },
+    entry_points={
+        'console_scripts': ['ibmc = ibmc_client.cli:main'],
     },
     project_urls={  # Optional
         'Bug Reports': 'https://github.com/IamFive/python-ibmcclient/issues',
@@ -0,0 +1,59 @@
+# coding: utf-8
+"""Benchmarks of python-ibmcclient, run a benchmark module directly::
+
+    python -m tests.benchmarks.bench_raid_search
+"""
+import random
+import timeit
+
+from ibmc_client import raid_utils
+
+GB = 1000 * 1000 * 1000
+
+DRIVE_CAPACITY_BYTES = (480 * GB, 600 * GB, 960 * GB, 1200 * GB, 1800 * GB,
+                        2400 * GB, 4000 * GB)
+"""capacity bytes of drives in synthetic inventories"""
+
+MEDIA_TYPES = ('HDD', 'SSD')
+
+
+class FakeDrive(object):
+    """Minimal drive model which a `raid_utils.PhysicalDisk` requires"""
+
+    protocol = 'SAS'
+    firmware_state = 'UnconfiguredGood'
+
+    def __init__(self, drive_id, media_type, capacity_bytes):
+        self.drive_id = drive_id
+        self.id = 'HDDPlaneDisk%d' % drive_id
+        self.odata_id = '/redfish/v1/Chassis/1/Drives/%s' % self.id
+        self.media_type = media_type
+        self.capacity_bytes = capacity_bytes
+        self.volume_odata_id_collection = []
+
+    def is_unconfig_good(self):
+        return True
+
+
+def make_disks(count, seed=0, media_types=MEDIA_TYPES,
+               capacities=DRIVE_CAPACITY_BYTES):
+    """make a synthetic physical disk inventory
+
+    :param count: indicates disk count
+    :param seed: indicates random seed, same seed makes same inventory
+    :param media_types: indicates media types to choose from
+    :param capacities: indicates capacity bytes to choose from
+    :return: a list of :class:`~ibmc_client.raid_utils.PhysicalDisk`
+    """
+    rand = random.Random(seed)
+    return [raid_utils.PhysicalDisk(FakeDrive(idx, rand.choice(media_types),
+                                              rand.choice(capacities)))
+            for idx in range(count)]
+
+
+def best_of(func, repeat=3, number=1):
+    """get the best seconds of calling func `number` times
+
+    :return: best seconds per call
+    """
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
@@ -0,0 +1,56 @@
+# coding: utf-8
+"""Benchmark `Raid.get_best_matched_disk_group` with and without the index
+
+Every round chooses a group for a shared volume and takes capacity from it,
+the way logical disks sharing physical disks are assigned.
+
+Usage::
+
+    python -m tests.benchmarks.bench_disk_group
+"""
+import logging
+import random
+
+from ibmc_client import raid_utils
+from tests.benchmarks import GB, best_of, make_disks
+
+GROUP_COUNTS = (12, 48, 192)
+ROUNDS = 200
+
+
+def make_groups(count, seed=0):
+    rand = random.Random(seed)
+    groups = []
+    for idx in range(count):
+        raid = raid_utils.RAID_SETTINGS[rand.choice(('1', '5', '6'))]
+        drives = [disk.drive for disk in make_disks(
+            raid.min_disks + rand.randint(0, 4), seed=idx,
+            media_types=('HDD',))]
+        group = raid_utils.PhysicalDiskGroup(drives, raid, 1)
+        group.add_used_capacity_bytes(rand.randint(0, 400) * GB)
+        groups.append(group)
+    return groups
+
+
+def run(groups):
+    raid = raid_utils.RAID_SETTINGS['5']
+    for idx in range(ROUNDS):
+        group = raid.get_best_matched_disk_group((idx % 50 + 1) * GB, groups)
+        if group is not None:
+            group.add_pending_capacity_bytes((idx % 50 + 1) * GB)
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    print('%6s %12s %12s %9s' % ('groups', 'scan(s)', 'index(s)',
+                                 'speedup'))
+    for count in GROUP_COUNTS:
+        scan = best_of(lambda: run(list(make_groups(count))))
+        index = best_of(lambda: run(raid_utils.PhysicalDiskGroupList(
+            make_groups(count))))
+        print('%6d %12.6f %12.6f %8.1fx' % (count, scan, index,
+                                            scan / index))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+# coding: utf-8
+"""End-to-end benchmark of client hot paths against the iBMC simulator
+
+Every virtual BMC of a fleet is driven through a scenario of `connect()`,
+`system.get()`, `storage.list()`, `Storage.summary()`,
+`apply_raid_configuration` and `delete_all_raid_configuration`, servers are
+driven concurrently. For every fleet size and concurrency level, p50, p95
+and p99 latency, requests and bytes per operation and wall-clock time are
+reported, optionally as JSON. Requests and bytes (request and response
+bodies) are counted by the virtual BMCs.
+
+Usage::
+
+    python -m tests.benchmarks.bench_e2e [--fleet-sizes 1,8,32]
+        [--concurrency 1,8] [--iterations 2] [--latency 0.005]
+        [--latency-jitter 0] [--task-seconds 0] [--output report.json]
+"""
+import argparse
+import collections
+import json
+import logging
+import math
+import platform
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import ibmc_client
+from ibmc_client.simulator import Simulator, VirtualBMC
+
+OPERATIONS = ('connect', 'system.get', 'storage.list', 'storage.summary',
+              'apply_raid_configuration', 'delete_all_raid_configuration')
+
+LOGICAL_DISKS = [
+    {'raid_level': '1', 'size_gb': 100, 'volume_name': 'os',
+     'is_root_volume': True},
+    {'raid_level': '5', 'size_gb': 1000},
+    {'raid_level': '5', 'size_gb': 'MAX', 'share_physical_disks': True},
+]
+"""logical disks applied by the scenario"""
+
+REPORT_VERSION = 1
+
+
+def percentile(values, pct):
+    # type: (list[float], float) -> float
+    """get percentile of values with the nearest-rank method
+
+    :param values: indicates the values
+    :param pct: indicates the percentile, 0 ~ 100
+    :return: the percentile, None if values is empty
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = int(math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[max(rank, 1) - 1]
+
+
+class _Recorder(object):
+    """record latency, requests and bytes of operations on a virtual BMC"""
+
+    def __init__(self, bmc, samples):
+        self.bmc = bmc
+        self.samples = samples
+
+    def __call__(self, operation, func, *args, **kwargs):
+        stats = dict(self.bmc.stats)
+        started_at = time.time()
+        result = func(*args, **kwargs)
+        seconds = time.time() - started_at
+        after = self.bmc.stats
+        self.samples[operation].append((
+            seconds,
+            after['requests'] - stats.get('requests', 0),
+            (after['bytes_sent'] - stats.get('bytes_sent', 0)
+             + after['bytes_received'] - stats.get('bytes_received', 0))))
+        return result
+
+
+def scenario(address, record):
+    """drive a virtual BMC through the client hot paths once"""
+    client = record('connect', _connect, address)
+    try:
+        record('system.get', client.system.get)
+        controllers = record('storage.list', client.system.storage.list)
+        for ctrl in controllers:
+            record('storage.summary', ctrl.summary)
+        record('apply_raid_configuration',
+               client.system.storage.apply_raid_configuration, LOGICAL_DISKS)
+        record('delete_all_raid_configuration',
+               client.system.storage.delete_all_raid_configuration)
+    finally:
+        client.connector.disconnect()
+
+
+def _connect(address):
+    client = ibmc_client.connect(address, VirtualBMC.DEFAULT_USERNAME,
+                                 VirtualBMC.DEFAULT_PASSWORD, False)
+    client.connector.connect()
+    return client
+
+
+def run(fleet_size, concurrency, iterations=1, **settings):
+    """run the scenario on a fleet of virtual BMCs
+
+    :param fleet_size: indicates count of virtual BMCs
+    :param concurrency: indicates count of BMCs driven at the same time
+    :param iterations: indicates times to run the scenario per BMC
+    :param settings: indicates settings of virtual BMCs, check
+        :class:`~ibmc_client.simulator.VirtualBMC`
+    :return: the result of this fleet size and concurrency
+    """
+    samples = collections.defaultdict(list)
+    with Simulator() as simulator:
+        addresses = simulator.add_fleet(fleet_size, **settings)
+        recorders = dict((address, _Recorder(simulator.bmc(address), samples))
+                         for address in addresses)
+
+        def drive(address):
+            for _ in range(iterations):
+                scenario(address, recorders[address])
+
+        started_at = time.time()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(drive, address)
+                           for address in addresses]:
+                future.result()
+        wall_seconds = time.time() - started_at
+
+    operations = {}
+    for operation in OPERATIONS:
+        op_samples = samples.get(operation, [])
+        latencies = [_[0] for _ in op_samples]
+        count = len(op_samples)
+        operations[operation] = {
+            'count': count,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'requests_per_op': (sum(_[1] for _ in op_samples) / float(count)
+                                if count else None),
+            'bytes_per_op': (sum(_[2] for _ in op_samples) / float(count)
+                             if count else None),
+        }
+    return {'fleet_size': fleet_size, 'concurrency': concurrency,
+            'iterations': iterations, 'wall_seconds': wall_seconds,
+            'operations': operations}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fleet-sizes', default='1,8,32',
+                        help='comma separated fleet sizes, '
+                             'default %(default)s')
+    parser.add_argument('--concurrency', default='1,8',
+                        help='comma separated concurrency levels, '
+                             'default %(default)s')
+    parser.add_argument('--iterations', type=int, default=2,
+                        help='scenario runs per BMC, default %(default)s')
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='seconds of simulated BMC latency per request, '
+                             'default %(default)s')
+    parser.add_argument('--latency-jitter', type=float, default=0)
+    parser.add_argument('--task-seconds', type=float, default=0,
+                        help='seconds of simulated volume tasks, '
+                             'default %(default)s')
+    parser.add_argument('--output', help='write JSON report to this file')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    results = []
+    for fleet_size in [int(_) for _ in args.fleet_sizes.split(',')]:
+        for concurrency in [int(_) for _ in args.concurrency.split(',')]:
+            result = run(fleet_size, concurrency, args.iterations,
+                         latency=args.latency,
+                         latency_jitter=args.latency_jitter,
+                         task_seconds=args.task_seconds, seed=0)
+            results.append(result)
+            print('fleet %d, concurrency %d: %.3fs wall' % (
+                fleet_size, concurrency, result['wall_seconds']))
+            print('  %-32s %9s %9s %9s %9s %11s' % (
+                'operation', 'p50', 'p95', 'p99', 'requests', 'bytes'))
+            for operation in OPERATIONS:
+                stat = result['operations'][operation]
+                if not stat['count']:
+                    continue
+                print('  %-32s %9.4f %9.4f %9.4f %9.1f %11.0f' % (
+                    operation, stat['p50'], stat['p95'], stat['p99'],
+                    stat['requests_per_op'], stat['bytes_per_op']))
+
+    if args.output:
+        report = {'version': REPORT_VERSION,
+                  'python': platform.python_version(),
+                  'settings': {'latency': args.latency,
+                               'latency_jitter': args.latency_jitter,
+                               'task_seconds': args.task_seconds,
+                               'iterations': args.iterations},
+                  'results': results}
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
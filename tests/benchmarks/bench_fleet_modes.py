@@ -0,0 +1,100 @@
+# coding: utf-8
+"""Benchmark thread and process pool modes of fleet RAID configuration
+
+A simulated fleet of servers with different synthetic inventories (check
+`bench_planner.make_inventory`) is configured by
+`fleet.apply_raid_configuration`, planning in the threads of servers
+(`--processes 0`) and in a pool of processes. The process pool pays off
+when planning is CPU bound and there are several CPUs, spawning worker
+processes costs a fixed delay.
+
+Usage::
+
+    python -m tests.benchmarks.bench_fleet_modes [--fleet-size 16]
+        [--disks 96] [--processes 0,4] [--planner] [--latency 0.005]
+        [--output report.json]
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import platform
+import sys
+import time
+
+import ibmc_client
+from ibmc_client import fleet
+from ibmc_client.raid_planner import RaidPlanner
+from ibmc_client.simulator import Simulator, VirtualBMC
+from tests.benchmarks.bench_planner import LOGICAL_DISKS, make_inventory
+
+REPORT_VERSION = 1
+
+
+def run(fleet_size, disks, processes, planner=None, **settings):
+    """configure a simulated fleet once
+
+    :param fleet_size: indicates count of virtual BMCs
+    :param disks: indicates count of drives of every BMC
+    :param processes: indicates count of planning processes, 0 plans in
+        threads of servers
+    :param planner: indicates the planner to use
+    :param settings: indicates settings of virtual BMCs
+    :return: wall-clock seconds
+    """
+    with Simulator() as simulator:
+        addresses = [simulator.add(VirtualBMC(
+            storages=[make_inventory(disks, seed=idx)], seed=idx,
+            **settings)) for idx in range(fleet_size)]
+        clients = [ibmc_client.connect(address, VirtualBMC.DEFAULT_USERNAME,
+                                       VirtualBMC.DEFAULT_PASSWORD, False)
+                   for address in addresses]
+        for client in clients:
+            client.connector.connect()
+        started_at = time.time()
+        fleet.apply_raid_configuration(clients, LOGICAL_DISKS, planner,
+                                       processes=processes)
+        return time.time() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fleet-size', type=int, default=16)
+    parser.add_argument('--disks', type=int, default=96,
+                        help='drives per server, default %(default)s')
+    parser.add_argument('--processes', default='0,%d' %
+                        multiprocessing.cpu_count(),
+                        help='comma separated counts of planning processes, '
+                             '0 plans in threads, default %(default)s')
+    parser.add_argument('--planner', action='store_true',
+                        help='plan with RaidPlanner instead of greedy')
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='seconds of simulated BMC latency per request, '
+                             'default %(default)s')
+    parser.add_argument('--output', help='write JSON report to this file')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    planner = RaidPlanner(time_budget=60) if args.planner else None
+    results = {}
+    for processes in [int(_) for _ in args.processes.split(',')]:
+        results[processes] = run(args.fleet_size, args.disks, processes,
+                                 planner, latency=args.latency)
+        print('processes %d: %.3fs wall' % (processes, results[processes]))
+
+    if args.output:
+        report = {'version': REPORT_VERSION,
+                  'python': platform.python_version(),
+                  'cpus': multiprocessing.cpu_count(),
+                  'settings': {'fleet_size': args.fleet_size,
+                               'disks': args.disks,
+                               'planner': args.planner,
+                               'latency': args.latency},
+                  'results': dict((str(k), v) for (k, v) in results.items())}
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
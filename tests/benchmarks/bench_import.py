@@ -0,0 +1,119 @@
+# coding: utf-8
+"""Benchmark the import time of ibmc_client
+
+Every statement is timed in fresh interpreters, the median is reported.
+Modules which should not be loaded by a bare `import ibmc_client` are
+checked, the benchmark exits with 1 when any of them is loaded or the
+median import time exceeds `--max-seconds`.
+
+Usage::
+
+    python -m tests.benchmarks.bench_import [--runs 20] [--max-seconds 0.05]
+        [--output report.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+STATEMENTS = (
+    ('import ibmc_client', 'import ibmc_client; ibmc_client.connect'),
+    ('import ibmc_client.api.system.storage',
+     'import ibmc_client.api.system.storage'),
+)
+"""a list of (case name, statement) tuples"""
+
+HEAVY_MODULES = ('requests', 'numpy', 'ibmc_client.connector',
+                 'ibmc_client.api', 'ibmc_client.resources',
+                 'ibmc_client.raid_utils', 'ibmc_client.raid_planner')
+"""modules which should be imported lazily"""
+
+REPORT_VERSION = 1
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+_TIMER = '''
+import time
+started_at = time.time()
+%s
+seconds = time.time() - started_at
+import json, sys
+print(json.dumps([seconds, sorted(sys.modules)]))
+'''
+
+
+def measure(statement):
+    # type: (str) -> tuple
+    """run a statement in a fresh interpreter
+
+    :param statement: indicates the statement to run
+    :return: a tuple of (seconds taken, names of loaded modules)
+    """
+    output = subprocess.check_output([sys.executable, '-c',
+                                      _TIMER % statement], cwd=_ROOT)
+    seconds, modules = json.loads(output.decode('utf-8').splitlines()[-1])
+    return seconds, modules
+
+
+def loaded_heavy_modules(modules):
+    # type: (list[str]) -> list[str]
+    """get heavy modules or their submodules in loaded modules"""
+    return sorted(name for name in modules
+                  if any(name == heavy or name.startswith(heavy + '.')
+                         for heavy in HEAVY_MODULES))
+
+
+def run(runs):
+    """measure every statement
+
+    :param runs: indicates count of fresh interpreters per statement
+    :return: a dict of case name and median seconds, heavy modules loaded
+        by `import ibmc_client`
+    """
+    cases, heavy = {}, []
+    for (name, statement) in STATEMENTS:
+        samples = []
+        for _ in range(runs):
+            seconds, modules = measure(statement)
+            samples.append(seconds)
+        cases[name] = sorted(samples)[len(samples) // 2]
+        if name == 'import ibmc_client':
+            heavy = loaded_heavy_modules(modules)
+    return {'runs': runs, 'cases': cases, 'heavy_modules': heavy}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--max-seconds', type=float, default=0.05,
+                        help='max median seconds of `import ibmc_client`, '
+                             'default %(default)s')
+    parser.add_argument('--output', help='write JSON report to this file')
+    args = parser.parse_args()
+
+    result = run(args.runs)
+    for (name, _) in STATEMENTS:
+        print('%-40s %9.4fs' % (name, result['cases'][name]))
+
+    if args.output:
+        report = dict(result, version=REPORT_VERSION,
+                      python=platform.python_version())
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2, sort_keys=True)
+
+    failed = False
+    if result['heavy_modules']:
+        print('`import ibmc_client` loads: %s'
+              % ', '.join(result['heavy_modules']))
+        failed = True
+    if result['cases']['import ibmc_client'] > args.max_seconds:
+        print('`import ibmc_client` exceeds %.4fs' % args.max_seconds)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+# coding: utf-8
+"""Benchmark concurrency limiters against an overloaded iBMC
+
+Many threads share a client of a simulated iBMC whose latency grows past
+`--capacity` requests in flight and which responds 503 past twice of it
+(check `VirtualBMC.capacity`). Requests are sent without limiter, with a
+fixed limit and with the adaptive AIMD limiter, wall-clock time, errors
+and p50/p99 latency of requests are reported.
+
+Usage::
+
+    python -m tests.benchmarks.bench_limiter [--threads 32] [--requests 10]
+        [--capacity 4] [--latency 0.02] [--output report.json]
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import threading
+import time
+
+import ibmc_client
+from ibmc_client import exceptions
+from ibmc_client import utils
+from ibmc_client.limiter import AdaptiveConcurrencyLimiter
+from ibmc_client.limiter import ConcurrencyLimiter
+from ibmc_client.simulator import Simulator, VirtualBMC
+from tests.benchmarks.bench_e2e import percentile
+
+REPORT_VERSION = 1
+
+
+def run(limiter, threads, requests, **settings):
+    """send requests of threads through a shared client once
+
+    :param limiter: indicates the limiter of the client
+    :param threads: indicates count of threads
+    :param requests: indicates count of requests sent by every thread
+    :param settings: indicates settings of the virtual BMC
+    :return: the result
+    """
+    with Simulator() as simulator:
+        bmc = VirtualBMC(**settings)
+        client = ibmc_client.connect(
+            simulator.add(bmc), VirtualBMC.DEFAULT_USERNAME,
+            VirtualBMC.DEFAULT_PASSWORD, False, limiter=limiter)
+        connector = client.connector
+        connector.connect()
+
+        lock = threading.Lock()
+        seconds, errors = [], []
+
+        def get_system(_):
+            for _ in range(requests):
+                started_at = time.time()
+                try:
+                    connector.request('GET', connector.system_base_url)
+                except exceptions.IBMCClientError as e:
+                    with lock:
+                        errors.append(e)
+                with lock:
+                    seconds.append(time.time() - started_at)
+
+        started_at = time.time()
+        utils.parallel_map(get_system, range(threads), threads)
+        return {'wall': time.time() - started_at, 'errors': len(errors),
+                'p50': percentile(seconds, 50),
+                'p99': percentile(seconds, 99),
+                'limit': limiter.limit if limiter else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=10,
+                        help='requests per thread, default %(default)s')
+    parser.add_argument('--capacity', type=int, default=4,
+                        help='requests the BMC serves concurrently without '
+                             'slowing down, default %(default)s')
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='seconds of simulated BMC latency per request, '
+                             'default %(default)s')
+    parser.add_argument('--output', help='write JSON report to this file')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    limiters = (('none', None),
+                ('fixed', ConcurrencyLimiter(args.capacity)),
+                ('adaptive', AdaptiveConcurrencyLimiter()))
+    results = {}
+    for (name, limiter) in limiters:
+        results[name] = run(limiter, args.threads, args.requests,
+                            capacity=args.capacity, latency=args.latency)
+        print('%-9s %.3fs wall, %d errors, p50 %.4fs, p99 %.4fs' % (
+            name, results[name]['wall'], results[name]['errors'],
+            results[name]['p50'], results[name]['p99']))
+
+    if args.output:
+        report = {'version': REPORT_VERSION,
+                  'python': platform.python_version(),
+                  'settings': {'threads': args.threads,
+                               'requests': args.requests,
+                               'capacity': args.capacity,
+                               'latency': args.latency},
+                  'results': results}
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
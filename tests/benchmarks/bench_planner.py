@@ -0,0 +1,262 @@
+# coding: utf-8
+"""Benchmark RAID planning on synthetic inventories with regression check
+
+Synthetic controllers have mixed media types, protocols and heterogeneous
+capacities, part of their drives form shared disk groups already. Disk
+search, disk group search and multi-volume planning (greedy and
+`RaidPlanner`) are timed, results are written as a JSON report and compared
+with the checked-in baseline, a case slower than `--max-slowdown` times of
+its baseline is a regression.
+
+Timings depend on the machine, so every case is recorded as a ratio of its
+seconds over a reference run of the original disk search
+(`tests.benchmarks.legacy_raid`) timed in the same process, and only the
+ratios are compared with the baseline.
+
+Usage::
+
+    python -m tests.benchmarks.bench_planner [--output report.json]
+        [--baseline FILE] [--update-baseline] [--max-slowdown 2.0]
+        [--disk-counts 24,48,96,256,1024]
+
+Exit status is 1 when any case regresses.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+
+from ibmc_client import raid_utils
+from ibmc_client.api.system import storage
+from ibmc_client.raid_planner import RaidPlanner
+from ibmc_client.resources.system.storage import StorageSnapshot
+from tests.benchmarks import GB, DRIVE_CAPACITY_BYTES, MEDIA_TYPES, best_of
+from tests.benchmarks import legacy_raid, make_disks
+
+DISK_COUNTS = (24, 48, 96, 256, 1024)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__),
+                                'bench_planner_baseline.json')
+
+DEFAULT_MAX_SLOWDOWN = 2.0
+"""a case regresses when it is slower than this times of its baseline"""
+
+NOISE_FLOOR_RATIO = 0.25
+"""cases faster than this times of the reference run are never treated as
+regression"""
+
+REFERENCE_DISK_COUNT = 96
+"""disk count of the reference run, the original RAID6 'max' disk search"""
+
+REPORT_VERSION = 2
+
+PROTOCOLS = ('SAS', 'SATA')
+
+SEARCH_DISKS_CASES = (
+    # (name, raid key, target capacity, disk count to use)
+    ('raid5-2000GB', '5', 2000 * GB, None),
+    ('raid6-max', '6', -1, None),
+    ('raid10-1000GB', '1+0', 1000 * GB, None),
+)
+
+LOGICAL_DISKS = [
+    {'raid_level': '1', 'size_gb': 100, 'volume_name': 'os',
+     'is_root_volume': True},
+    {'raid_level': '5', 'size_gb': 1000},
+    {'raid_level': '5', 'size_gb': 200, 'share_physical_disks': True},
+    {'raid_level': '1+0', 'size_gb': 500},
+    {'raid_level': '0', 'size_gb': 'MAX', 'share_physical_disks': True},
+]
+"""logical disks of multi-volume planning cases"""
+
+PLANNER_MAX_DISKS = 96
+"""`RaidPlanner` branches on candidates, only time it on small inventories"""
+
+
+def make_inventory(count, seed=0):
+    """make a synthetic controller description
+
+    About a quarter of drives form RAID5 shared disk groups of 3 to 6 drives
+    with same media type, every group has an exists volume which uses half
+    of its capacity.
+
+    :param count: indicates drive count
+    :param seed: indicates random seed, same seed makes same inventory
+    :return: a description accepted by `StorageSnapshot.from_description`
+    """
+    rand = random.Random(seed)
+    drives = [{'id': 'Disk%d' % idx, 'drive_id': idx,
+               'media_type': rand.choice(MEDIA_TYPES),
+               'protocol': rand.choice(PROTOCOLS),
+               'capacity_bytes': rand.choice(DRIVE_CAPACITY_BYTES)}
+              for idx in range(count)]
+
+    volumes = []
+    free = list(drives)
+    rand.shuffle(free)
+    while len(free) > count * 3 // 4:
+        media_type = free[0]['media_type']
+        members = [d for d in free if d['media_type'] == media_type]
+        members = members[:rand.randint(3, 6)]
+        if len(members) < 3:
+            break
+        for member in members:
+            free.remove(member)
+        min_capacity = min(d['capacity_bytes'] for d in members)
+        volumes.append({
+            'id': 'LogicalDrive%d' % len(volumes), 'raid_level': 'RAID5',
+            'span': 1, 'drives': [d['id'] for d in members],
+            'capacity_bytes': min_capacity * (len(members) - 1) // 2})
+
+    return {'id': 'RAIDStorage0', 'drives': drives, 'volumes': volumes}
+
+
+def make_cases(disk_counts):
+    """make benchmark cases
+
+    :return: a list of (case name, callable) tuple
+    """
+    cases = []
+    for count in disk_counts:
+        ctrl = StorageSnapshot.from_description(make_inventory(count))
+        disks = [raid_utils.PhysicalDisk(drive) for drive in ctrl.drives()
+                 if drive.is_unconfig_good()]
+        groups = storage.build_disk_groups(ctrl)
+
+        for (name, key, target, use) in SEARCH_DISKS_CASES:
+            raid = raid_utils.RAID_SETTINGS[key]
+            cases.append((
+                'search_disks/%s/%d' % (name, count),
+                lambda raid=raid, target=target, use=use, disks=disks:
+                    raid.get_best_matched_disks(target, disks, use)))
+
+        raid5 = raid_utils.RAID_SETTINGS['5']
+        cases.append((
+            'search_disk_group/raid5-100GB/%d' % count,
+            lambda groups=groups: raid5.get_best_matched_disk_group(
+                100 * GB, groups)))
+
+        def plan(ctrl=ctrl, planner=None):
+            groups = storage.prepare_pending_volumes(LOGICAL_DISKS, [ctrl])
+            storage.assign_disks(ctrl, groups[ctrl.id], planner)
+
+        cases.append(('plan_greedy/%d' % count, plan))
+        if count <= PLANNER_MAX_DISKS:
+            cases.append((
+                'plan_planner/%d' % count,
+                lambda plan=plan: plan(planner=RaidPlanner(time_budget=60))))
+    return cases
+
+
+def time_reference(repeat=10):
+    """time the reference run which cases are normalised by
+
+    :return: best seconds of the reference run
+    """
+    disks = make_disks(REFERENCE_DISK_COUNT)
+    raid6 = raid_utils.RAID_SETTINGS['6']
+    return best_of(lambda: legacy_raid.get_best_matched_disks(
+        raid6, -1, disks, None), repeat=repeat)
+
+
+def run(disk_counts, repeat=3):
+    """run benchmark cases
+
+    :return: the report, `cases` holds seconds of every case over seconds
+        of the reference run, `seconds` holds seconds of every case for
+        information only
+    """
+    reference = time_reference()
+    seconds = {}
+    for (name, func) in make_cases(disk_counts):
+        seconds[name] = round(best_of(func, repeat=repeat), 7)
+    return {
+        'version': REPORT_VERSION,
+        'python': platform.python_version(),
+        'numpy': raid_utils.numpy is not None,
+        'reference_seconds': round(reference, 7),
+        'seconds': seconds,
+        'cases': dict((name, round(value / reference, 4))
+                      for (name, value) in seconds.items()),
+    }
+
+
+def check(report, baseline, max_slowdown):
+    """compare ratios of a report with baseline
+
+    :return: a list of (case name, ratio, baseline ratio) tuple of
+        regressed cases
+    """
+    regressions = []
+    for (name, ratio) in sorted(report['cases'].items()):
+        expected = baseline['cases'].get(name)
+        if expected is None:
+            continue
+        threshold = max(expected * max_slowdown, NOISE_FLOOR_RATIO)
+        if ratio > threshold:
+            regressions.append((name, ratio, expected))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help='write JSON report to this file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='baseline report, default %(default)s')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='write the report as baseline instead of '
+                             'checking regressions')
+    parser.add_argument('--max-slowdown', type=float,
+                        default=DEFAULT_MAX_SLOWDOWN,
+                        help='max allowed slowdown against baseline, '
+                             'default %(default)s')
+    parser.add_argument('--disk-counts',
+                        default=','.join(str(_) for _ in DISK_COUNTS),
+                        help='comma separated disk counts, '
+                             'default %(default)s')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    disk_counts = [int(_) for _ in args.disk_counts.split(',')]
+    report = run(disk_counts)
+    print('%-40s %12.6f' % ('reference', report['reference_seconds']))
+    for (name, ratio) in sorted(report['cases'].items()):
+        print('%-40s %12.6f %10.4fx' % (name, report['seconds'][name],
+                                        ratio))
+
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        # absolute timings of this machine are not part of the baseline
+        baseline = dict((key, value) for (key, value) in report.items()
+                        if key not in ('reference_seconds', 'seconds'))
+        with open(args.baseline, 'w') as fp:
+            json.dump(baseline, fp, indent=2, sort_keys=True)
+            fp.write('\n')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline %s, skip regression check.' % args.baseline)
+        return 0
+
+    with open(args.baseline) as fp:
+        baseline = json.load(fp)
+    if baseline.get('version') != REPORT_VERSION:
+        print('Baseline %s is of version %s, skip regression check, '
+              'update it with --update-baseline.'
+              % (args.baseline, baseline.get('version')))
+        return 0
+    regressions = check(report, baseline, args.max_slowdown)
+    for (name, ratio, expected) in regressions:
+        print('REGRESSION %s: %.4fx of reference, baseline %.4fx'
+              % (name, ratio, expected))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# coding: utf-8
+"""Benchmark `Raid.get_best_matched_disks` against the original search
+
+Every scoring backend available is benchmarked, NumPy backend is only
+benchmarked when NumPy is installed.
+
+Usage::
+
+    python -m tests.benchmarks.bench_raid_search [--skip-legacy-over N]
+"""
+import argparse
+import logging
+
+from ibmc_client import raid_utils
+from tests.benchmarks import GB, best_of, legacy_raid, make_disks
+
+DISK_COUNTS = (24, 96, 1024)
+
+SCENARIOS = (
+    # (raid key, target capacity, disk count to use)
+    ('5', 2000 * GB, None),
+    ('5', -1, None),
+    ('6', -1, 8),
+    ('1+0', 1000 * GB, None),
+    ('5+0', -1, None),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--skip-legacy-over', type=int, default=1024,
+                        help='skip the slow original search when disk count '
+                             'is greater than this, default %(default)s')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    backends = [raid_utils.SCORING_BACKEND_PYTHON]
+    if raid_utils.numpy is not None:
+        backends.append(raid_utils.SCORING_BACKEND_NUMPY)
+
+    header = '%6s %5s %14s %4s %12s' % ('disks', 'raid', 'target', 'use',
+                                        'legacy(s)')
+    for backend in backends:
+        header += ' %12s %9s' % ('%s(s)' % backend, 'speedup')
+    print(header)
+    for disk_count in DISK_COUNTS:
+        disks = make_disks(disk_count)
+        for (key, target, use) in SCENARIOS:
+            raid = raid_utils.RAID_SETTINGS[key]
+            legacy_seconds = None
+            if disk_count <= args.skip_legacy_over:
+                legacy_seconds = best_of(
+                    lambda: legacy_raid.get_best_matched_disks(
+                        raid, target, disks, use), repeat=1)
+
+            line = '%6d %5s %14s %4s %12s' % (
+                disk_count, key, target, use or '-',
+                '-' if legacy_seconds is None else '%.6f' % legacy_seconds)
+            for backend in backends:
+                raid_utils.Raid.SCORING_BACKEND = backend
+                seconds = best_of(lambda: raid.get_best_matched_disks(
+                    target, disks, use))
+                line += ' %12.6f %9s' % (
+                    seconds, '-' if legacy_seconds is None
+                    else '%.1fx' % (legacy_seconds / seconds))
+            raid_utils.Raid.SCORING_BACKEND = raid_utils.SCORING_BACKEND_AUTO
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+# coding: utf-8
+"""Benchmark client overhead by replaying recorded iBMC exchanges
+
+A cassette (check :mod:`ibmc_client.cassette`) of the scenario is replayed
+with zero latency by default, so the wall-clock time is spent on request
+preparation, JSON parsing, planning and the other client overhead only.
+p50, p95 and p99 of scenario runs are reported, optionally as JSON.
+
+The scenario lists storages with their summary, applies `LOGICAL_DISKS`
+and deletes all RAID configuration. Cassettes are recorded from the local
+simulator by default, or from a real server with `--address`, which
+DESTROYS the RAID configuration of the server::
+
+    python -m tests.benchmarks.bench_replay --record v5.json
+        [--address https://10.1.1.1 --username admin --password ***]
+
+Usage::
+
+    python -m tests.benchmarks.bench_replay [--cassette v5.json]
+        [--iterations 50] [--latency-scale 0] [--output report.json]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+
+import ibmc_client
+from ibmc_client.cassette import Cassette, RecordingAdapter, ReplayAdapter
+from ibmc_client.simulator import Simulator, VirtualBMC
+from tests.benchmarks.bench_e2e import LOGICAL_DISKS, percentile
+
+DEFAULT_CASSETTE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'unittests', 'data', 'cassettes', 'simulator-raid.json')
+"""cassette recorded from the simulator, checked in as fixture"""
+
+REPLAY_ADDRESS = 'https://replay.invalid'
+
+REPORT_VERSION = 1
+
+
+def scenario(client):
+    """run the recorded scenario, return summaries of storages"""
+    with client:
+        summaries = [ctrl.summary() for ctrl in client.system.storage.list()]
+        client.system.storage.apply_raid_configuration(LOGICAL_DISKS)
+        client.system.storage.delete_all_raid_configuration()
+    return summaries
+
+
+def record(path, address=None, username=None, password=None):
+    """record the scenario to a cassette file
+
+    :param path: indicates the cassette file path
+    :param address: indicates the iBMC address, a simulated BMC is used if
+        not present
+    :param username: indicates the username of iBMC
+    :param password: indicates the password of iBMC
+    :return: the cassette
+    """
+    cassette = Cassette()
+    adapter = RecordingAdapter(cassette)
+    if address:
+        scenario(ibmc_client.connect(address, username, password, False,
+                                     adapter=adapter))
+    else:
+        with Simulator() as simulator:
+            (address,) = simulator.add_fleet(1, seed=0)
+            scenario(ibmc_client.connect(
+                address, VirtualBMC.DEFAULT_USERNAME,
+                VirtualBMC.DEFAULT_PASSWORD, False, adapter=adapter))
+    cassette.save(path)
+    return cassette
+
+
+def run(cassette, iterations, latency_scale=0):
+    """replay the scenario of a cassette
+
+    :param cassette: indicates the cassette
+    :param iterations: indicates times to replay the scenario
+    :param latency_scale: indicates the multiple of recorded latency
+    :return: the result
+    """
+    adapter = ReplayAdapter(cassette, latency_scale=latency_scale)
+    seconds = []
+    for _ in range(iterations):
+        adapter.rewind()
+        started_at = time.time()
+        scenario(ibmc_client.connect(REPLAY_ADDRESS, 'replay', 'replay',
+                                     False, adapter=adapter))
+        seconds.append(time.time() - started_at)
+    return {'exchanges': len(cassette), 'iterations': iterations,
+            'latency_scale': latency_scale,
+            'p50': percentile(seconds, 50), 'p95': percentile(seconds, 95),
+            'p99': percentile(seconds, 99)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cassette', default=DEFAULT_CASSETTE,
+                        help='cassette to replay, default the checked-in '
+                             'simulator cassette')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--latency-scale', type=float, default=0,
+                        help='multiple of recorded latency, 1 replays '
+                             'original latency, default %(default)s')
+    parser.add_argument('--output', help='write JSON report to this file')
+    parser.add_argument('--record', metavar='PATH',
+                        help='record a cassette instead of replaying')
+    parser.add_argument('--address')
+    parser.add_argument('--username')
+    parser.add_argument('--password')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    if args.record:
+        cassette = record(args.record, args.address, args.username,
+                          args.password)
+        print('recorded %d exchanges to %s' % (len(cassette), args.record))
+        return 0
+
+    result = run(Cassette.load(args.cassette), args.iterations,
+                 args.latency_scale)
+    print('%d exchanges: p50 %.4fs, p95 %.4fs, p99 %.4fs' % (
+        result['exchanges'], result['p50'], result['p95'], result['p99']))
+    if args.output:
+        report = {'version': REPORT_VERSION,
+                  'python': platform.python_version(),
+                  'cassette': os.path.basename(args.cassette),
+                  'result': result}
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# coding: utf-8
+"""The original `Raid.get_best_matched_disks` search (logs removed).
+
+It re-filters and re-sorts disks for every span and disk count, and builds a
+`RaidSolution` per window. It is kept as the reference which the optimized
+search must agree with, and as the baseline of benchmarks.
+"""
+import collections
+import math
+
+from ibmc_client import exceptions
+from ibmc_client import raid_utils
+
+
+def get_best_matched_disks(raid_setting, target_capacity, available_disks,
+                           disk_count_to_use):
+    self = raid_setting
+    if self.name == raid_utils.JBOD:
+        return None
+
+    raid = (raid_utils.RAID_SETTINGS.get(self.raid_level)
+            if self.is_spanned else self)
+    available_span_list = [1] if not self.is_spanned else list(range(2, 9))
+
+    grouped_by_media_type = collections.defaultdict(list)
+    for disk in available_disks:
+        grouped_by_media_type[disk.media_type].append(disk)
+
+    is_specified_disk_count_legal = disk_count_to_use is None
+    best_solution = None
+    for (media_type, disks_by_media_type) in grouped_by_media_type.items():
+        for span in available_span_list:
+            if disk_count_to_use:
+                if disk_count_to_use % span != 0:
+                    continue
+
+                disk_count_to_use_per_span = disk_count_to_use / span
+                if (disk_count_to_use_per_span < raid.min_disks or
+                        disk_count_to_use_per_span > raid.max_disks):
+                    continue
+
+                is_specified_disk_count_legal = True
+
+            min_disks = (disk_count_to_use if disk_count_to_use else
+                         raid.min_disks * span)
+            max_disks = (disk_count_to_use if disk_count_to_use else
+                         raid.max_disks * span)
+            overhead = raid.overhead * span
+
+            if min_disks > len(disks_by_media_type):
+                break
+
+            max_disk_count = min(max_disks, len(disks_by_media_type))
+            for required_disk_count in range(
+                    min_disks, max_disk_count + 1, span):
+                required_capacity = math.ceil(
+                    target_capacity / (required_disk_count - overhead))
+                matched_disks = [_ for _ in disks_by_media_type
+                                 if _.capacity_bytes >= required_capacity]
+                if len(matched_disks) < required_disk_count:
+                    continue
+
+                sorted_matched_disks = sorted(
+                    matched_disks, key=lambda d: d.capacity_bytes)
+                cases = len(matched_disks) - required_disk_count + 1
+                for start in range(0, cases):
+                    end = start + required_disk_count
+                    possible_disks = sorted_matched_disks[start:end]
+                    solution = raid_utils.RaidSolution(span, possible_disks,
+                                                       overhead)
+                    if solution.is_better_than(target_capacity,
+                                               best_solution):
+                        best_solution = solution
+
+                if (len(matched_disks) == len(disks_by_media_type)
+                        and target_capacity > 0):
+                    break
+
+    if not is_specified_disk_count_legal:
+        raise exceptions.InvalidPhysicalDiskNumber(
+            number_of_physical_disks=disk_count_to_use, raid=self.key)
+
+    return best_solution
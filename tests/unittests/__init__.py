@@ -19,6 +19,20 @@ root_log = logging.getLogger()
 root_log.setLevel(logging.INFO)
 
 
+class FakeClock(object):
+    """A fake `time` module whose sleep moves the clock forward at once"""
+
+    def __init__(self, now=0):
+        self.now = now
+        self.sleep = mock.Mock(side_effect=self._sleep)
+
+    def _sleep(self, seconds):
+        self.now += seconds
+
+    def time(self):
+        return self.now
+
+
 class BaseUnittest(unittest.TestCase):
     address = "https://server1.ibmc.com"
     username = "username"
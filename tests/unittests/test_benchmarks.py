@@ -0,0 +1,117 @@
+# coding: utf-8
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from ibmc_client.api.system import storage
+from ibmc_client.cassette import Cassette
+from ibmc_client.limiter import ConcurrencyLimiter
+from ibmc_client.resources.system.storage import StorageSnapshot
+from tests.benchmarks import bench_e2e
+from tests.benchmarks import bench_fleet_modes
+from tests.benchmarks import bench_limiter
+from tests.benchmarks import bench_planner
+from tests.benchmarks import bench_replay
+
+
+class TestBenchPlanner(unittest.TestCase):
+    """ planner benchmark unit test stubs """
+
+    def testInventoryIsReproducible(self):
+        self.assertEqual(bench_planner.make_inventory(48, seed=1),
+                         bench_planner.make_inventory(48, seed=1))
+        self.assertNotEqual(bench_planner.make_inventory(48, seed=1),
+                            bench_planner.make_inventory(48, seed=2))
+
+    def testInventoryHasSharedDiskGroups(self):
+        ctrl = StorageSnapshot.from_description(
+            bench_planner.make_inventory(96))
+        groups = storage.build_disk_groups(ctrl)
+        self.assertTrue(groups)
+        for group in groups:
+            self.assertEqual(len(set(d.media_type for d in group.drives)), 1)
+            self.assertTrue(group.left_capacity_bytes > 0)
+
+    def testEveryCaseRuns(self):
+        cases = bench_planner.make_cases([24])
+        self.assertIn('plan_planner/24', [name for (name, _) in cases])
+        for (_, func) in cases:
+            func()
+
+    def testCheckRegressions(self):
+        baseline = {'cases': {'fast': 0.01, 'slow': 1.0, 'gone': 1.0}}
+        report = {'cases': {'fast': 0.1, 'slow': 2.5, 'new': 9.0}}
+        self.assertEqual(bench_planner.check(report, baseline, 2.0),
+                         [('slow', 2.5, 1.0)])
+        self.assertEqual(bench_planner.check(report, baseline, 3.0), [])
+
+    def testBaselineHoldsRatiosOnly(self):
+        with open(bench_planner.DEFAULT_BASELINE) as fp:
+            baseline = json.load(fp)
+        self.assertEqual(baseline['version'], bench_planner.REPORT_VERSION)
+        self.assertNotIn('seconds', baseline)
+        self.assertNotIn('reference_seconds', baseline)
+        names = [name for (name, _) in bench_planner.make_cases(
+            bench_planner.DISK_COUNTS)]
+        self.assertEqual(sorted(baseline['cases']), sorted(names))
+
+
+class TestBenchE2E(unittest.TestCase):
+    """ end-to-end benchmark unit test stubs """
+
+    def testPercentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(bench_e2e.percentile(values, 50), 50)
+        self.assertEqual(bench_e2e.percentile(values, 99), 99)
+        self.assertEqual(bench_e2e.percentile([3, 1, 2], 0), 1)
+        self.assertIsNone(bench_e2e.percentile([], 50))
+
+    def testRunReportsEveryOperation(self):
+        result = bench_e2e.run(2, 2)
+        self.assertEqual(result['fleet_size'], 2)
+        self.assertTrue(result['wall_seconds'] > 0)
+        for operation in bench_e2e.OPERATIONS:
+            stat = result['operations'][operation]
+            self.assertEqual(stat['count'], 2)
+            self.assertTrue(stat['p50'] <= stat['p95'] <= stat['p99'])
+            self.assertTrue(stat['requests_per_op'] >= 1)
+            self.assertTrue(stat['bytes_per_op'] > 0)
+        self.assertEqual(result['operations']['system.get']
+                         ['requests_per_op'], 1)
+
+
+class TestBenchReplay(unittest.TestCase):
+    """ replay benchmark unit test stubs """
+
+    def testRecordAndReplay(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        path = os.path.join(tmp_dir, 'cassette.json')
+        cassette = bench_replay.record(path)
+        result = bench_replay.run(Cassette.load(path), 3)
+        self.assertEqual(result['exchanges'], len(cassette))
+        self.assertTrue(0 < result['p50'] <= result['p99'])
+
+
+class TestBenchFleetModes(unittest.TestCase):
+    """ fleet modes benchmark unit test stubs """
+
+    def testRunInThreads(self):
+        self.assertGreater(bench_fleet_modes.run(2, 24, 0, latency=0), 0)
+
+
+class TestBenchLimiter(unittest.TestCase):
+    """ limiter benchmark unit test stubs """
+
+    def testRunWithFixedLimit(self):
+        result = bench_limiter.run(ConcurrencyLimiter(2), 4, 3,
+                                   capacity=2, latency=0.001)
+        self.assertEqual(result['errors'], 0)
+        self.assertEqual(result['limit'], 2)
+        self.assertTrue(0 < result['p50'] <= result['p99'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+# coding: utf-8
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock.mock import patch
+
+import ibmc_client
+from ibmc_client import constants
+from ibmc_client import exceptions
+from ibmc_client.cassette import Cassette, RecordingAdapter, ReplayAdapter
+from ibmc_client.simulator import Simulator, VirtualBMC
+from tests.benchmarks.bench_replay import DEFAULT_CASSETTE, scenario
+
+_USERNAME = VirtualBMC.DEFAULT_USERNAME
+_PASSWORD = VirtualBMC.DEFAULT_PASSWORD
+
+_REPLAY_ADDRESS = 'https://replay.invalid'
+
+
+class TestCassette(unittest.TestCase):
+    """ record and replay transport unit test stubs """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def record(self, func):
+        cassette = Cassette()
+        with Simulator() as simulator:
+            (address,) = simulator.add_fleet(1)
+            client = ibmc_client.connect(
+                address, _USERNAME, _PASSWORD, False,
+                adapter=RecordingAdapter(cassette))
+            result = func(client)
+        return cassette, result
+
+    def replay(self, cassette, **kwargs):
+        adapter = ReplayAdapter(cassette, **kwargs)
+        client = ibmc_client.connect(_REPLAY_ADDRESS, _USERNAME, _PASSWORD,
+                                     False, adapter=adapter)
+        return adapter, client
+
+    def testRecordSanitizesSecrets(self):
+        def func(client):
+            with client:
+                return client.connector.session['token']
+        cassette, token = self.record(func)
+        path = os.path.join(self.tmp_dir, 'cassette.json')
+        cassette.save(path)
+        with open(path) as fp:
+            content = fp.read()
+        self.assertNotIn(_PASSWORD, content)
+        self.assertNotIn(token, content)
+
+        (_, create_session, _, delete_session) = cassette.interactions
+        self.assertEqual(json.loads(create_session['request']['body']),
+                         {'UserName': _USERNAME,
+                          'Password': Cassette.PLACEHOLDER})
+        self.assertEqual(create_session['response']['headers']
+                         [constants.HEADER_AUTH_TOKEN], Cassette.PLACEHOLDER)
+        self.assertEqual(delete_session['request']['method'],
+                         constants.DELETE)
+
+    def testReplayGetsRecordedResults(self):
+        cassette, summaries = self.record(scenario)
+        path = os.path.join(self.tmp_dir, 'cassette.json')
+        cassette.save(path)
+
+        adapter, client = self.replay(Cassette.load(path))
+        self.assertEqual(scenario(client), summaries)
+        self.assertEqual(adapter.remaining, 0)
+
+        adapter.rewind()
+        self.assertEqual(adapter.remaining, len(cassette))
+
+    @patch('ibmc_client.cassette.time.sleep')
+    def testReplayLatency(self, sleep):
+        cassette = Cassette.load(DEFAULT_CASSETTE)
+        self.replay(cassette)
+        sleep.assert_not_called()
+
+        self.replay(cassette, latency_scale=1)
+        sleep.assert_called_once_with(
+            cassette.interactions[0]['response']['elapsed'])
+
+    def testReplayCheckedInCassette(self):
+        adapter, client = self.replay(Cassette.load(DEFAULT_CASSETTE))
+        (summary,) = scenario(client)
+        self.assertEqual(len(summary['PhysicalDisks']), 12)
+        self.assertEqual(adapter.remaining, 0)
+
+    def testReplayUnknownRequest(self):
+        _, client = self.replay(Cassette.load(DEFAULT_CASSETTE))
+        with self.assertRaises(exceptions.CassetteInteractionNotFound):
+            client.load_odata('/redfish/v1/UpdateService', dict)
+
+    def testLoadUnsupportedVersion(self):
+        path = os.path.join(self.tmp_dir, 'cassette.json')
+        with open(path, 'w') as fp:
+            json.dump({'version': 0, 'interactions': []}, fp)
+        self.assertRaises(ValueError, Cassette.load, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+# coding: utf-8
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock.mock import patch
+
+from ibmc_client import cli
+from ibmc_client import constants
+from ibmc_client.connector import Connector
+from ibmc_client.simulator import Simulator, VirtualBMC
+
+_LOGICAL_DISKS = [
+    {"raid_level": "1", "size_gb": 100, "is_root_volume": True},
+    {"raid_level": "5", "size_gb": "max"},
+]
+
+
+class TestCli(unittest.TestCase):
+    """ ibmc command unit test stubs """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.simulator = Simulator()
+        self.addCleanup(self.simulator.stop)
+        self.addresses = self.simulator.add_fleet(3)
+        self.inventory = self.write('hosts.txt', '\n'.join(
+            ['# fleet'] + self.addresses + ['']))
+        self.env = patch.dict(os.environ, {
+            cli.ENV_USERNAME: VirtualBMC.DEFAULT_USERNAME,
+            cli.ENV_PASSWORD: VirtualBMC.DEFAULT_PASSWORD})
+        self.env.start()
+        self.addCleanup(self.env.stop)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp_dir, name)
+        with io.open(path, 'w', encoding='utf-8') as fp:
+            fp.write(content if isinstance(content, type(u''))
+                     else json.dumps(content, ensure_ascii=False))
+        return path
+
+    def ibmc(self, *argv):
+        output = os.path.join(self.tmp_dir, 'output.jsonl')
+        code = cli.main(['-i', self.inventory, '-o', output, '-c', '2']
+                        + list(argv))
+        with io.open(output, encoding='utf-8') as fp:
+            records = [json.loads(line) for line in fp]
+        return code, dict((r['address'], r) for r in records)
+
+    def testLoadInventory(self):
+        path = self.write('inventory.txt', u'\n'.join([
+            u'10.1.1.1', u'  # comment', u'',
+            u'http://10.1.1.2 root', u'10.1.1.3 root secret']))
+        self.assertEqual(cli.load_inventory(path, 'admin', 'pwd'), [
+            {'address': 'https://10.1.1.1', 'username': 'admin',
+             'password': 'pwd'},
+            {'address': 'http://10.1.1.2', 'username': 'root',
+             'password': 'pwd'},
+            {'address': 'https://10.1.1.3', 'username': 'root',
+             'password': 'secret'}])
+        self.assertRaises(ValueError, cli.load_inventory, path)
+
+    def testPowerState(self):
+        code, records = self.ibmc('power-state')
+        self.assertEqual(code, 0)
+        self.assertEqual(sorted(records), sorted(self.addresses))
+        for record in records.values():
+            self.assertTrue(record['ok'])
+            self.assertEqual(record['result'], {'PowerState': 'On'})
+
+    def testRaidApplyAndSummary(self):
+        path = self.write('raid.json', {'logical_disks': _LOGICAL_DISKS})
+        code, records = self.ibmc('raid-apply', path)
+        self.assertEqual(code, 0)
+        for address in self.addresses:
+            self.assertEqual(len(self.simulator.bmc(address)
+                                 .volumes('RAIDStorage0')), 2)
+
+        code, records = self.ibmc('storage-summary')
+        self.assertEqual(code, 0)
+        for record in records.values():
+            (summary,) = record['result']
+            self.assertEqual([v['RaidLevel'] for v in summary['LogicalDisks']],
+                             ['RAID1', 'RAID5'])
+
+    def testRunStepsWithOneSession(self):
+        path = self.write('steps.json', [
+            {'command': 'raid-apply', 'logical_disks': _LOGICAL_DISKS},
+            {'command': 'raid-delete'},
+            {'command': 'boot', 'device': constants.BOOT_SOURCE_TARGET_PXE},
+            {'command': 'power', 'reset_type': constants.RESET_FORCE_RESTART},
+        ])
+        with patch.object(Connector, '_fetch_session',
+                          autospec=True,
+                          side_effect=Connector._fetch_session) as fetch:
+            code, records = self.ibmc('run', path)
+        self.assertEqual(code, 0)
+        self.assertEqual(fetch.call_count, len(self.addresses))
+        for record in records.values():
+            self.assertEqual(record['result'][2]['BootSourceOverrideTarget'],
+                             constants.BOOT_SOURCE_TARGET_PXE)
+        for address in self.addresses:
+            self.assertEqual(self.simulator.bmc(address)
+                             .volumes('RAIDStorage0'), [])
+
+    def testReportFailedServers(self):
+        with io.open(self.inventory, 'a', encoding='utf-8') as fp:
+            fp.write(u'%s admin wrong\n' % self.addresses[0])
+        path = self.write('steps.json', [
+            {'command': 'power-state'},
+            {'command': 'task-wait', 'task_id': '404'}])
+        output = os.path.join(self.tmp_dir, 'output.jsonl')
+        code = cli.main(['-i', self.inventory, '-o', output, 'run', path])
+        self.assertEqual(code, 1)
+        with io.open(output, encoding='utf-8') as fp:
+            records = [json.loads(line) for line in fp]
+        self.assertEqual(len(records), 4)
+        for record in records:
+            self.assertFalse(record['ok'])
+        self.assertEqual(sorted((r['error_type'], r['step'], r.get('command'))
+                                for r in records),
+                         [('AccessError', 0, None)]
+                         + [('ResourceNotFoundError', 1, 'task-wait')] * 3)
+
+    def testLimitRequestsInFlight(self):
+        code, records = self.ibmc('--max-inflight', '2', '--adaptive',
+                                  'power-state')
+        self.assertEqual(code, 0)
+        self.assertEqual(len(records), len(self.addresses))
+
+        args = cli.build_parser().parse_args(['-i', self.inventory,
+                                              'power-state'])
+        self.assertIsNone(args.max_inflight)
+        self.assertFalse(args.adaptive)
+        with patch('sys.stderr'):
+            with self.assertRaises(SystemExit) as c:
+                cli.main(['-i', self.inventory, '--max-inflight', '0',
+                          'power-state'])
+        self.assertEqual(c.exception.code, 2)
+
+    def testInvalidConcurrency(self):
+        for concurrency in ('0', '-1', 'many'):
+            with patch('sys.stderr'):
+                with self.assertRaises(SystemExit) as c:
+                    cli.main(['-i', self.inventory, '-c', concurrency,
+                              'power-state'])
+            self.assertEqual(c.exception.code, 2)
+
+    def testInvalidStep(self):
+        path = self.write('steps.json', [{'command': 'format-disks'}])
+        with patch('sys.stderr'):
+            with self.assertRaises(SystemExit) as c:
+                cli.main(['-i', self.inventory, 'run', path])
+        self.assertEqual(c.exception.code, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@
 from __future__ import absolute_import
 
 import json
+import threading
 import unittest
 from mock.mock import patch
 
@@ -9,7 +10,10 @@ import responses
 
 import ibmc_client
 from ibmc_client import exceptions
+from ibmc_client import utils
 from ibmc_client.constants import POST, GET, PATCH, DELETE
+from ibmc_client.simulator import Simulator, VirtualBMC
+from ibmc_client.waiter import Deadline
 from tests.unittests import BaseUnittest
 
 _BOOT_SEQUENCE_MAP = {
@@ -75,6 +79,67 @@ class TestConnect(BaseUnittest):
             with ibmc_client.connect(**self.server) as client:
                 client.system.get()
 
+    @responses.activate
+    def testRequestTimeoutTrimmedToDeadline(self):
+        self.start_mocked_http_server([
+            responses.Response(method=GET,
+                               url='%s/redfish/v1/Systems/1' % self.address,
+                               json={})
+        ])
+        with ibmc_client.connect(**self.server) as client:
+            client.connector.request(GET, '/redfish/v1/Systems/1',
+                                     deadline=Deadline(30))
+            timeout = responses.calls[3].request.req_kwargs['timeout']
+            self.assertTrue(29 < timeout <= 30)
+
+    @responses.activate
+    def testRequestWithConnectorDeadline(self):
+        self.start_mocked_http_server([])
+        with ibmc_client.connect(**self.server) as client:
+            deadline = Deadline(30)
+            deadline.cancel()
+            with client.connector.using_deadline(deadline):
+                with self.assertRaises(exceptions.OperationCancelled):
+                    client.system.get()
+            self.assertIsNone(client.connector.deadline)
+            # no request is sent
+            self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def testDeadlineIsPerThread(self):
+        self.start_mocked_http_server([])
+        with ibmc_client.connect(**self.server) as client:
+            connector = client.connector
+            first, second = Deadline(30), Deadline(30)
+            entered, overlapped = threading.Event(), threading.Event()
+            seen = []
+
+            def first_operation():
+                with connector.using_deadline(first):
+                    entered.set()
+                    overlapped.wait()
+                    seen.append(connector.deadline)
+
+            thread = threading.Thread(target=first_operation)
+            thread.start()
+            entered.wait()
+            with connector.using_deadline(second):
+                overlapped.set()
+                thread.join()
+                self.assertIs(connector.deadline, second)
+            self.assertEqual(seen, [first])
+            self.assertIsNone(connector.deadline)
+
+    @responses.activate
+    def testRequestDeadlineExceeded(self):
+        self.start_mocked_http_server([])
+        with ibmc_client.connect(**self.server) as client:
+            deadline = Deadline(0)
+            with self.assertRaises(exceptions.DeadlineExceeded):
+                client.connector.request(GET, '/redfish/v1/Systems/1',
+                                         deadline=deadline)
+            self.assertEqual(len(responses.calls), 3)
+
     @patch('ibmc_client.connector.sleep')
     @responses.activate
     def testAutoRetryFor412(self, patched_sleep):
@@ -156,5 +221,54 @@ class TestConnect(BaseUnittest):
                 self.assertEqual(resp.json(), response_json)
 
 
+class TestConcurrentConnector(unittest.TestCase):
+    """ connector shared by threads unit test stubs """
+
+    THREADS = 16
+
+    def setUp(self):
+        self.simulator = Simulator()
+        self.addCleanup(self.simulator.stop)
+        # extra sessions are rejected with 403
+        self.bmc = VirtualBMC(latency=0.02, max_sessions=2)
+        address = self.simulator.add(self.bmc)
+        self.client = ibmc_client.connect(
+            address, VirtualBMC.DEFAULT_USERNAME,
+            VirtualBMC.DEFAULT_PASSWORD, False)
+        self.client.connector.connect()
+
+    def request_concurrently(self):
+        connector = self.client.connector
+        started = threading.Event()
+
+        def get_system(_):
+            started.wait()
+            try:
+                return connector.request(GET, connector.system_base_url)
+            except exceptions.IBMCClientError as e:
+                return e
+
+        timer = threading.Timer(0.05, started.set)
+        timer.start()
+        return utils.parallel_map(get_system, range(self.THREADS),
+                                  self.THREADS)
+
+    def testSessionIsRenewedOnce(self):
+        self.bmc.expire_sessions()
+        results = self.request_concurrently()
+        self.assertEqual([resp.status_code for resp in results],
+                         [200] * self.THREADS)
+        self.assertEqual(len(self.bmc._sessions), 1)
+
+    def testFailedRenewalIsNotRepeated(self):
+        self.bmc.expire_sessions()
+        self.bmc.password = 'changed'
+        errors = self.request_concurrently()
+        for error in errors:
+            self.assertIsInstance(error, exceptions.AccessError)
+        login_failures = self.bmc.stats['unauthorized'] - self.THREADS
+        self.assertLess(login_failures, self.THREADS // 2)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -237,6 +237,17 @@ class TestChassisDrive(BaseUnittest):
                 drive.restore()
                 self.assertFalse(patched_set.called)
 
+    def testNeedRestore(self):
+        spare = Drive(self.new_mocked_response(
+            'get-drive-fm-spare-response.json'))
+        self.assertTrue(spare.need_restore)
+        self.assertEqual(spare.restore_settings,
+                         {'hotspare_type': constants.HOT_SPARE_NONE})
+        good = Drive(self.new_mocked_response(
+            'get-drive-fm-good-response.json'))
+        self.assertFalse(good.need_restore)
+        self.assertEqual(good.restore_settings, {})
+
     def _assertDrive0(self, drive0):
         self.assertEqual(drive0.drive_id, 0,
                          'drive oem id does not match')
@@ -0,0 +1,198 @@
+# coding: utf-8
+import pickle
+import threading
+import time
+import unittest
+
+from mock.mock import MagicMock
+
+import ibmc_client
+from ibmc_client import exceptions
+from ibmc_client import fleet
+from ibmc_client.api.system import storage as storage_api
+from ibmc_client.simulator import Simulator, VirtualBMC
+from ibmc_client.resources.system.storage import StorageSnapshot
+from tests.unittests.test_raid_cache import _description
+
+_LOGICAL_DISKS = [
+    {"raid_level": "1", "size_gb": 100, "volume_name": "os"},
+    {"raid_level": "5", "size_gb": 300},
+]
+
+
+def _mock_client(address, descriptions, active=None):
+    """mock a connected iBMC client whose controllers are descriptions"""
+    client = MagicMock(address=address)
+    client.system.storage.list.side_effect = lambda: [
+        StorageSnapshot.from_description(_) for _ in descriptions]
+    volume_ids = iter(range(100))
+
+    def create(**payload):
+        if active is not None:
+            active.enter()
+        client.created.append(payload)
+        return 'LogicalDrive%d' % next(volume_ids)
+
+    def wait_effect(ctrl, created=None):
+        if active is not None:
+            active.leave()
+
+    client.created = []
+    client.system.volume.create.side_effect = create
+    client.system.storage.wait_raid_task_effect.side_effect = wait_effect
+    return client
+
+
+class _Concurrency(object):
+    """count servers being configured at the same time"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def enter(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+
+    def leave(self):
+        with self.lock:
+            self.active -= 1
+
+
+class TestFleet(unittest.TestCase):
+    """ fleet operations unit test stubs """
+
+    def testProvisionMapsDrivesOfTargets(self):
+        reference = _mock_client('reference', [_description(range(10))])
+        target = _mock_client('target', [_description(
+            [9, 3, 8, 1, 0, 2, 7, 4, 6, 5], first_drive_id=100)])
+        results = fleet.provision_raid_configuration(
+            reference, [reference, target], _LOGICAL_DISKS)
+
+        self.assertEqual(results, {
+            'reference': ['LogicalDrive0', 'LogicalDrive1'],
+            'target': ['LogicalDrive0', 'LogicalDrive1']})
+        # planned once on the reference
+        self.assertEqual(reference.system.storage.list.call_count, 2)
+
+        reference_capacity = dict(
+            (d['drive_id'], d['capacity_bytes'])
+            for d in _description(range(10))['drives'])
+        target_capacity = dict(
+            (d['drive_id'], d['capacity_bytes']) for d in _description(
+                [9, 3, 8, 1, 0, 2, 7, 4, 6, 5], first_drive_id=100)['drives'])
+        for (expected, actual) in zip(reference.created, target.created):
+            self.assertEqual(
+                dict(expected, drives=None), dict(actual, drives=None))
+            self.assertEqual(
+                [reference_capacity[_] for _ in expected['drives']],
+                [target_capacity[_] for _ in actual['drives']])
+            self.assertTrue(all(_ >= 100 for _ in actual['drives']))
+
+    def testProvisionWithBoundedConcurrency(self):
+        concurrency = _Concurrency()
+        reference = _mock_client('reference', [_description(range(10))])
+        targets = [_mock_client('target%d' % idx, [_description(range(10))],
+                                concurrency) for idx in range(6)]
+        results = fleet.provision_raid_configuration(
+            reference, targets, _LOGICAL_DISKS, max_workers=3)
+        self.assertEqual(len(results), 6)
+        self.assertEqual(concurrency.peak, 3)
+
+    def testMismatchedTargetFailsAlone(self):
+        reference = _mock_client('reference', [_description(range(10))])
+        good = _mock_client('good', [_description(range(10))])
+        ssd = _mock_client('ssd', [_description(range(10),
+                                                media_type='SSD')])
+        missing = _mock_client('missing', [])
+        with self.assertRaises(exceptions.FleetOperationFailed) as c:
+            fleet.provision_raid_configuration(
+                reference, [good, ssd, missing], _LOGICAL_DISKS)
+
+        error = c.exception
+        self.assertEqual(sorted(error.failures), ['missing', 'ssd'])
+        for failure in error.failures.values():
+            self.assertIsInstance(failure, exceptions.InventoryMismatch)
+        self.assertIn('is not present', str(error.failures['missing']))
+        self.assertEqual(list(error.results), ['good'])
+        self.assertEqual(len(good.created), 2)
+        self.assertEqual(ssd.created, [])
+        self.assertIn('failed on 2 of 3 servers: missing, ssd',
+                      str(error))
+
+    def testRunOnEmptyFleet(self):
+        self.assertEqual(fleet.run_on_fleet('noop', None, []), {})
+
+    def testLimitRequestsPerAddress(self):
+        clients = [MagicMock(address=address) for address in (
+            'https://10.2.1.1', 'https://10.2.1.1', 'https://10.2.1.2')]
+        for client in clients:
+            client.connector.limiter = None
+        limited = MagicMock(address='https://10.2.1.1')
+        fleet.limit_requests(clients + [limited], max_inflight=2)
+
+        limiter = clients[0].connector.limiter
+        self.assertEqual(limiter.limit, 2)
+        self.assertIs(clients[1].connector.limiter, limiter)
+        self.assertIsNot(clients[2].connector.limiter, limiter)
+        self.assertIsNot(limited.connector.limiter, limiter)
+
+        fleet.limit_requests(clients)
+        self.assertIs(clients[0].connector.limiter, limiter)
+
+
+class TestFleetProcessPool(unittest.TestCase):
+    """ fleet RAID configuration with planning processes """
+
+    def setUp(self):
+        self.simulator = Simulator()
+        self.addCleanup(self.simulator.stop)
+        self.clients = []
+        for address in self.simulator.add_fleet(2, seed=0):
+            client = ibmc_client.connect(
+                address, VirtualBMC.DEFAULT_USERNAME,
+                VirtualBMC.DEFAULT_PASSWORD, False)
+            client.connector.connect()
+            self.clients.append(client)
+
+    def _volume_names(self, client):
+        return [volume.volume_oem_name
+                for ctrl in client.system.storage.list()
+                for volume in client.system.volume.list(ctrl.id)]
+
+    def testPlanAndErrorArePicklable(self):
+        client = self.clients[0]
+        ctrl = client.system.storage.list()[0]
+        documents = [fleet.load_storage_documents(client, ctrl)]
+        plan = pickle.loads(pickle.dumps(fleet.plan_from_documents(
+            _LOGICAL_DISKS, documents)))
+        self.assertIsInstance(plan, storage_api.RaidPlan)
+        self.assertEqual(len(plan.volumes), 2)
+
+        restored = pickle.loads(pickle.dumps(ctrl))
+        self.assertEqual(restored.id, ctrl.id)
+        self.assertIsNone(restored._ibmc_client)
+
+        error = pickle.loads(pickle.dumps(exceptions.InventoryMismatch(
+            address='bmc', reason='Controller is not present')))
+        self.assertIsInstance(error, exceptions.InventoryMismatch)
+        self.assertIn('is not present', str(error))
+
+    def testApplyInThreadsAndProcesses(self):
+        for processes in (0, 1):
+            results = fleet.apply_raid_configuration(
+                self.clients, _LOGICAL_DISKS, processes=processes)
+            self.assertEqual(sorted(results),
+                             sorted(client.address
+                                    for client in self.clients))
+            for client in self.clients:
+                self.assertEqual(len(results[client.address]), 2)
+                self.assertIn('os', self._volume_names(client))
+                client.system.storage.delete_all_raid_configuration()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# coding: utf-8
+import os
+import unittest
+
+import ibmc_client
+from ibmc_client import constants
+from ibmc_client import exceptions
+from ibmc_client.http_budget import RequestCounter, RoundTripBudget
+from ibmc_client.simulator import Simulator, VirtualBMC
+
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), 'data',
+                           'round-trip-budgets.json')
+
+REFERENCE_LAYOUT = [
+    {"raid_level": "1", "size_gb": 100, "volume_name": "os",
+     "is_root_volume": True},
+    {"raid_level": "5", "size_gb": 1000},
+    {"raid_level": "5", "size_gb": "MAX", "share_physical_disks": True},
+]
+"""logical disks of the reference layout"""
+
+
+class TestRoundTripBudget(unittest.TestCase):
+    """ HTTP round trip budget unit test stubs """
+
+    budget = RoundTripBudget.load(BUDGET_FILE)
+
+    def setUp(self):
+        self.simulator = Simulator()
+        self.addCleanup(self.simulator.stop)
+        (self.address,) = self.simulator.add_fleet(1)
+        self.client = ibmc_client.connect(
+            self.address, VirtualBMC.DEFAULT_USERNAME,
+            VirtualBMC.DEFAULT_PASSWORD, False)
+        self.client.connector.connect()
+
+    def testSystemGet(self):
+        with self.budget.check(self.client, 'system.get'):
+            self.client.system.get()
+
+    def testStorageList(self):
+        with self.budget.check(self.client, 'storage.list'):
+            self.client.system.storage.list()
+
+    def testStorageSummary(self):
+        (ctrl,) = self.client.system.storage.list()
+        with self.budget.check(self.client, 'Storage.summary'):
+            ctrl.summary()
+
+    def testCreateVolume(self):
+        with self.budget.check(self.client, 'volume.create'):
+            self.client.system.volume.create(
+                storage_id='RAIDStorage0', raid_level='RAID1', drives=[0, 1],
+                capacity_bytes=100 * 1024 ** 3)
+        with self.budget.check(self.client, 'volume.create(bootable)'):
+            self.client.system.volume.create(
+                storage_id='RAIDStorage0', raid_level='RAID1', drives=[2, 3],
+                bootable=True)
+
+    def testSetBootSource(self):
+        with self.budget.check(self.client, 'set_boot_source'):
+            self.client.system.set_boot_source(
+                constants.BOOT_SOURCE_TARGET_PXE)
+
+    def testReset(self):
+        with self.budget.check(self.client, 'reset'):
+            self.client.system.reset(constants.RESET_FORCE_RESTART)
+
+    def testApplyAndDeleteReferenceLayout(self):
+        storage_client = self.client.system.storage
+        with self.budget.check(self.client, 'apply_raid_configuration'):
+            storage_client.apply_raid_configuration(REFERENCE_LAYOUT)
+        self.assertEqual(
+            len(self.simulator.bmc(self.address).volumes('RAIDStorage0')), 3)
+        with self.budget.check(self.client,
+                               'delete_all_raid_configuration'):
+            storage_client.delete_all_raid_configuration()
+
+    def testExceedBudget(self):
+        budget = RoundTripBudget({'system.get': 0})
+        with self.assertRaises(exceptions.RoundTripBudgetExceeded) as c:
+            with budget.check(self.client, 'system.get'):
+                self.client.system.get()
+        self.assertEqual(c.exception.exchanges, ['GET /redfish/v1/Systems/1'])
+
+    def testCountRetriedExchanges(self):
+        self.simulator.bmc(self.address).expire_sessions()
+        counter = RequestCounter()
+        with counter.counting(self.client):
+            self.client.system.get()
+        self.assertEqual(counter.exchanges, [
+            'GET /redfish/v1/Systems/1',
+            'POST /redfish/v1/SessionService/Sessions',
+            'GET /redfish/v1/Systems/1'])
+        self.assertEqual(
+            self.client.connector._conn.hooks['response'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
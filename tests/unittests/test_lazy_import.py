@@ -0,0 +1,53 @@
+# coding: utf-8
+import unittest
+
+import ibmc_client
+from ibmc_client.api.system import IbmcSystemClient
+from ibmc_client.connector import Connector
+from tests.benchmarks import bench_import
+
+
+class TestLazyImport(unittest.TestCase):
+    """ lazy import unit test stubs """
+
+    def testImportDoesNotLoadHeavyModules(self):
+        _, modules = bench_import.measure(
+            'import ibmc_client; ibmc_client.connect; ibmc_client.constants')
+        self.assertIn('ibmc_client', modules)
+        self.assertEqual(bench_import.loaded_heavy_modules(modules), [])
+
+    def testSystemClientDoesNotLoadPlanner(self):
+        _, modules = bench_import.measure(
+            'import ibmc_client; ibmc_client.IbmcSystemClient(None, None)')
+        self.assertIn('ibmc_client.api.system', modules)
+        self.assertNotIn('ibmc_client.raid_utils', modules)
+        self.assertNotIn('numpy', modules)
+
+    def testLazyAttributes(self):
+        self.assertIs(ibmc_client.Connector, Connector)
+        self.assertIs(ibmc_client.IbmcSystemClient, IbmcSystemClient)
+        from ibmc_client import RaidPlanner
+        from ibmc_client.raid_planner import RaidPlanner as planner
+        self.assertIs(RaidPlanner, planner)
+        self.assertEqual(ibmc_client.fleet.run_on_fleet.__module__,
+                         'ibmc_client.fleet')
+        self.assertIn('IbmcChassisClient', dir(ibmc_client))
+        with self.assertRaises(AttributeError):
+            ibmc_client.NotExists
+
+    def testLazySystemSubClients(self):
+        from ibmc_client.api import system
+        from ibmc_client.api.system import IBMCStorageClient
+        from ibmc_client.api.system.bios import IBMCBiosClient
+        from ibmc_client.api.system.storage import IBMCStorageClient as sc
+        from ibmc_client.api.system.volume import IbmcVolumeClient
+        self.assertIs(IBMCStorageClient, sc)
+        self.assertIs(system.IBMCBiosClient, IBMCBiosClient)
+        self.assertIs(system.IbmcVolumeClient, IbmcVolumeClient)
+        self.assertIn('IBMCStorageClient', dir(system))
+        with self.assertRaises(AttributeError):
+            system.NotExists
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+# coding: utf-8
+import threading
+import time
+import unittest
+
+from mock.mock import MagicMock
+from mock.mock import patch
+
+import ibmc_client
+from ibmc_client import exceptions
+from ibmc_client import limiter as limiters
+from ibmc_client import utils
+from ibmc_client.connector import Connector
+from ibmc_client.limiter import AdaptiveConcurrencyLimiter
+from ibmc_client.limiter import ConcurrencyLimiter
+from ibmc_client.simulator import Simulator, VirtualBMC
+from ibmc_client.waiter import Deadline
+from tests.unittests import FakeClock
+
+
+class TestConcurrencyLimiter(unittest.TestCase):
+    """ concurrency limiter unit test stubs """
+
+    def testLimitConcurrentCallers(self):
+        limiter = ConcurrencyLimiter(3)
+
+        def call(_):
+            acquired_at = limiter.acquire()
+            time.sleep(0.01)
+            limiter.release(acquired_at, 0.01)
+
+        utils.parallel_map(call, range(12), 12)
+        self.assertEqual(limiter.peak_inflight, 3)
+        self.assertEqual(limiter.inflight, 0)
+
+    def testAcquireUntilDeadline(self):
+        limiter = ConcurrencyLimiter(1)
+        limiter.CANCEL_CHECK_INTERVAL_SECONDS = 0.01
+        limiter.acquire()
+        with self.assertRaises(exceptions.DeadlineExceeded):
+            limiter.acquire(Deadline(0.05), 'GET /redfish/v1')
+
+        deadline = Deadline()
+        threading.Timer(0.05, deadline.cancel).start()
+        with self.assertRaises(exceptions.OperationCancelled):
+            limiter.acquire(deadline, 'GET /redfish/v1')
+        self.assertEqual(limiter.inflight, 1)
+
+    def testInvalidLimit(self):
+        self.assertRaises(ValueError, ConcurrencyLimiter, 0)
+        self.assertRaises(ValueError, AdaptiveConcurrencyLimiter, 4, 1, 2)
+
+    def testSharedPerAddress(self):
+        limiter = limiters.for_address('https://10.1.1.1', 4)
+        self.assertIs(limiters.for_address('https://10.1.1.1', 8), limiter)
+        self.assertEqual(limiter.limit, 4)
+        other = limiters.for_address('https://10.1.1.2', adaptive=True)
+        self.assertIsInstance(other, AdaptiveConcurrencyLimiter)
+        self.assertEqual(other.max_limit, AdaptiveConcurrencyLimiter.MAX_LIMIT)
+        self.assertRaises(ValueError, limiters.for_address, 'https://10.1.1.3')
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+    """ AIMD concurrency limiter unit test stubs """
+
+    def setUp(self):
+        self.clock = FakeClock(now=1)
+        patcher = patch('ibmc_client.limiter.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.limiter = AdaptiveConcurrencyLimiter(initial_limit=4,
+                                                  max_limit=6)
+
+    def round(self, latency, failed=False):
+        """send and receive a full round of `limit` requests"""
+        acquired = [self.limiter.acquire()
+                    for _ in range(self.limiter.limit)]
+        self.clock.now += latency
+        for acquired_at in acquired:
+            self.limiter.release(acquired_at, latency, failed)
+
+    def testGrowWhileLatencyIsFlat(self):
+        for expected in (5, 6, 6):
+            self.round(0.02)
+            self.assertEqual(self.limiter.limit, expected)
+        self.assertEqual(self.limiter.backoffs, 0)
+
+    def testNotGrowWhenLimitIsNotReached(self):
+        for _ in range(20):
+            self.limiter.release(self.limiter.acquire(), 0.02)
+        self.assertEqual(self.limiter.limit, 4)
+
+    def testBackOffOncePerRoundOnFailure(self):
+        self.round(0.02, failed=True)
+        self.assertEqual(self.limiter.limit, 3)
+        self.assertEqual(self.limiter.backoffs, 1)
+
+        for expected in (2, 1, 1):
+            self.round(0.02, failed=True)
+            self.assertEqual(self.limiter.limit, expected)
+
+    def testBackOffOnLatencySpike(self):
+        self.round(0.02)
+        self.round(0.02)
+        self.assertEqual(self.limiter.limit, 6)
+        self.round(0.2)
+        self.assertEqual(self.limiter.limit, 4)
+        self.assertEqual(self.limiter.backoffs, 1)
+
+
+class TestConnectorWithLimiter(unittest.TestCase):
+    """ connector with limiter unit test stubs """
+
+    THREADS = 16
+
+    def setUp(self):
+        self.simulator = Simulator()
+        self.addCleanup(self.simulator.stop)
+        # latency grows beyond 2 requests in flight, 503 beyond 4
+        self.bmc = VirtualBMC(latency=0.01, capacity=2)
+        self.address = self.simulator.add(self.bmc)
+
+    def request_concurrently(self, limiter):
+        client = ibmc_client.connect(
+            self.address, VirtualBMC.DEFAULT_USERNAME,
+            VirtualBMC.DEFAULT_PASSWORD, False, limiter=limiter)
+        connector = client.connector
+        connector.connect()
+
+        def get_system(_):
+            for _ in range(5):
+                try:
+                    connector.request('GET', connector.system_base_url)
+                except exceptions.IBMCClientError:
+                    pass
+
+        utils.parallel_map(get_system, range(self.THREADS), self.THREADS)
+
+    def testConnectorsShareLimiterOfAddress(self):
+        clients = [ibmc_client.connect(
+            self.address, VirtualBMC.DEFAULT_USERNAME,
+            VirtualBMC.DEFAULT_PASSWORD, False, max_inflight=2)
+            for _ in range(2)]
+        limiter = clients[0].connector.limiter
+        self.assertIsInstance(limiter, ConcurrencyLimiter)
+        self.assertIs(clients[1].connector.limiter, limiter)
+        self.assertEqual(limiter.limit, 2)
+
+    def testDeadlineExpiresWhileAcquiring(self):
+        limiter = ConcurrencyLimiter(1)
+        acquire = limiter.acquire
+
+        def slow_acquire(deadline, what):
+            acquired_at = acquire(deadline, what)
+            time.sleep(0.06)
+            return acquired_at
+
+        connector = Connector(self.address, VirtualBMC.DEFAULT_USERNAME,
+                              VirtualBMC.DEFAULT_PASSWORD, False,
+                              limiter=limiter)
+        connector._conn = MagicMock()
+        prepped = MagicMock(method='GET', url=connector.base_url)
+        with patch.object(limiter, 'acquire', side_effect=slow_acquire):
+            with self.assertRaises(exceptions.DeadlineExceeded):
+                connector._send(prepped, 60, Deadline(0.05))
+        connector._conn.send.assert_not_called()
+        self.assertEqual(limiter.inflight, 0)
+
+    def testFixedLimit(self):
+        limiter = ConcurrencyLimiter(2)
+        self.request_concurrently(limiter)
+        self.assertEqual(limiter.peak_inflight, 2)
+        self.assertEqual(self.bmc.stats['overloaded'], 0)
+
+    def testAdaptiveLimitBacksOffOverloadedBMC(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+        self.request_concurrently(limiter)
+        self.assertGreater(limiter.backoffs, 0)
+        self.assertLess(self.bmc.stats['overloaded'], self.THREADS)
+        self.assertEqual(limiter.inflight, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
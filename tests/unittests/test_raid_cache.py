@@ -0,0 +1,163 @@
+# coding: utf-8
+import copy
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock.mock import patch
+
+from ibmc_client.api.system import storage
+from ibmc_client.raid_cache import RaidPlanCache
+from ibmc_client.raid_planner import RaidPlanner
+from ibmc_client.raid_trace import RecordingPlanTrace
+from tests.unittests.test_storage import ALL_RAID_LEVELS, CTRL1_ID, gb
+
+_CAPACITY_GB = (100, 200, 100, 300, 200, 100, 300, 100, 200, 100)
+
+_LOGICAL_DISKS = [
+    {"raid_level": "1", "size_gb": 100, "volume_name": "os"},
+    {"raid_level": "5", "size_gb": 300},
+    {"raid_level": "0", "size_gb": "MAX", "share_physical_disks": True},
+]
+
+
+def _description(order, first_drive_id=0, media_type='HDD'):
+    """controller whose drive `i` has capacity `_CAPACITY_GB[order[i]]`"""
+    return {
+        "id": CTRL1_ID,
+        "supported_raid_levels": ALL_RAID_LEVELS,
+        "drives": [{"id": "Disk%d" % (first_drive_id + idx),
+                    "drive_id": first_drive_id + idx,
+                    "media_type": media_type,
+                    "capacity_bytes": gb(_CAPACITY_GB[position])}
+                   for (idx, position) in enumerate(order)],
+        "volumes": [],
+    }
+
+
+def _capacities(plan, description):
+    capacities = dict((drive['drive_id'], drive['capacity_bytes'])
+                      for drive in description['drives'])
+    return [(v['raid_level'], v['span'],
+             sorted(capacities[drive_id]
+                    for drive_id in v['payload']['drives']))
+            for v in plan.volumes]
+
+
+class TestRaidPlanCache(unittest.TestCase):
+    """ RAID plan cache unit test stubs """
+
+    def testHitMapsToDrivesOfOtherServer(self):
+        cache = RaidPlanCache()
+        reference = _description(range(10))
+        target = _description([9, 3, 8, 1, 0, 2, 7, 4, 6, 5],
+                              first_drive_id=100)
+
+        expected = storage.plan_raid_configuration(
+            _LOGICAL_DISKS, [reference], cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        with patch.object(storage.LogicalDisk, 'init_disks',
+                          side_effect=AssertionError('should hit cache')):
+            plan = storage.plan_raid_configuration(
+                _LOGICAL_DISKS, [target], cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        drive_ids = set(d['drive_id'] for d in target['drives'])
+        for volume in plan.volumes:
+            self.assertTrue(set(volume['payload']['drives']) <= drive_ids)
+        self.assertEqual(_capacities(plan, target),
+                         _capacities(expected, reference))
+        self.assertEqual(
+            _capacities(plan, target),
+            _capacities(storage.plan_raid_configuration(
+                _LOGICAL_DISKS, [target]), target))
+
+    def testSameAsApplyCases(self):
+        from tests.unittests import test_apply_raid_config_cases
+        cache = RaidPlanCache()
+        for case in test_apply_raid_config_cases.apply_raid_config_cases:
+            for _ in range(2):
+                plan = storage.plan_raid_configuration(
+                    case.get('logical_disks'), case.get('controllers'),
+                    cache=cache)
+                self.assertEqual([v['payload'] for v in plan.volumes],
+                                 case.get('pending_volumes'),
+                                 case.get('name'))
+        self.assertTrue(cache.hits)
+
+    def testProfileChangesMiss(self):
+        cache = RaidPlanCache()
+        trace = RecordingPlanTrace()
+        description = _description(range(10))
+        storage.plan_raid_configuration(_LOGICAL_DISKS, [description],
+                                        cache=cache, trace=trace)
+
+        ssd = _description(range(10), media_type='SSD')
+        storage.plan_raid_configuration(_LOGICAL_DISKS, [ssd], cache=cache)
+
+        used = copy.deepcopy(description)
+        used['drives'][0]['firmware_state'] = 'Failed'
+        storage.plan_raid_configuration(_LOGICAL_DISKS, [used], cache=cache)
+
+        storage.plan_raid_configuration(_LOGICAL_DISKS[:2], [description],
+                                        cache=cache)
+        storage.plan_raid_configuration(_LOGICAL_DISKS, [description],
+                                        cache=cache, planner=RaidPlanner())
+        self.assertEqual((cache.hits, cache.misses), (0, 5))
+
+        storage.plan_raid_configuration(_LOGICAL_DISKS, [description],
+                                        cache=cache, trace=trace)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual([e['event'] for e in trace.events
+                          if e['event'].startswith('cache_')],
+                         ['cache_miss', 'cache_hit'])
+
+    def testSpecifiedDisksNotCached(self):
+        cache = RaidPlanCache()
+        storage.plan_raid_configuration(
+            [{"raid_level": "1", "size_gb": 100,
+              "physical_disks": ["Disk0", "Disk1"]}],
+            [_description(range(10))], cache=cache)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+    def testLeastRecentlyUsedEvicted(self):
+        cache = RaidPlanCache(max_size=2)
+        cache.put('a', {'volumes': []})
+        cache.put('b', {'volumes': []})
+        cache.get('a')
+        cache.put('c', {'volumes': []})
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def testSaveAndLoad(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        path = os.path.join(folder, 'raid-plans.json')
+
+        cache = RaidPlanCache()
+        reference = _description(range(10))
+        storage.plan_raid_configuration(_LOGICAL_DISKS, [reference],
+                                        cache=cache)
+        cache.save(path)
+
+        loaded = RaidPlanCache()
+        self.assertEqual(loaded.load(path), 1)
+        target = _description(range(10), first_drive_id=100)
+        plan = storage.plan_raid_configuration(_LOGICAL_DISKS, [target],
+                                               cache=loaded)
+        self.assertEqual((loaded.hits, loaded.misses), (1, 0))
+        self.assertEqual(plan.volumes[0]['payload']['drives'], [100, 102])
+
+        with open(path, 'w') as fp:
+            json.dump({'version': 0, 'entries': [['x', {}]]}, fp)
+        self.assertEqual(RaidPlanCache().load(path), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+# coding: utf-8
+import copy
+import itertools
+import unittest
+
+from mock.mock import patch
+
+from ibmc_client import exceptions
+from ibmc_client import raid_utils
+from ibmc_client.api.system.storage import LogicalDisk
+from ibmc_client.raid_planner import RaidPlanner
+from tests.unittests.test_storage import build_drive, gb, mock_ctrl, \
+    CTRL1_WITH_NON_DRIVES
+
+
+def _prepare(capacity_gb_list, logical_disks):
+    prototype = copy.deepcopy(CTRL1_WITH_NON_DRIVES)
+    prototype['drives'] = [build_drive(idx, capacity_gb)
+                           for idx, capacity_gb in enumerate(capacity_gb_list)]
+    ctrl = mock_ctrl(prototype)
+    volumes = [LogicalDisk(logical_disk) for logical_disk in logical_disks]
+    for volume in volumes:
+        volume.init_ctrl([ctrl])
+    physical_disks = [raid_utils.PhysicalDisk(drive)
+                      for drive in ctrl.drives()]
+    return volumes, physical_disks
+
+
+# greedy assignment gives both 1200G disks to the RAID1 volume, which wastes
+# nothing for itself, then there is no disk left for the RAID0 volume.
+_GREEDY_FAILS = ([1000, 1200, 1200], [
+    {'raid_level': '1', 'size_gb': 900},
+    {'raid_level': '0', 'size_gb': 1100, 'number_of_physical_disks': 1},
+])
+
+
+class TestRaidPlanner(unittest.TestCase):
+    """ RAID planner unit test stubs """
+
+    def testGreedyFails(self):
+        volumes, physical_disks = _prepare(*_GREEDY_FAILS)
+        volumes[0].init_disks(physical_disks, [])
+        self.assertEqual(volumes[0].drives, [1, 2])
+        with self.assertRaises(exceptions.InvalidLogicalDiskConfig):
+            volumes[1].init_disks(physical_disks, [])
+
+    def testPlanWhereGreedyFails(self):
+        volumes, physical_disks = _prepare(*_GREEDY_FAILS)
+        RaidPlanner().plan(volumes, physical_disks, [])
+        self.assertEqual(volumes[0].drives, [0, 1])
+        self.assertEqual(volumes[0].span_number, 1)
+        self.assertEqual(volumes[1].drives, [2])
+        self.assertEqual([disk.exclusive for disk in physical_disks],
+                         [True, True, True])
+
+    def testPlanWastesLessThanGreedy(self):
+        # greedy gives 600G+1200G to the RAID1 volume (least waste for
+        # itself among the disks it could use after first volume)
+        logical_disks = [
+            {'raid_level': '0', 'size_gb': 500, 'number_of_physical_disks': 1},
+            {'raid_level': '1', 'size_gb': 550},
+        ]
+        capacity_gb_list = [600, 600, 1200]
+
+        volumes, physical_disks = _prepare(capacity_gb_list, logical_disks)
+        for volume in volumes:
+            volume.init_disks(physical_disks, [])
+        self.assertEqual([v.drives for v in volumes], [[0], [1, 2]])
+
+        volumes, physical_disks = _prepare(capacity_gb_list, logical_disks)
+        RaidPlanner().plan(volumes, physical_disks, [])
+        self.assertEqual([v.drives for v in volumes], [[2], [0, 1]])
+
+    def testPlanKeepsGreedyWhenNotBetter(self):
+        logical_disks = [{'raid_level': '1', 'size_gb': 100},
+                         {'raid_level': '5', 'size_gb': 'MAX'}]
+        volumes, physical_disks = _prepare([100] * 6, logical_disks)
+        RaidPlanner().plan(volumes, physical_disks, [])
+        self.assertEqual([v.drives for v in volumes],
+                         [[0, 1], [2, 3, 4, 5]])
+
+    def testPlanFailsLikeGreedy(self):
+        volumes, physical_disks = _prepare([100, 100], [
+            {'raid_level': '1', 'size_gb': 100},
+            {'raid_level': '0', 'size_gb': 100},
+        ])
+        with self.assertRaises(exceptions.InvalidLogicalDiskConfig):
+            RaidPlanner().plan(volumes, physical_disks, [])
+        self.assertEqual([disk.exclusive for disk in physical_disks],
+                         [False, False])
+
+    @patch('ibmc_client.raid_planner.time')
+    def testBudgetExhaustedFallbackToGreedy(self, patched_time):
+        patched_time.time.side_effect = itertools.count(0, 10)
+        logical_disks = [
+            {'raid_level': '0', 'size_gb': 500, 'number_of_physical_disks': 1},
+            {'raid_level': '1', 'size_gb': 550},
+        ]
+        volumes, physical_disks = _prepare([600, 600, 1200], logical_disks)
+        RaidPlanner(time_budget=5).plan(volumes, physical_disks, [])
+        self.assertEqual([v.drives for v in volumes], [[0], [1, 2]])
+
+    @patch('ibmc_client.raid_planner.time')
+    def testBudgetExhaustedWhenGreedyFails(self, patched_time):
+        patched_time.time.side_effect = itertools.count(0, 10)
+        volumes, physical_disks = _prepare(*_GREEDY_FAILS)
+        with self.assertRaises(exceptions.InvalidLogicalDiskConfig):
+            RaidPlanner(time_budget=5).plan(volumes, physical_disks, [])
+
+
+class TestMatchedDisksCandidates(unittest.TestCase):
+
+    def testCandidatesRankedAsBestMatchedDisks(self):
+        from tests.benchmarks import make_disks
+        disks = make_disks(24, seed=3)
+        raid = raid_utils.RAID_SETTINGS['5']
+        candidates = raid.get_matched_disks_candidates(gb(2000), disks,
+                                                       None, 5)
+        best = raid.get_best_matched_disks(gb(2000), disks, None)
+        self.assertEqual(len(candidates), 5)
+        self.assertEqual([d.drive_id for d in candidates[0].disks],
+                         [d.drive_id for d in best.disks])
+        wastes = [c.disks_waste_bytes for c in candidates]
+        self.assertEqual(wastes, sorted(wastes))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+# coding: utf-8
+import json
+import threading
+import unittest
+
+from mock.mock import patch
+from six import StringIO
+
+from ibmc_client import exceptions
+from ibmc_client import raid_trace
+from ibmc_client import raid_utils
+from ibmc_client.api.system import storage
+from ibmc_client.raid_planner import RaidPlanner
+from ibmc_client.raid_trace import RecordingPlanTrace
+from tests.benchmarks import make_disks
+from tests.unittests.test_storage import CTRL1_WITH_16_DEFAULT_DRIVES, \
+    CTRL1_ID, gb
+
+
+class TestRaidTrace(unittest.TestCase):
+    """ RAID plan trace unit test stubs """
+
+    def testNoopByDefault(self):
+        trace = raid_trace.current()
+        self.assertIs(trace, raid_trace.NOOP_TRACE)
+        self.assertFalse(trace.enabled)
+        trace.record('anything', value=1)
+
+    def testUsingRestoresPrevious(self):
+        outer, inner = RecordingPlanTrace(), RecordingPlanTrace()
+        with raid_trace.using(outer):
+            with raid_trace.using(inner):
+                self.assertIs(raid_trace.current(), inner)
+            with raid_trace.using(None):
+                self.assertIs(raid_trace.current(), outer)
+            self.assertIs(raid_trace.current(), outer)
+        self.assertIs(raid_trace.current(), raid_trace.NOOP_TRACE)
+
+    def testActiveTraceIsPerThread(self):
+        seen = []
+        with raid_trace.using(RecordingPlanTrace()):
+            thread = threading.Thread(
+                target=lambda: seen.append(raid_trace.current()))
+            thread.start()
+            thread.join()
+        self.assertEqual(seen, [raid_trace.NOOP_TRACE])
+
+    def testMaxEvents(self):
+        trace = RecordingPlanTrace(max_events=2)
+        for idx in range(5):
+            trace.record('event', idx=idx)
+        self.assertEqual([_['idx'] for _ in trace.events], [0, 1])
+        self.assertEqual(trace.dropped, 3)
+
+    def testExport(self):
+        trace = RecordingPlanTrace()
+        trace.record('better_solution', drives=[0, 1], waste=0)
+        fp = StringIO()
+        trace.dump(fp)
+        self.assertEqual(json.loads(fp.getvalue()), trace.to_dict())
+        self.assertEqual(json.loads(trace.dumps()), {
+            'events': [{'event': 'better_solution', 'drives': [0, 1],
+                        'waste': 0}],
+            'dropped': 0})
+
+    def testSearchDisksRecordsDecisions(self):
+        trace = RecordingPlanTrace()
+        disks = make_disks(24, media_types=('HDD',))
+        raid = raid_utils.RAID_SETTINGS['5']
+        with raid_trace.using(trace):
+            solution = raid.get_best_matched_disks(gb(1000), disks, None)
+
+        self.assertEqual(trace.find('search_disks')[0]['disks'], 24)
+        self.assertTrue(trace.find('window_set'))
+        self.assertEqual(trace.find('better_solution')[-1],
+                         dict(solution.summary(), event='better_solution',
+                              raid=raid_utils.RAID5))
+        json.dumps(trace.to_dict())
+
+    def testSearchDisksLogsOneLine(self):
+        disks = make_disks(96)
+        with patch.object(raid_utils.LOG, 'info') as info:
+            raid_utils.RAID_SETTINGS['5'].get_best_matched_disks(
+                -1, disks, None)
+        self.assertEqual(info.call_count, 1)
+
+    def testSearchDiskGroupRecordsDecisions(self):
+        drives = [d.drive for d in make_disks(9, media_types=('HDD',),
+                                              capacities=(gb(100),))]
+        raid5 = raid_utils.RAID_SETTINGS['5']
+        raid6 = raid_utils.RAID_SETTINGS['6']
+        groups = [raid_utils.PhysicalDiskGroup(drives[0:3], raid5, 1),
+                  raid_utils.PhysicalDiskGroup(drives[3:6], raid6, 1),
+                  raid_utils.PhysicalDiskGroup(drives[6:9], raid5, 1)]
+        groups[2].add_used_capacity_bytes(gb(50))
+
+        trace = RecordingPlanTrace()
+        with raid_trace.using(trace), \
+                patch.object(raid_utils.LOG, 'info') as info:
+            chosen = raid5.get_best_matched_disk_group(gb(100), groups)
+        self.assertIs(chosen, groups[2])
+        self.assertEqual(info.call_count, 1)
+        self.assertEqual(len(trace.find('reject_disk_group')), 1)
+        self.assertEqual([_['better'] for _
+                          in trace.find('disk_group_candidate')],
+                         [True, True])
+        self.assertEqual(trace.find('disk_group_chosen')[0]['disk_group'],
+                         groups[2].summary())
+
+    def testPlanRecordsAssignments(self):
+        trace = RecordingPlanTrace()
+        storage.plan_raid_configuration(
+            [{"raid_level": "1", "size_gb": 100}],
+            [CTRL1_WITH_16_DEFAULT_DRIVES], trace=trace)
+        self.assertEqual(trace.find('assigned'), [{
+            'event': 'assigned', 'controller': CTRL1_ID,
+            'logical_disk': "{'raid_level': '1', 'size_gb': 100}",
+            'drives': [0, 1], 'span': 1, 'shared': False}])
+        self.assertIs(raid_trace.current(), raid_trace.NOOP_TRACE)
+
+    def testFailedPlanIsExportable(self):
+        trace = RecordingPlanTrace()
+        for planner in (None, RaidPlanner()):
+            with self.assertRaises(exceptions.InvalidLogicalDiskConfig):
+                storage.plan_raid_configuration(
+                    [{"raid_level": "1", "size_gb": 1000}],
+                    [CTRL1_WITH_16_DEFAULT_DRIVES], planner=planner,
+                    trace=trace)
+        failures = trace.find('assign_failed')
+        self.assertEqual(len(failures), 2)
+        self.assertIn('space', failures[0]['reason'])
+        self.assertEqual(trace.find('plan_search')[0]['best'], None)
+        json.loads(trace.dumps())
+
+
+if __name__ == '__main__':
+    unittest.main()
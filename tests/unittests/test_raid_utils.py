@@ -0,0 +1,242 @@
+# coding: utf-8
+import random
+import unittest
+
+from mock.mock import patch
+
+from ibmc_client import exceptions
+from ibmc_client import raid_trace
+from ibmc_client import raid_utils
+from tests.benchmarks import GB, legacy_raid, make_disks
+
+_RAID_KEYS = ('0', '1', '5', '6', '1+0', '5+0', '6+0')
+
+
+def _summary(solution):
+    if solution is None:
+        return None
+    return (solution.span, [disk.drive_id for disk in solution.disks],
+            solution.disks_waste_bytes, solution.disks_total_bytes,
+            solution.raid_total_bytes)
+
+
+class TestRaidSearch(unittest.TestCase):
+    """ RAID best matched disks search unit test stubs """
+
+    def assertSameAsLegacy(self, raid, target, disks, disk_count):
+        try:
+            expected = _summary(legacy_raid.get_best_matched_disks(
+                raid, target, disks, disk_count))
+        except exceptions.InvalidPhysicalDiskNumber:
+            with self.assertRaises(exceptions.InvalidPhysicalDiskNumber):
+                raid.get_best_matched_disks(target, disks, disk_count)
+            return
+
+        actual = _summary(raid.get_best_matched_disks(target, disks,
+                                                      disk_count))
+        self.assertEqual(actual, expected,
+                         'raid %s, target %s, disk count %s, disks %s' % (
+                             raid.key, target, disk_count,
+                             [(d.media_type, d.capacity_bytes)
+                              for d in disks]))
+
+    def testSameAsLegacySearch(self):
+        targets = (-1, 1, 300 * GB, 1000 * GB, 2500 * GB, 9000 * GB,
+                   30000 * GB)
+        for seed in range(30):
+            disks = make_disks(seed % 20 + 1, seed=seed)
+            for key in _RAID_KEYS:
+                raid = raid_utils.RAID_SETTINGS[key]
+                for target in targets:
+                    for disk_count in (None, 2, 3, 4, 6, 8):
+                        self.assertSameAsLegacy(raid, target, disks,
+                                                disk_count)
+
+    def testSameAsLegacySearchWithEqualCapacities(self):
+        # many windows tie, the first one should win in both searches
+        disks = make_disks(16, capacities=(600 * GB, 1200 * GB),
+                           media_types=('HDD',))
+        for key in _RAID_KEYS:
+            raid = raid_utils.RAID_SETTINGS[key]
+            for target in (-1, 600 * GB, 1500 * GB):
+                self.assertSameAsLegacy(raid, target, disks, None)
+
+    def testGetBestMatchedDisksWasteLeast(self):
+        disks = make_disks(6, capacities=(600 * GB,), media_types=('HDD',))
+        disks[4].capacity_bytes = 1200 * GB
+        raid = raid_utils.RAID_SETTINGS['5']
+        solution = raid.get_best_matched_disks(1000 * GB, disks, None)
+        self.assertEqual(solution.span, 1)
+        self.assertEqual([d.drive_id for d in solution.disks], [0, 1, 2])
+        self.assertEqual(solution.disks_waste_bytes, 0)
+
+    def testGetBestMatchedDisksIllegalDiskCount(self):
+        raid = raid_utils.RAID_SETTINGS['1']
+        with self.assertRaises(exceptions.InvalidPhysicalDiskNumber):
+            raid.get_best_matched_disks(100 * GB, make_disks(4), 3)
+
+
+@unittest.skipIf(raid_utils.numpy is None, 'NumPy is not installed')
+class TestRaidSearchWithNumpy(TestRaidSearch):
+    """ RAID best matched disks search with NumPy scoring unit test stubs """
+
+    def setUp(self):
+        patcher = patch.object(raid_utils.Raid, 'SCORING_BACKEND',
+                               raid_utils.SCORING_BACKEND_NUMPY)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def testAutoBackendUseNumpyForManyWindows(self):
+        raid = raid_utils.RAID_SETTINGS['5']
+        disks = make_disks(raid_utils.Raid.NUMPY_MIN_WINDOWS + 2,
+                           media_types=('HDD',))
+        with patch.object(raid_utils.Raid, 'SCORING_BACKEND',
+                          raid_utils.SCORING_BACKEND_AUTO), \
+                patch.object(raid_utils.Raid, '_get_best_window_vectorized',
+                             wraps=raid._get_best_window_vectorized) as p:
+            raid.get_best_matched_disks(-1, disks, 3)
+            self.assertTrue(p.called)
+            p.reset_mock()
+            raid.get_best_matched_disks(-1, disks[:8], 3)
+            self.assertFalse(p.called)
+
+
+class TestRaidSearchScoringBackend(unittest.TestCase):
+
+    @patch.object(raid_utils, 'numpy', None)
+    @patch.object(raid_utils.Raid, 'SCORING_BACKEND',
+                  raid_utils.SCORING_BACKEND_NUMPY)
+    def testNumpyBackendRequiresNumpy(self):
+        raid = raid_utils.RAID_SETTINGS['5']
+        with self.assertRaises(ImportError):
+            raid.get_best_matched_disks(-1, make_disks(4), None)
+
+    @patch.object(raid_utils, 'numpy', None)
+    def testAutoBackendWithoutNumpy(self):
+        raid = raid_utils.RAID_SETTINGS['5']
+        disks = make_disks(raid_utils.Raid.NUMPY_MIN_WINDOWS * 2)
+        solution = raid.get_best_matched_disks(-1, disks, 3)
+        self.assertEqual(solution.disks_count, 3)
+
+
+class TestPhysicalDiskGroupIndex(unittest.TestCase):
+    """ physical disk group capacity accounting and index unit test stubs """
+
+    @staticmethod
+    def _make_groups(rand, count):
+        groups = []
+        for idx in range(count):
+            raid = raid_utils.RAID_SETTINGS[rand.choice(('1', '5', '6'))]
+            drives = [disk.drive for disk in make_disks(
+                raid.min_disks, seed=idx, media_types=('HDD',),
+                capacities=(100 * GB, 200 * GB))]
+            group = raid_utils.PhysicalDiskGroup(drives, raid, 1)
+            group.add_used_capacity_bytes(
+                rand.choice((0, 10, 50, 100)) * GB)
+            groups.append(group)
+        return groups
+
+    def assertSameAsScan(self, indexed, targets):
+        for key in ('1', '5', '6'):
+            raid = raid_utils.RAID_SETTINGS[key]
+            for target in targets:
+                expected = raid._scan_disk_groups(target, list(indexed),
+                                                  raid_trace.NOOP_TRACE)
+                actual = raid.get_best_matched_disk_group(target, indexed)
+                self.assertIs(actual, expected,
+                              'raid %s target %s' % (key, target))
+
+    def testRunningTotals(self):
+        drives = [disk.drive for disk in make_disks(
+            3, media_types=('HDD',), capacities=(100 * GB,))]
+        group = raid_utils.PhysicalDiskGroup(
+            drives, raid_utils.RAID_SETTINGS['5'], 1)
+        group.add_used_capacity_bytes(50 * GB)
+        group.add_pending_capacity_bytes(30 * GB)
+        self.assertEqual(group.used_capacity_bytes, 50 * GB)
+        self.assertEqual(group.pending_capacity_bytes, 30 * GB)
+        self.assertEqual(group.left_capacity_bytes, 120 * GB)
+
+        state = group.save_state()
+        group.add_pending_capacity_bytes(-1)
+        self.assertEqual(group.pending_capacity_bytes_list,
+                         [30 * GB, 120 * GB])
+        self.assertEqual(group.left_capacity_bytes, 0)
+        # no capacity left, nothing is added
+        group.add_pending_capacity_bytes(-1)
+        self.assertEqual(group.pending_capacity_bytes, 150 * GB)
+
+        group.restore_state(state)
+        self.assertEqual(group.pending_capacity_bytes_list, [30 * GB])
+        self.assertEqual(group.left_capacity_bytes, 120 * GB)
+
+    def testSameAsScan(self):
+        rand = random.Random(0)
+        targets = (-1, 0, 1, 10 * GB, 50 * GB, 100 * GB, 150 * GB, 190 * GB,
+                   200 * GB, 400 * GB)
+        groups = self._make_groups(rand, 40)
+        indexed = raid_utils.PhysicalDiskGroupList(groups[:20])
+        for group in groups[20:]:
+            indexed.append(group)
+        self.assertSameAsScan(indexed, targets)
+
+        # index follows left capacity changes
+        for _ in range(60):
+            rand.choice(indexed).add_pending_capacity_bytes(
+                rand.choice((-1, 10 * GB, 40 * GB)))
+            self.assertSameAsScan(indexed, targets)
+
+    def testRestoreAndReassign(self):
+        rand = random.Random(1)
+        targets = (-1, 10 * GB, 100 * GB)
+        groups = self._make_groups(rand, 12)
+        indexed = raid_utils.PhysicalDiskGroupList(groups)
+        states = [(group, group.save_state()) for group in groups]
+
+        indexed.append(self._make_groups(rand, 1)[0])
+        for group in groups:
+            group.add_pending_capacity_bytes(-1)
+        self.assertSameAsScan(indexed, targets)
+
+        indexed[:] = [group for (group, _) in states]
+        for (group, state) in states:
+            group.restore_state(state)
+        self.assertEqual(len(indexed), 12)
+        self.assertSameAsScan(indexed, targets)
+
+        removed = indexed.pop(0)
+        removed.add_used_capacity_bytes(10 * GB)
+        self.assertNotIn(removed, indexed)
+        self.assertSameAsScan(indexed, targets)
+
+    def testGroupsIndexedByManyLists(self):
+        rand = random.Random(3)
+        targets = (-1, 10 * GB, 100 * GB)
+        groups = self._make_groups(rand, 12)
+        indexed = raid_utils.PhysicalDiskGroupList(groups)
+        subset = raid_utils.PhysicalDiskGroupList(groups[::2])
+        for group in groups:
+            group.add_pending_capacity_bytes(rand.choice((-1, 40 * GB)))
+            self.assertSameAsScan(indexed, targets)
+            self.assertSameAsScan(subset, targets)
+
+        subset.pop(0)
+        self.assertEqual(len(groups[0]._indexed_by), 1)
+        self.assertEqual(len(groups[2]._indexed_by), 2)
+
+    def testTraceScansEveryGroup(self):
+        rand = random.Random(2)
+        indexed = raid_utils.PhysicalDiskGroupList(
+            self._make_groups(rand, 6))
+        trace = raid_trace.RecordingPlanTrace()
+        raid = raid_utils.RAID_SETTINGS['5']
+        expected = raid.get_best_matched_disk_group(10 * GB, indexed)
+        with raid_trace.using(trace):
+            actual = raid.get_best_matched_disk_group(10 * GB, indexed)
+        self.assertIs(actual, expected)
+        self.assertEqual(len(trace.find('reject_disk_group'))
+                         + len(trace.find('disk_group_candidate')), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,279 @@
+# coding: utf-8
+import copy
+import json
+import threading
+import unittest
+
+from mock.mock import patch
+
+import ibmc_client
+from ibmc_client import constants
+from ibmc_client import exceptions
+from ibmc_client import fleet
+from ibmc_client.simulator import Simulator, VirtualBMC, SYSTEM, STORAGES
+from ibmc_client.simulator import default_storages
+from ibmc_client.waiter import Deadline
+from tests.unittests import FakeClock
+
+_USERNAME = VirtualBMC.DEFAULT_USERNAME
+_PASSWORD = VirtualBMC.DEFAULT_PASSWORD
+
+_LOGICAL_DISKS = [
+    {"raid_level": "1", "size_gb": 100, "is_root_volume": True},
+    {"raid_level": "5", "size_gb": "max"},
+    {"raid_level": "1", "size_gb": 200, "share_physical_disks": True},
+]
+
+
+class TestVirtualBMC(unittest.TestCase):
+    """ virtual BMC unit test stubs """
+
+    def setUp(self):
+        self.clock = FakeClock(now=1000)
+        self.bmc = VirtualBMC(clock=self.clock.time, task_seconds=10)
+        status, headers, _ = self.bmc.handle(
+            constants.POST, '/redfish/v1/SessionService/Sessions',
+            body=json.dumps({'UserName': _USERNAME,
+                             'Password': _PASSWORD}).encode('utf-8'))
+        self.assertEqual(status, 201)
+        self.headers = {constants.HEADER_AUTH_TOKEN:
+                        headers[constants.HEADER_AUTH_TOKEN]}
+
+    def request(self, method, path, payload=None, headers=None):
+        headers = dict(self.headers, **(headers or {}))
+        body = json.dumps(payload).encode('utf-8') if payload else None
+        status, headers, content = self.bmc.handle(method, path, headers,
+                                                   body)
+        return status, headers, json.loads(content) if content else None
+
+    def testRequiresSession(self):
+        status, _, body = self.request(constants.GET, SYSTEM,
+                                       headers={'X-Auth-Token': 'invalid'})
+        self.assertEqual(status, 401)
+        self.assertEqual(body['error']['@Message.ExtendedInfo'][0]
+                         ['MessageId'], 'iBMC.1.0.NoValidSession')
+
+    def testSessionExpires(self):
+        self.clock.now += VirtualBMC.DEFAULT_SESSION_TIMEOUT_SECONDS + 1
+        self.assertEqual(self.request(constants.GET, SYSTEM)[0], 401)
+
+    def testSessionLimit(self):
+        self.bmc.max_sessions = 1
+        status, _, _ = self.bmc.handle(
+            constants.POST, '/redfish/v1/SessionService/Sessions',
+            body=json.dumps({'UserName': _USERNAME,
+                             'Password': _PASSWORD}).encode('utf-8'))
+        self.assertEqual(status, 403)
+
+    def testPatchRequiresMatchedEtag(self):
+        _, headers, _ = self.request(constants.GET, SYSTEM)
+        etag = headers[constants.HEADER_ETAG]
+        payload = {'Boot': {'BootSourceOverrideTarget': 'Pxe'}}
+        self.assertEqual(self.request(constants.PATCH, SYSTEM, payload)[0],
+                         428)
+        status, headers, body = self.request(
+            constants.PATCH, SYSTEM, payload, {'If-Match': etag})
+        self.assertEqual(status, 200)
+        self.assertEqual(body['Boot']['BootSourceOverrideTarget'], 'Pxe')
+        self.assertNotEqual(headers[constants.HEADER_ETAG], etag)
+        self.assertEqual(self.request(constants.PATCH, SYSTEM, payload,
+                                      {'If-Match': etag})[0], 412)
+
+    def testTaskTakesDurationAndBlocksStorageReady(self):
+        path = STORAGES + '/RAIDStorage0/Volumes'
+        status, _, task = self.request(constants.POST, path, {
+            'Oem': {'Huawei': {'VolumeRaidLevel': 'RAID1',
+                               'Drives': [0, 1]}}})
+        self.assertEqual(status, 202)
+        self.assertEqual(task['TaskState'], 'Running')
+        self.assertFalse(self.bmc.storage_ready)
+        _, _, system = self.request(
+            constants.GET, SYSTEM + '?$select=Oem/Huawei/StorageConfigReady')
+        self.assertEqual(system, {'@odata.id': SYSTEM, 'Oem': {
+            'Huawei': {'StorageConfigReady': 0}}})
+
+        self.clock.now += 5
+        _, _, task = self.request(constants.GET, task['@odata.id'])
+        self.assertEqual(task['Oem']['Huawei']['TaskPercentage'], '50%')
+        self.assertEqual(self.request(constants.GET, path)[2]
+                         ['Members@odata.count'], 0)
+
+        self.clock.now += 5
+        _, _, task = self.request(constants.GET, task['@odata.id'])
+        self.assertEqual(task['TaskState'], 'Completed')
+        self.assertEqual(task['Messages']['MessageArgs'],
+                         [path + '/LogicalDrive0'])
+        self.assertTrue(self.bmc.storage_ready)
+        (volume,) = self.bmc.volumes('RAIDStorage0')
+        self.assertEqual(volume['CapacityBytes'], 1199638052864)
+
+    def testCreateVolumeOnBusyDrivesFails(self):
+        path = STORAGES + '/RAIDStorage0/Volumes'
+        payload = {'Oem': {'Huawei': {'VolumeRaidLevel': 'RAID1',
+                                      'Drives': [0, 1]}}}
+        self.assertEqual(self.request(constants.POST, path, payload)[0], 202)
+        self.assertEqual(self.request(constants.POST, path, payload)[0], 400)
+
+    def testCreateVolumeOnExistsArrayByMemberDrive(self):
+        path = STORAGES + '/RAIDStorage0/Volumes'
+        self.request(constants.POST, path, {
+            'CapacityBytes': 100 * 1024 ** 3,
+            'Oem': {'Huawei': {'VolumeRaidLevel': 'RAID1',
+                               'Drives': [0, 1]}}})
+        self.clock.now += 10
+        status, _, _ = self.request(constants.POST, path, {
+            'Oem': {'Huawei': {'Drives': [1]}}})
+        self.assertEqual(status, 202)
+        self.clock.now += 10
+        self.request(constants.GET, path)
+        (_, volume) = self.bmc.volumes('RAIDStorage0')
+        self.assertEqual(volume['Oem']['Huawei']['VolumeRaidLevel'], 'RAID1')
+        self.assertEqual(len(volume['Links']['Drives']), 2)
+        self.assertEqual(volume['CapacityBytes'],
+                         1199638052864 - 100 * 1024 ** 3)
+
+    def testInjectErrors(self):
+        self.bmc.error_rate = 1
+        status, _, body = self.request(constants.GET, SYSTEM)
+        self.assertEqual(status, 503)
+        self.assertEqual(self.bmc.stats['injected_errors'], 1)
+
+    @patch('ibmc_client.simulator.time.sleep')
+    def testInjectLatency(self, sleep):
+        self.bmc.latency = 0.5
+        self.bmc.latency_jitter = 0.1
+        self.request(constants.GET, SYSTEM)
+        delay = sleep.call_args[0][0]
+        self.assertTrue(0.5 <= delay <= 0.6)
+
+    @patch('ibmc_client.simulator.time.sleep')
+    def testOverloadBeyondCapacity(self, sleep):
+        self.bmc.latency = 0.1
+        self.bmc.capacity = 2
+        # requests in flight of other clients
+        self.bmc._inflight = 2
+        status, _, _ = self.request(constants.GET, SYSTEM)
+        self.assertEqual(status, 200)
+        self.assertAlmostEqual(sleep.call_args[0][0], 0.1 * 1.5 ** 2)
+
+        self.bmc._inflight = 4
+        status, _, _ = self.request(constants.GET, SYSTEM)
+        self.assertEqual(status, 503)
+        self.assertEqual(self.bmc.stats['overloaded'], 1)
+        self.assertEqual(self.bmc._inflight, 4)
+
+
+class TestSimulator(unittest.TestCase):
+    """ simulator unit test stubs """
+
+    def setUp(self):
+        self.simulator = Simulator()
+        self.addCleanup(self.simulator.stop)
+
+    def connect(self, address):
+        client = ibmc_client.connect(address, _USERNAME, _PASSWORD, False)
+        client.connector.connect()
+        self.addCleanup(client.connector.disconnect)
+        return client
+
+    def testDeadlineAppliedInControllerWorkers(self):
+        storages = default_storages()
+        second = copy.deepcopy(storages[0])
+        second.update(id='RAIDStorage1', name='RAIDStorage1',
+                      controller_name='RAID Card2 Controller')
+        for drive in second['drives']:
+            drive['drive_id'] += 12
+            drive['id'] = 'HDDPlaneDisk%d' % drive['drive_id']
+        client = self.connect(self.simulator.add(
+            VirtualBMC(storages=storages + [second])))
+        connector = client.connector
+        request = connector.request
+        seen = []
+
+        def recording_request(*args, **kwargs):
+            seen.append((threading.current_thread().name,
+                         connector.deadline))
+            return request(*args, **kwargs)
+
+        deadline = Deadline(600)
+        storage_client = client.system.storage
+        with patch.object(connector, 'request',
+                          side_effect=recording_request):
+            storage_client.apply_raid_configuration([
+                {'raid_level': '1', 'size_gb': 100,
+                 'controller': 'RAIDStorage0'},
+                {'raid_level': '1', 'size_gb': 100,
+                 'controller': 'RAIDStorage1'},
+            ], deadline=deadline)
+            storage_client.delete_all_raid_configuration(deadline=deadline)
+
+        self.assertGreater(len(set(name for (name, _) in seen)), 1)
+        for (_, applied) in seen:
+            self.assertIs(applied, deadline)
+        self.assertIsNone(connector.deadline)
+
+    def testApplyAndDeleteRaidConfiguration(self):
+        (address,) = self.simulator.add_fleet(1)
+        client = self.connect(address)
+        storage_client = client.system.storage
+        storage_client.apply_raid_configuration(_LOGICAL_DISKS)
+
+        (ctrl,) = storage_client.list()
+        volumes = ctrl.summary()['LogicalDisks']
+        self.assertEqual([v['RaidLevel'] for v in volumes],
+                         ['RAID1', 'RAID1', 'RAID5'])
+        self.assertTrue(volumes[0]['Bootable'])
+
+        storage_client.delete_all_raid_configuration()
+        self.assertEqual(self.simulator.bmc(address).volumes('RAIDStorage0'),
+                         [])
+        self.assertTrue(all(drive.is_unconfig_good()
+                            for drive in storage_client.list()[0].drives()))
+
+    def testWaitTasksWithDuration(self):
+        clock = FakeClock(now=1000)
+        (address,) = self.simulator.add_fleet(1, clock=clock.time,
+                                              task_seconds=30, ready_delay=5)
+        client = self.connect(address)
+        with patch('ibmc_client.waiter.time', clock):
+            client.system.storage.apply_raid_configuration(_LOGICAL_DISKS[:2])
+        self.assertEqual(len(self.simulator.bmc(address)
+                             .volumes('RAIDStorage0')), 2)
+        self.assertTrue(clock.now >= 1060)
+
+    @patch('ibmc_client.connector.sleep')
+    def testRecoverFromExpiredSessionAndConflict(self, sleep):
+        (address,) = self.simulator.add_fleet(1)
+        bmc = self.simulator.bmc(address)
+        client = self.connect(address)
+
+        bmc.expire_sessions()
+        self.assertEqual(client.system.get().power_state, 'On')
+        self.assertEqual(bmc.stats['unauthorized'], 1)
+
+        bmc.conflict_rate = 1
+        with self.assertRaises(exceptions.IBMCHttpRequestError) as c:
+            client.system.set_boot_source(constants.BOOT_SOURCE_TARGET_PXE)
+        self.assertEqual(c.exception.status_code, 412)
+        self.assertEqual(bmc.stats['conflicts'], 2)
+        sleep.assert_called_once_with(10)
+
+        bmc.conflict_rate = 0
+        client.system.set_boot_source(constants.BOOT_SOURCE_TARGET_PXE)
+        self.assertEqual(client.system.get().boot_source_override.target,
+                         constants.BOOT_SOURCE_TARGET_PXE)
+
+    def testServeFleet(self):
+        addresses = self.simulator.add_fleet(8, seed=1)
+        self.assertEqual(len(set(addresses)), 8)
+        clients = [self.connect(address) for address in addresses]
+        created = fleet.provision_raid_configuration(
+            clients[0], clients, _LOGICAL_DISKS[:2])
+        self.assertEqual(sorted(created), sorted(addresses))
+        for address in addresses:
+            self.assertEqual(len(self.simulator.bmc(address)
+                                 .volumes('RAIDStorage0')), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,12 +2,14 @@
 import copy
 import json
 import logging
+import threading
+import time
 import unittest
 import uuid
 from random import shuffle
 
 import responses
-from mock.mock import patch, Mock, call
+from mock.mock import patch, Mock, MagicMock, call
 from requests import Response
 
 import ibmc_client
@@ -20,8 +22,11 @@ from ibmc_client.constants import GET, PATCH, HEADER_IF_MATCH, \
 from ibmc_client.exceptions import ControllerHintRequired, \
     NoControllerMatchesHint
 from ibmc_client.resources.chassis.drive import Drive
-from ibmc_client.resources.system.storage import Storage, Volume
-from tests.unittests import BaseUnittest
+from ibmc_client.resources.system.storage import Storage, \
+    StorageSnapshot, Volume
+from ibmc_client.raid_planner import RaidPlanner
+from ibmc_client.waiter import Deadline, Waiter
+from tests.unittests import BaseUnittest, FakeClock
 
 LOG = logging.getLogger(__name__)
 CTRL1_ID = "RAID Card1 Controller"
@@ -166,7 +171,7 @@ class TestStorageClient(BaseUnittest):
         with ibmc_client.connect(**self.server) as client:
             client.system.storage.waiting_storage_ready()
 
-    @patch('ibmc_client.api.system.storage.time')
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
     @responses.activate
     def testWaitingStorageReadyWorkflow(self, patched_time):
         not_ready_responses = [responses.Response(
@@ -187,7 +192,7 @@ class TestStorageClient(BaseUnittest):
             client.system.storage.waiting_storage_ready()
             self.assertEqual(patched_time.sleep.call_count, 10)
 
-    @patch('ibmc_client.api.system.storage.time')
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
     @responses.activate
     def testWaitingStorageReadyWhenNotSupported(self, patched_time):
         self.start_mocked_http_server([
@@ -202,6 +207,112 @@ class TestStorageClient(BaseUnittest):
             client.system.storage.waiting_storage_ready()
             self.assertEqual(patched_time.sleep.call_count, 0)
 
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
+    @responses.activate
+    def testWaitingStorageReadyTimeout(self, patched_time):
+        self.start_mocked_http_server([responses.Response(
+            method=GET,
+            url='https://server1.ibmc.com/redfish/v1/Systems/1',
+            json=self.load_json_file(
+                'get-system-with-storage-not-ready.json')
+        )] * 5)
+        with ibmc_client.connect(**self.server) as client:
+            waiter = Waiter(10, 1, max_interval=4, backoff=2)
+            with self.assertRaises(exceptions.WaitTimeout):
+                client.system.storage.waiting_storage_ready(waiter)
+            # checked at 0, 1, 3, 7 and 10
+            self.assertEqual(patched_time.sleep.call_count, 4)
+
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
+    @responses.activate
+    def testApplyRaidConfigurationDeadlineExceeded(self, patched_time):
+        self.start_mocked_http_server([responses.Response(
+            method=GET,
+            url='https://server1.ibmc.com/redfish/v1/Systems/1',
+            json=self.load_json_file(
+                'get-system-with-storage-not-ready.json')
+        )] * 5)
+        with ibmc_client.connect(**self.server) as client:
+            deadline = Deadline(5)
+            with self.assertRaises(exceptions.DeadlineExceeded):
+                client.system.storage.apply_raid_configuration(
+                    [{'size_gb': 100, 'raid_level': '1'}], deadline=deadline)
+            # storage ready waiter is bounded by deadline instead of timeout
+            self.assertEqual(patched_time.now, 5)
+            self.assertIsNone(client.connector.deadline)
+
+    def _mock_select_storage_ready_response(self, payload):
+        return responses.Response(
+            method=GET,
+            url=('https://server1.ibmc.com/redfish/v1/Systems/1'
+                 '?$select=Oem/Huawei/StorageConfigReady'),
+            json=payload)
+
+    def _start_mocked_http_server_with_select(self, test_api_responses):
+        root = self.load_json_file('redfish.json')
+        root['ProtocolFeaturesSupported'] = {'SelectQuery': True}
+        responses.add(responses.Response(
+            method=GET, url=self.address + '/redfish/v1', json=root))
+        self.start_mocked_http_server(test_api_responses)
+
+    @responses.activate
+    def testSupportSelectQuery(self):
+        self._start_mocked_http_server_with_select([])
+        with ibmc_client.connect(**self.server) as client:
+            self.assertTrue(client.connector.support_select_query)
+
+    @responses.activate
+    def testNotSupportSelectQuery(self):
+        self.start_mocked_http_server([])
+        with ibmc_client.connect(**self.server) as client:
+            self.assertFalse(client.connector.support_select_query)
+
+    @responses.activate
+    def testIsStorageReadyWithSelectQuery(self):
+        self._start_mocked_http_server_with_select([
+            self._mock_select_storage_ready_response(
+                {'Oem': {'Huawei': {'StorageConfigReady': 0}}}),
+            self._mock_select_storage_ready_response(
+                {'Oem': {'Huawei': {'StorageConfigReady': 1}}}),
+        ])
+        with ibmc_client.connect(**self.server) as client:
+            self.assertFalse(client.system.storage.is_storage_ready())
+            self.assertTrue(client.system.storage.is_storage_ready())
+            req = self.get_test_api_request(2)
+            self.assertEqual(
+                req.url, 'https://server1.ibmc.com/redfish/v1/Systems/1'
+                         '?$select=Oem/Huawei/StorageConfigReady')
+
+    @responses.activate
+    def testIsStorageReadyWithSelectQueryWhenNotSupported(self):
+        # no Oem returned means StorageConfigReady is not supported
+        self._start_mocked_http_server_with_select([
+            self._mock_select_storage_ready_response(
+                {'@odata.id': '/redfish/v1/Systems/1'}),
+        ])
+        with ibmc_client.connect(**self.server) as client:
+            self.assertTrue(client.system.storage.is_storage_ready())
+
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
+    def testWaitingStorageReadyForAll(self, patched_time):
+        clients = []
+        ready_list = ([False, True], [True], [False, False, True])
+        for idx, ready in enumerate(ready_list):
+            client = MagicMock()
+            client.connector.address = 'https://server%d.ibmc.com' % idx
+            client.is_storage_ready.side_effect = ready
+            client.storage_ready_waiter = Waiter(100, 1)
+            clients.append(client)
+
+        storage.waiting_storage_ready_for_all(clients)
+        self.assertEqual([c.is_storage_ready.call_count for c in clients],
+                         [2, 1, 3])
+        # all servers are polled from the same thread, one schedule
+        self.assertEqual(patched_time.now, 2)
+
+    def testWaitingStorageReadyForNone(self):
+        storage.waiting_storage_ready_for_all([])
+
     def testStorageHintMatches(self):
         resp = self.new_mocked_response('get-raid-storage-0.json')
         controller = Storage(resp)
@@ -686,8 +797,7 @@ class TestStorageClient(BaseUnittest):
                 controller.set()
 
     @responses.activate
-    @patch('ibmc_client.resources.system.storage.sleep', return_value=None)
-    def testDeleteVolumeCollection(self, patched_sleep):
+    def testDeleteVolumeCollection(self):
         storage_id = 'RAIDStorage0'
         self.start_mocked_http_server([
             responses.Response(
@@ -713,19 +823,129 @@ class TestStorageClient(BaseUnittest):
             task = Mock()
             task.raise_if_failed.return_value = None
             with patch.object(client.system.volume, 'delete_by_odata_id',
-                              return_value=task) as delete_volume:
+                              return_value=task) as delete_volume, \
+                    patch.object(client.system.storage,
+                                 'wait_raid_task_effect') as wait_effect:
                 storage = client.system.storage.get('RAIDStorage0')
                 storage.delete_volume_collection()
-                delete_volume.assert_has_calls([
-                    call('/redfish/v1/Systems/1/Storages/RAIDStorage0/Volumes'
-                         '/LogicalDrive0'),
-                    call('/redfish/v1/Systems/1/Storages/RAIDStorage0/Volumes'
-                         '/LogicalDrive1')
-                ])
+                deleted = [
+                    '/redfish/v1/Systems/1/Storages/RAIDStorage0/Volumes'
+                    '/LogicalDrive0',
+                    '/redfish/v1/Systems/1/Storages/RAIDStorage0/Volumes'
+                    '/LogicalDrive1'
+                ]
+                delete_volume.assert_has_calls([call(_) for _ in deleted])
 
                 self.assertEqual(task.raise_if_failed.call_count, 2)
+                wait_effect.assert_called_once_with(storage, deleted=deleted)
+
+    def _mock_volume_collection_response(self, storage_id, volume_ids):
+        collection = self.load_json_file('get-volume-collection.json')
+        collection['Members'] = [
+            {'@odata.id': '/redfish/v1/Systems/1/Storages/%s/Volumes/%s'
+                          % (storage_id, volume_id)}
+            for volume_id in volume_ids]
+        collection['Members@odata.count'] = len(volume_ids)
+        return responses.Response(
+            method=GET,
+            url=('https://server1.ibmc.com/redfish/v1/Systems/1/Storages'
+                 '/%s/Volumes' % storage_id),
+            json=collection)
+
+    @responses.activate
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
+    def testWaitDeletionTakeEffect(self, patched_time):
+        storage_id = 'RAIDStorage0'
+        system_ready = responses.Response(
+            method=GET, url='https://server1.ibmc.com/redfish/v1/Systems/1',
+            json=self.load_json_file('get-system-with-storage-ready.json'))
+        system_not_ready = responses.Response(
+            method=GET, url='https://server1.ibmc.com/redfish/v1/Systems/1',
+            json=self.load_json_file('get-system-with-storage-not-ready.json'))
+        self.start_mocked_http_server([
+            responses.Response(
+                method=GET,
+                url=('https://server1.ibmc.com/redfish/v1/Systems/1'
+                     '/Storages/%s' % storage_id),
+                json=self.load_json_file('get-raid-storage-0.json')
+            ),
+            self._mock_volume_collection_response(
+                storage_id, ['LogicalDrive1']),
+            self._mock_volume_collection_response(storage_id, []),
+            system_not_ready,
+            self._mock_volume_collection_response(storage_id, []),
+            system_ready,
+        ])
+        with ibmc_client.connect(**self.server) as client:
+            storage = client.system.storage.get(storage_id)
+            client.system.storage.wait_raid_task_effect(
+                storage, deleted=[
+                    '/redfish/v1/Systems/1/Storages/RAIDStorage0/Volumes'
+                    '/LogicalDrive0',
+                    '/redfish/v1/Systems/1/Storages/RAIDStorage0/Volumes'
+                    '/LogicalDrive1'
+                ])
+            self.assertEqual(patched_time.sleep.call_count, 2)
+
+    @responses.activate
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
+    def testWaitCreationTakeEffect(self, patched_time):
+        storage_id = 'RAIDStorage0'
+        self.start_mocked_http_server([
+            responses.Response(
+                method=GET,
+                url=('https://server1.ibmc.com/redfish/v1/Systems/1'
+                     '/Storages/%s' % storage_id),
+                json=self.load_json_file('get-raid-storage-0.json')
+            ),
+            self._mock_volume_collection_response(storage_id, []),
+            self._mock_volume_collection_response(
+                storage_id, ['LogicalDrive0']),
+            responses.Response(
+                method=GET,
+                url='https://server1.ibmc.com/redfish/v1/Systems/1',
+                json=self.load_json_file('system-v5.json')),
+        ])
+        with ibmc_client.connect(**self.server) as client:
+            storage = client.system.storage.get(storage_id)
+            client.system.storage.wait_raid_task_effect(
+                storage, created=['LogicalDrive0'])
+            self.assertEqual(patched_time.sleep.call_count, 1)
+            self.assertEqual(
+                patched_time.now,
+                constants.RAID_TASK_EFFECT_CHECK_INTERVAL_SECONDS)
 
-        patched_sleep.assert_called_with(constants.RAID_TASK_EFFECT_SECONDS)
+    @responses.activate
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
+    def testWaitRaidTaskEffectTimeout(self, patched_time):
+        storage = Mock(id='RAIDStorage0')
+        storage.load_volume_odata_id_list.return_value = []
+        self.start_mocked_http_server([])
+        with ibmc_client.connect(**self.server) as client:
+            with self.assertRaises(exceptions.WaitTimeout) as c:
+                client.system.storage.wait_raid_task_effect(
+                    storage, created=['LogicalDrive0'])
+            self.assertEqual(
+                c.exception.message,
+                'Timed out after %d seconds waiting for RAID tasks of '
+                'storage RAIDStorage0 take effect.'
+                % constants.RAID_TASK_EFFECT_TIMEOUT_SECONDS)
+            self.assertEqual(patched_time.now,
+                             constants.RAID_TASK_EFFECT_TIMEOUT_SECONDS)
+            storage.load_volume_odata_id_list.assert_called_with()
+
+    @responses.activate
+    @patch('ibmc_client.api.system.storage.time')
+    def testWaitRaidTaskEffectWithFixedDelay(self, patched_time):
+        storage = Mock(id='RAIDStorage0')
+        self.start_mocked_http_server([])
+        with ibmc_client.connect(**self.server) as client:
+            client.system.storage.USE_FIXED_RAID_TASK_EFFECT_DELAY = True
+            client.system.storage.wait_raid_task_effect(
+                storage, created=['LogicalDrive0'])
+            patched_time.sleep.assert_called_once_with(
+                constants.RAID_TASK_EFFECT_SECONDS)
+            storage.load_volume_odata_id_list.assert_not_called()
 
     @responses.activate
     def testDeleteAllRaidConfiguration(self):
@@ -733,8 +953,19 @@ class TestStorageClient(BaseUnittest):
         with ibmc_client.connect(**self.server) as client:
             controllers = [build_default_ctrl('Mock1'),
                            build_default_ctrl('Mock2')]
+            controllers[0].delete_volume_collection.return_value = [
+                'LogicalDrive0']
+            controllers[1].delete_volume_collection.return_value = []
+            hot_spare_drives = [controllers[0].drives()[0],
+                                controllers[1].drives()[3]]
+            for drive in hot_spare_drives:
+                drive._oem['FirmwareStatus'] = (
+                    constants.DRIVE_FM_STATE_HOTSPARE)
+
             with patch.object(client.system.storage,
-                              'waiting_storage_ready'):
+                              'waiting_storage_ready') as ready, \
+                    patch.object(client.system.storage,
+                                 'wait_raid_tasks_effect') as wait_effect:
                 with patch.object(client.system.storage, 'list',
                                   return_value=controllers):
                     for ctrl in controllers:
@@ -743,11 +974,41 @@ class TestStorageClient(BaseUnittest):
 
                     client.system.storage.delete_all_raid_configuration()
 
+                    ready.assert_called_once_with()
+                    # one wait for all controllers which has deleted volumes
+                    wait_effect.assert_called_once_with(
+                        [(controllers[0], None, ['LogicalDrive0'])])
                     for ctrl in controllers:
                         # ctrl.restore.assert_called_once_with()
-                        ctrl.delete_volume_collection.assert_called_once_with()
+                        ctrl.delete_volume_collection.assert_called_once_with(
+                            wait_effect=False)
+                        ctrl.drives.assert_called_with(force_reload=True)
                         for drive in ctrl.drives():
-                            drive.restore.assert_called_once_with()
+                            if drive in hot_spare_drives:
+                                drive.restore.assert_called_once_with()
+                            else:
+                                drive.restore.assert_not_called()
+
+    @responses.activate
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
+    def testWaitRaidTasksEffectForMultipleStorage(self, patched_time):
+        storage1 = Mock(id='RAIDStorage0')
+        storage1.load_volume_odata_id_list.side_effect = [
+            ['/Volumes/LogicalDrive0'], []]
+        storage2 = Mock(id='RAIDStorage1')
+        storage2.load_volume_odata_id_list.return_value = []
+        self.start_mocked_http_server([])
+        with ibmc_client.connect(**self.server) as client:
+            with patch.object(client.system.storage, 'is_storage_ready',
+                              return_value=True) as ready:
+                client.system.storage.wait_raid_tasks_effect([
+                    (storage1, None, ['LogicalDrive0']),
+                    (storage2, None, ['LogicalDrive1']),
+                ])
+                # storage ready is only checked when all volumes gone
+                ready.assert_called_once_with()
+                self.assertEqual(storage2.load_volume_odata_id_list
+                                 .call_count, 1)
 
     @responses.activate
     def testDeleteAllRaidConfigurationForNoneCtrl(self):
@@ -1162,8 +1423,15 @@ class TestRaidStorageConfigurationClient(TestStorageClient):
                                  payload)
 
     @responses.activate
-    @patch('ibmc_client.api.system.storage.time')
-    def testApplyRaidConfiguration(self, patched_time):
+    def testApplyRaidConfiguration(self):
+        self._apply_raid_config_cases()
+
+    @responses.activate
+    def testApplyRaidConfigurationWithPlanner(self):
+        # greedy assignment is optimal in all cases, planner keeps it
+        self._apply_raid_config_cases(planner=RaidPlanner())
+
+    def _apply_raid_config_cases(self, planner=None):
         self.start_mocked_http_server([])
         with ibmc_client.connect(**self.server) as client:
             from tests.unittests import test_apply_raid_config_cases
@@ -1171,22 +1439,169 @@ class TestRaidStorageConfigurationClient(TestStorageClient):
                 LOG.info("process apply raid config:: %(name)s", case)
                 controllers = mock_ctrl(case.get('controllers'))
                 with patch.object(client.system.storage,
-                                  'waiting_storage_ready') as ready:
+                                  'waiting_storage_ready') as ready, \
+                        patch.object(client.system.storage,
+                                     'wait_raid_task_effect') as wait_effect:
                     with patch.object(client.system.volume, 'create') as create:
                         with patch.object(client.system.storage, 'list',
                                           return_value=controllers):
                             logical_disks = case.get('logical_disks')
                             client.system.storage.apply_raid_configuration(
-                                logical_disks)
+                                logical_disks, planner=planner)
                             create.assert_has_calls([
                                 call(**pending)
                                 for pending in case.get('pending_volumes')
                             ])
 
                             ready.assert_called_with()
-                            self.assertEqual(patched_time.sleep.call_count,
+                            self.assertEqual(wait_effect.call_count,
                                              create.call_count)
-                            patched_time.reset_mock()
+
+    def _apply_with_reconcile(self, client, controllers, logical_disks):
+        storage_client = client.system.storage
+        volume_client = client.system.volume
+        task = Mock()
+        with patch.object(storage_client, 'waiting_storage_ready'), \
+                patch.object(storage_client,
+                             'wait_raid_task_effect') as wait_effect, \
+                patch.object(storage_client, 'list',
+                             return_value=controllers), \
+                patch.object(volume_client, 'create') as create, \
+                patch.object(volume_client, 'delete_by_odata_id',
+                             return_value=task) as delete, \
+                patch.object(volume_client, 'set_bootable') as set_bootable:
+            storage_client.apply_raid_configuration(logical_disks,
+                                                    reconcile=True)
+            return create, delete, set_bootable, wait_effect
+
+    @responses.activate
+    def testApplyRaidConfigurationConcurrentlyAcrossControllers(self):
+        self.start_mocked_http_server([])
+        controllers = [build_default_ctrl('RAIDStorage0'),
+                       build_default_ctrl('RAIDStorage1')]
+        logical_disks = [
+            {"controller": ctrl.id, "raid_level": "1", "size_gb": size}
+            for size in (10, 20, 30) for ctrl in controllers]
+
+        lock = threading.Lock()
+        active = []
+        peak = [0]
+        calls = []
+
+        def create(**payload):
+            with lock:
+                # never two volumes of one controller at the same time
+                self.assertNotIn(payload['storage_id'], active)
+                active.append(payload['storage_id'])
+                peak[0] = max(peak[0], len(active))
+                calls.append(payload)
+            time.sleep(0.02)
+            return 'LogicalDrive%d' % len(calls)
+
+        def wait_effect(ctrl, created=None):
+            with lock:
+                active.remove(ctrl.id)
+
+        with ibmc_client.connect(**self.server) as client:
+            storage_client = client.system.storage
+            with patch.object(storage_client, 'waiting_storage_ready'), \
+                    patch.object(storage_client, 'wait_raid_task_effect',
+                                 side_effect=wait_effect), \
+                    patch.object(storage_client, 'list',
+                                 return_value=controllers), \
+                    patch.object(client.system.volume, 'create',
+                                 side_effect=create):
+                storage_client.apply_raid_configuration(logical_disks)
+
+        self.assertEqual(peak[0], 2)
+        for ctrl in controllers:
+            self.assertEqual(
+                [call['capacity_bytes'] for call in calls
+                 if call['storage_id'] == ctrl.id],
+                [gb(10), gb(20), gb(30)])
+
+    @responses.activate
+    def testReconcileKeepsMatchedVolumes(self):
+        self.start_mocked_http_server([])
+        with ibmc_client.connect(**self.server) as client:
+            logical_disks = [{
+                "raid_level": "5",
+                "size_gb": 200,
+                "is_root_volume": True,
+                "physical_disks": ["Disk13", "Disk14", "Disk15"]
+            }]
+            create, delete, set_bootable, _ = self._apply_with_reconcile(
+                client, [build_default_ctrl()], logical_disks)
+            create.assert_not_called()
+            delete.assert_not_called()
+            set_bootable.assert_called_once_with('LogicalDrive0', True)
+
+    @responses.activate
+    def testReconcileCreatesMissingVolumes(self):
+        self.start_mocked_http_server([])
+        with ibmc_client.connect(**self.server) as client:
+            logical_disks = [{
+                "raid_level": "1",
+                "size_gb": 100,
+            }, {
+                "raid_level": "5",
+                "size_gb": "MAX",
+                "number_of_physical_disks": 3
+            }]
+            create, delete, _, _ = self._apply_with_reconcile(
+                client, [build_default_ctrl()], logical_disks)
+            delete.assert_not_called()
+            create.assert_called_once_with(
+                storage_id=CTRL1_ID, volume_name=None, raid_level='RAID1',
+                drives=[0, 1], capacity_bytes=gb(100), span=1,
+                bootable=False)
+
+    @responses.activate
+    def testReconcileDeletesMismatchedVolumes(self):
+        self.start_mocked_http_server([])
+        with ibmc_client.connect(**self.server) as client:
+            ctrl = build_default_ctrl()
+            logical_disks = [{
+                "raid_level": "5",
+                "size_gb": 100,
+                "physical_disks": ["Disk0", "Disk1", "Disk2"]
+            }]
+            create, delete, _, wait_effect = self._apply_with_reconcile(
+                client, [ctrl], logical_disks)
+            delete.assert_called_once_with('LogicalDrive0')
+            wait_effect.assert_has_calls([
+                call(ctrl, deleted=['LogicalDrive0']),
+                call(ctrl, created=[create.return_value])])
+            ctrl.drives.assert_any_call(force_reload=True)
+            create.assert_called_once_with(
+                storage_id=CTRL1_ID, volume_name=None, raid_level='RAID5',
+                drives=[0, 1, 2], capacity_bytes=gb(100), span=1,
+                bootable=False)
+
+    def testLogicalDiskMatchesVolume(self):
+        ctrl = build_default_ctrl()
+        volume = ctrl.volumes()[0]
+        drives = ctrl.drives()
+
+        def matches(**options):
+            logical_disk = LogicalDisk(options)
+            return logical_disk.matches_volume(volume, drives)
+
+        self.assertTrue(matches(raid_level='5', size_gb=200))
+        self.assertTrue(matches(raid_level='5', size_gb='MAX'))
+        self.assertTrue(matches(raid_level='5', size_gb=200,
+                                number_of_physical_disks=3, disk_type='hdd'))
+        self.assertFalse(matches(raid_level='6', size_gb=200))
+        self.assertFalse(matches(raid_level='5', size_gb=100))
+        self.assertFalse(matches(raid_level='5', size_gb=200,
+                                 volume_name='os_volume'))
+        self.assertFalse(matches(raid_level='5', size_gb=200,
+                                 disk_type='ssd'))
+        self.assertFalse(matches(raid_level='5', size_gb=200,
+                                 number_of_physical_disks=4))
+        self.assertFalse(matches(raid_level='5', size_gb=200,
+                                 physical_disks=['Disk12', 'Disk13',
+                                                 'Disk14']))
 
     @responses.activate
     @patch('ibmc_client.api.system.storage.time')
@@ -1594,5 +2009,94 @@ class TestRaidStorageConfigurationClient(TestStorageClient):
                           c.exception.message)
 
 
+class TestPlanRaidConfiguration(BaseUnittest):
+
+    def testPlanFromDescriptionsMatchesApply(self):
+        # no HTTP server is mocked, nothing could be sent to iBMC
+        from tests.unittests import test_apply_raid_config_cases
+        for case in test_apply_raid_config_cases.apply_raid_config_cases:
+            plan = storage.plan_raid_configuration(
+                case.get('logical_disks'), case.get('controllers'))
+            self.assertEqual([v['payload'] for v in plan.volumes],
+                             case.get('pending_volumes'), case.get('name'))
+
+    def testPlanWithPlanner(self):
+        from tests.unittests import test_apply_raid_config_cases
+        for case in test_apply_raid_config_cases.apply_raid_config_cases:
+            plan = storage.plan_raid_configuration(
+                case.get('logical_disks'), case.get('controllers'),
+                planner=RaidPlanner())
+            self.assertEqual([v['payload'] for v in plan.volumes],
+                             case.get('pending_volumes'), case.get('name'))
+
+    def testPlanFromSnapshot(self):
+        ctrl = StorageSnapshot.from_description(CTRL1_WITH_16_DEFAULT_DRIVES)
+        snapshot = json.loads(json.dumps(ctrl.snapshot()))
+        restored = StorageSnapshot.load(snapshot)
+        self.assertEqual(restored.id, CTRL1_ID)
+        self.assertEqual(len(restored.drives()), 16)
+        self.assertEqual([v.drive_odata_id_collection
+                          for v in restored.volumes()],
+                         [v.drive_odata_id_collection for v in ctrl.volumes()])
+
+        logical_disks = [{"raid_level": "1", "size_gb": 100},
+                         {"raid_level": "5", "size_gb": 50,
+                          "share_physical_disks": True}]
+        expected = storage.plan_raid_configuration(logical_disks, [ctrl])
+        plan = storage.plan_raid_configuration(logical_disks, [snapshot])
+        self.assertEqual(plan.to_dict(), expected.to_dict())
+
+    def testPlanView(self):
+        logical_disks = [{"raid_level": "1", "size_gb": 100,
+                          "volume_name": "os", "is_root_volume": True}]
+        plan = storage.plan_raid_configuration(
+            logical_disks, [CTRL1_WITH_16_DEFAULT_DRIVES])
+        self.assertEqual(plan.to_dict(), {
+            'jbod_controllers': [],
+            'volumes': [{
+                'controller': CTRL1_ID,
+                'volume_name': 'os',
+                'raid_level': 'RAID1',
+                'span': 1,
+                'capacity_bytes': gb(100),
+                'drives': ['Disk0', 'Disk1'],
+                'payload': {
+                    'storage_id': CTRL1_ID, 'volume_name': 'os',
+                    'raid_level': 'RAID1', 'drives': [0, 1],
+                    'capacity_bytes': gb(100), 'span': 1, 'bootable': True,
+                },
+            }],
+        })
+        json.dumps(plan.to_dict())
+
+    def testPlanJbod(self):
+        plan = storage.plan_raid_configuration(
+            [{"raid_level": "JBOD", "size_gb": "MAX"}],
+            [CTRL1_WITH_NON_DRIVES])
+        self.assertEqual(plan.to_dict(), {'jbod_controllers': [CTRL1_ID],
+                                          'volumes': []})
+
+    def testPlanFailsLikeApply(self):
+        with self.assertRaises(exceptions.InvalidLogicalDiskConfig):
+            storage.plan_raid_configuration(
+                [{"raid_level": "1", "size_gb": 1000}],
+                [CTRL1_WITH_16_DEFAULT_DRIVES])
+
+    @responses.activate
+    def testClientPlanRaidConfiguration(self):
+        self.start_mocked_http_server([])
+        with ibmc_client.connect(**self.server) as client:
+            controllers = [build_default_ctrl()]
+            with patch.object(client.system.storage, 'list',
+                              return_value=controllers), \
+                    patch.object(client.system.volume, 'create') as create:
+                plan = client.system.storage.plan_raid_configuration(
+                    [{"raid_level": "5", "size_gb": 200}])
+            create.assert_not_called()
+            self.assertEqual(plan.volumes[0]['drives'],
+                             ['Disk0', 'Disk1', 'Disk2'])
+            self.assertEqual(plan.controllers, controllers)
+
+
 if __name__ == '__main__':
     unittest.main()
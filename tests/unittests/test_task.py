@@ -6,9 +6,10 @@ import responses
 
 import ibmc_client
 from ibmc_client.constants import GET
-from ibmc_client.exceptions import TaskFailed
+from ibmc_client.exceptions import DeadlineExceeded, TaskFailed, WaitTimeout
 from ibmc_client.resources.task import Task
-from tests.unittests import BaseUnittest
+from ibmc_client.waiter import Deadline, Waiter
+from tests.unittests import BaseUnittest, FakeClock
 
 
 class TestTaskClient(BaseUnittest):
@@ -68,8 +69,8 @@ class TestTaskClient(BaseUnittest):
             self.assertEqual(task.severity, messages['Severity'])
 
     @responses.activate
-    @patch('ibmc_client.api.task.task.sleep', return_value=None)
-    def testWaitTask(self, patched_time_sleep):
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
+    def testWaitTask(self, patched_time):
         resp_list = [responses.Response(
             method=GET,
             url='https://server1.ibmc.com/redfish/v1/TaskService/Tasks/1',
@@ -86,9 +87,91 @@ class TestTaskClient(BaseUnittest):
         self.start_mocked_http_server(resp_list)
         with ibmc_client.connect(**self.server) as client:
             task = client.task.wait_task_by_id('1')
-            self.assertEqual(patched_time_sleep.call_count, 10)
+            self.assertEqual(patched_time.sleep.call_count, 10)
             self.assertEqual(task.state, 'Completed')
 
+    def _mock_task_progress_responses(self, percentages, states=None):
+        resp_list = []
+        for (idx, percentage) in enumerate(percentages):
+            task_json = self.load_json_file('delete-volume-task-response.json')
+            task_json['Oem']['Huawei']['TaskPercentage'] = percentage
+            if states:
+                task_json['TaskState'] = states[idx]
+            resp_list.append(responses.Response(
+                method=GET,
+                url='https://server1.ibmc.com/redfish/v1/TaskService/Tasks/1',
+                json=task_json))
+
+        resp_list.append(responses.Response(
+            method=GET,
+            url='https://server1.ibmc.com/redfish/v1/TaskService/Tasks/1',
+            json=self.load_json_file(
+                'delete-volume-task-finished-response.json')
+        ))
+        self.start_mocked_http_server(resp_list)
+
+    @responses.activate
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
+    def testWatchTask(self, patched_time):
+        self._mock_task_progress_responses(
+            [None, None, '10%', '10%', '10%'])
+        with ibmc_client.connect(**self.server) as client:
+            task = client.task.get('1')
+            snapshots = list(client.task.watch(task))
+            self.assertEqual([(t.state, t.percentage) for t in snapshots],
+                             [('Running', None), ('Running', None),
+                              ('Running', '10%'), ('Running', '10%'),
+                              ('Running', '10%'), ('Completed', None)])
+            # percentage changes do not restart the interval
+            self.assertEqual(
+                [c[0][0] for c in patched_time.sleep.call_args_list],
+                [1, 2, 3, 3, 3])
+
+    @responses.activate
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
+    def testWatchTaskRestartsIntervalOnStateChange(self, patched_time):
+        self._mock_task_progress_responses(
+            [None, None, None, '10%', '20%'],
+            ['New', 'New', 'New', 'Running', 'Running'])
+        with ibmc_client.connect(**self.server) as client:
+            task = client.task.get('1')
+            list(client.task.watch(task))
+            self.assertEqual(
+                [c[0][0] for c in patched_time.sleep.call_args_list],
+                [1, 2, 3, 1, 2])
+
+    @responses.activate
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
+    def testWatchTaskChangesOnly(self, patched_time):
+        self._mock_task_progress_responses(
+            [None, None, '10%', '10%', '10%'])
+        with ibmc_client.connect(**self.server) as client:
+            task = client.task.get('1')
+            snapshots = list(client.task.watch(task, changes_only=True))
+            self.assertEqual([(t.state, t.percentage) for t in snapshots],
+                             [('Running', None), ('Running', '10%'),
+                              ('Completed', None)])
+
+    @responses.activate
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
+    def testWaitTaskTimeout(self, patched_time):
+        self._mock_task_progress_responses([None] * 10)
+        with ibmc_client.connect(**self.server) as client:
+            task = client.task.get('1')
+            with self.assertRaises(WaitTimeout) as c:
+                client.task.wait_task(task, waiter=Waiter(5, 1))
+            self.assertIn('Timed out after 5 seconds', c.exception.message)
+            self.assertEqual(patched_time.now, 5)
+
+    @responses.activate
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
+    def testWaitTaskDeadlineExceeded(self, patched_time):
+        self._mock_task_progress_responses([None] * 10)
+        with ibmc_client.connect(**self.server) as client:
+            with self.assertRaises(DeadlineExceeded):
+                client.task.wait_task_by_id('1', deadline=Deadline(4))
+            self.assertEqual(patched_time.now, 4)
+
     def testRaiseIfFailed(self):
         resp = self.new_mocked_response(
             'create-volume-task-exception-response.json')
@@ -7,7 +7,7 @@ import responses
 
 import ibmc_client
 from ibmc_client.constants import GET, DELETE, VOLUME_INIT_QUICK, POST, PATCH
-from tests.unittests import BaseUnittest
+from tests.unittests import BaseUnittest, FakeClock
 
 
 class TestVolumeClient(BaseUnittest):
@@ -106,9 +106,9 @@ class TestVolumeClient(BaseUnittest):
             volume1 = volumes[1]
             self.assertVolume1(volume1)
 
-    @patch('ibmc_client.api.task.task.sleep')
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
     @responses.activate
-    def testDeleteVolume(self, patched_sleep):
+    def testDeleteVolume(self, patched_time):
         storage_id = 'storage-id'
         volume_id = 'volume-id'
 
@@ -138,7 +138,7 @@ class TestVolumeClient(BaseUnittest):
         self.start_mocked_http_server(resp_list)
         with ibmc_client.connect(**self.server) as client:
             client.system.volume.delete(storage_id, volume_id)
-            self.assertEqual(patched_sleep.call_count, 10)
+            self.assertEqual(patched_time.sleep.call_count, 10)
 
     @responses.activate
     def testInitVolume(self):
@@ -203,9 +203,9 @@ class TestVolumeClient(BaseUnittest):
             self.assertEqual(json.loads(self.get_request_body(patch_req)),
                              payload)
 
-    @patch('ibmc_client.api.task.task.sleep')
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
     @responses.activate
-    def testCreateVolume(self, patched_sleep):
+    def testCreateVolume(self, patched_time):
         storage_id = 'RAIDStorage0'
         resp_list = [
             responses.Response(
@@ -244,7 +244,7 @@ class TestVolumeClient(BaseUnittest):
                 }
                 volume_id = client.system.volume.create(**payload)
                 self.assertEqual(volume_id, 'LogicalDrive0')
-                self.assertEqual(patched_sleep.call_count, 1)
+                self.assertEqual(patched_time.sleep.call_count, 1)
                 volume_odata_id = client.system.volume.get_volume_odata_id(
                     storage_id, volume_id)
                 set_bootable.assert_called_with(volume_odata_id, True)
@@ -267,9 +267,9 @@ class TestVolumeClient(BaseUnittest):
             self.assertEqual(json.loads(self.get_request_body(patch_req)),
                              payload)
 
-    @patch('ibmc_client.api.task.task.sleep')
+    @patch('ibmc_client.waiter.time', new_callable=FakeClock)
     @responses.activate
-    def testCreateVolumeOnExistsDiskGroup(self, patched_sleep):
+    def testCreateVolumeOnExistsDiskGroup(self, patched_time):
         storage_id = 'RAIDStorage0'
         resp_list = [
             responses.Response(
@@ -308,7 +308,7 @@ class TestVolumeClient(BaseUnittest):
                 }
                 volume_id = client.system.volume.create(**payload)
                 self.assertEqual(volume_id, 'LogicalDrive0')
-                self.assertEqual(patched_sleep.call_count, 1)
+                self.assertEqual(patched_time.sleep.call_count, 1)
                 volume_odata_id = client.system.volume.get_volume_odata_id(
                     storage_id, volume_id)
                 set_bootable.assert_called_with(volume_odata_id, True)
@@ -0,0 +1,165 @@
+# coding: utf-8
+import unittest
+
+from mock.mock import patch, Mock
+
+from ibmc_client import exceptions
+from ibmc_client.waiter import Deadline, Waiter
+from tests.unittests import FakeClock
+
+
+class TestWaiter(unittest.TestCase):
+    """ Waiter unit test stubs """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch('ibmc_client.waiter.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def testIntervalsBackoffCappedByMaxInterval(self):
+        waiter = Waiter(100, 1, max_interval=5, backoff=2)
+        intervals = waiter.intervals()
+        self.assertEqual([next(intervals) for _ in range(6)],
+                         [1, 2, 4, 5, 5, 5])
+
+    def testIntervalsWithoutBackoff(self):
+        intervals = Waiter(100, 3).intervals()
+        self.assertEqual([next(intervals) for _ in range(3)], [3, 3, 3])
+
+    def testWaitReturnsConditionResult(self):
+        condition = Mock(side_effect=[False, None, 'ready'])
+        waiter = Waiter(100, 1, max_interval=5, backoff=2)
+        self.assertEqual(waiter.wait(condition, 'something'), 'ready')
+        self.assertEqual(condition.call_count, 3)
+        self.assertEqual(self.clock.now, 3)
+
+    def testWaitTimeout(self):
+        condition = Mock(return_value=False)
+        waiter = Waiter(10, 4)
+        with self.assertRaises(exceptions.WaitTimeout) as c:
+            waiter.wait(condition, 'something')
+        self.assertEqual(c.exception.message,
+                         'Timed out after 10 seconds waiting for something.')
+        # checked at 0, 4, 8 and 10
+        self.assertEqual(condition.call_count, 4)
+
+    def testWaitRaisesConditionError(self):
+        error = exceptions.IBMCConnectionError(url='url', error='error')
+        condition = Mock(side_effect=error)
+        with self.assertRaises(exceptions.IBMCConnectionError):
+            Waiter(10, 1).wait(condition, 'something')
+
+    def testTicksRestartBackOffWhenReset(self):
+        ticks = Waiter(None, 1, max_interval=8, backoff=2).ticks('ready')
+        next(ticks)
+        for reset in (False, False, False, True, False):
+            ticks.send(reset)
+        self.assertEqual(
+            [c[0][0] for c in self.clock.sleep.call_args_list],
+            [1, 2, 4, 1, 2])
+
+    def testTicksTimeout(self):
+        ticks = Waiter(5, 2).ticks('ready')
+        next(ticks)
+        ticks.send(False)
+        ticks.send(False)
+        ticks.send(False)
+        with self.assertRaises(exceptions.WaitTimeout):
+            ticks.send(False)
+        self.assertEqual(self.clock.now, 5)
+
+    def testTicksStopAtDeadline(self):
+        deadline = Deadline(3)
+        ticks = Waiter(None, 2).ticks('ready', deadline=deadline)
+        next(ticks)
+        ticks.send(False)
+        with self.assertRaises(exceptions.DeadlineExceeded):
+            ticks.send(False)
+        self.assertEqual(self.clock.now, 3)
+
+    def testDeadline(self):
+        deadline = Deadline(10)
+        self.assertEqual(deadline.remaining(), 10)
+        self.clock.sleep(4)
+        self.assertEqual(deadline.remaining(), 6)
+        self.assertFalse(deadline.expired)
+        deadline.check('anything')
+
+        self.clock.sleep(7)
+        self.assertEqual(deadline.remaining(), 0)
+        self.assertTrue(deadline.expired)
+        with self.assertRaises(exceptions.DeadlineExceeded) as c:
+            deadline.check('create volume')
+        self.assertEqual(c.exception.message,
+                         'Deadline exceeded before create volume.')
+
+    def testDeadlineCancel(self):
+        deadline = Deadline()
+        self.assertEqual(deadline.remaining(), float('inf'))
+        deadline.cancel()
+        self.assertTrue(deadline.cancelled)
+        self.assertEqual(deadline.remaining(), 0)
+        with self.assertRaises(exceptions.OperationCancelled):
+            deadline.check('create volume')
+
+    def testWaitStopsAtDeadlineBeforeTimeout(self):
+        condition = Mock(return_value=False)
+        with self.assertRaises(exceptions.DeadlineExceeded):
+            Waiter(100, 4).wait(condition, 'ready', deadline=Deadline(10))
+        self.assertEqual(self.clock.now, 10)
+        self.assertEqual(condition.call_count, 3)
+
+    def testWaitAllDoesNotTolerateCancellation(self):
+        deadline = Deadline()
+        conditions = {'server1': Mock(side_effect=deadline.cancel),
+                      'server2': Mock(return_value=False)}
+        with self.assertRaises(exceptions.OperationCancelled):
+            Waiter(100, 1).wait_all(conditions, 'storage ready',
+                                    deadline=deadline)
+
+        # raised by requests of condition
+        conditions = {'server1': Mock(
+            side_effect=exceptions.DeadlineExceeded(what='GET url'))}
+        with self.assertRaises(exceptions.DeadlineExceeded):
+            Waiter(100, 1).wait_all(conditions, 'storage ready')
+
+    def testWaitAllPollsEachConditionOnItsSchedule(self):
+        checks = []
+
+        def condition(key, ready_at):
+            def check():
+                checks.append((self.clock.now, key))
+                return self.clock.now >= ready_at
+            return check
+
+        waiter = Waiter(100, 1, max_interval=4, backoff=2)
+        results = waiter.wait_all({'a': condition('a', 3),
+                                   'b': condition('b', 0)}, 'ready')
+        self.assertEqual(results, {'a': True, 'b': True})
+        self.assertEqual(checks, [(0, 'a'), (0, 'b'), (1, 'a'), (3, 'a')])
+        self.assertEqual(self.clock.now, 3)
+
+    def testWaitAllTimeoutListsPendingKeys(self):
+        conditions = {'server1': Mock(return_value=True),
+                      'server2': Mock(return_value=False),
+                      'server3': Mock(return_value=False)}
+        with self.assertRaises(exceptions.WaitTimeout) as c:
+            Waiter(5, 1, max_interval=2, backoff=2).wait_all(
+                conditions, 'storage ready')
+        self.assertEqual(c.exception.message,
+                         'Timed out after 5 seconds waiting for storage '
+                         'ready (server2, server3).')
+        conditions['server1'].assert_called_once_with()
+
+    def testWaitAllToleratesConditionErrors(self):
+        error = exceptions.IBMCConnectionError(url='url', error='error')
+        conditions = {'server1': Mock(side_effect=[error, True]),
+                      'server2': Mock(return_value=True)}
+        results = Waiter(5, 1).wait_all(conditions, 'storage ready')
+        self.assertEqual(results, {'server1': True, 'server2': True})
+        self.assertEqual(conditions['server1'].call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()